@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark for MCQFormGenerator against the local mock
+Forms API. Runs the single-file, combined and bulk-directory scenarios on
+synthetic question files and reports forms/sec, questions/sec, request
+counts and p50/p95/p99 request latency.
+
+Usage:
+  python benchmarks/bench_forms_throughput.py [--files 20] [--questions 25] [--latency 0.02]
+      [--error-rate 0.01] [--throttle-rate 0.01] [--output results.json]
+      [--baseline previous.json --max-regression 0.2]
+
+Exits with status 1 when --baseline is given and any scenario's forms/sec
+dropped by more than --max-regression.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+from main import MCQFormGenerator, build_bulk_jobs, find_json_files
+from utils.gg_form_api import StaticCredentialProvider
+
+SCENARIOS = ('single', 'combined', 'bulk')
+
+
+def write_question_files(directory, files, questions_per_file):
+    for n in range(files):
+        questions = [
+            {
+                "question": f"File {n}, question {i}: which option is correct?",
+                "options": {"option-1": "alpha", "option-2": "beta", "option-3": "gamma", "option-4": "delta"},
+                "correct_option": f"option-{i % 4 + 1}",
+                "explanation": f"Option {i % 4 + 1} is correct for question {i}."
+            }
+            for i in range(questions_per_file)
+        ]
+        with open(os.path.join(directory, f"quiz_{n:04d}.json"), 'w', encoding='utf-8') as f:
+            json.dump(questions, f, ensure_ascii=False)
+    return find_json_files(directory)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def make_generator(server, concurrency, backoff_base):
+    """Generator wired to the mock server with client-side throttling disabled."""
+    generator = MCQFormGenerator(pool_size=concurrency, force=True,
+                                 credential_provider=StaticCredentialProvider('benchmark'),
+                                 endpoint=server.url, form_cache_path=None, rate_limit=False)
+    generator.transport.backoff_base = backoff_base
+    latencies = []
+    generator.transport.session.hooks['response'].append(
+        lambda response, *args, **kwargs: latencies.append(response.elapsed.total_seconds()))
+    return generator, latencies
+
+
+def run_scenario(scenario, paths, args):
+    with MockFormsServer(latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+                         throttle_rate=args.throttle_rate, retry_after=0, seed=args.seed) as server:
+        generator, latencies = make_generator(server, args.concurrency, args.backoff_base)
+        started = time.perf_counter()
+        # The generator reports progress with print(); keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            if scenario == 'single':
+                results = [generator.create_mcq_form_from_json(path) for path in paths]
+            elif scenario == 'combined':
+                results = [generator.create_combined_mcq_form_from_multiple_json(paths)]
+            else:
+                rows = generator.create_forms_in_bulk(build_bulk_jobs(paths), args.concurrency)
+                results = [row['result'] for row in rows]
+        elapsed = time.perf_counter() - started
+        stats = generator.transport.connection_stats()
+        generator.transport.close()
+        server_counts = server.request_counts()
+
+    forms = sum(1 for result in results if result)
+    questions = sum(result['questions_added'] for result in results if result)
+    latencies.sort()
+    return {
+        'scenario': scenario,
+        'forms': forms,
+        'failed_forms': len(results) - forms,
+        'questions': questions,
+        'elapsed_seconds': round(elapsed, 4),
+        'forms_per_second': round(forms / elapsed, 3) if elapsed else 0.0,
+        'questions_per_second': round(questions / elapsed, 1) if elapsed else 0.0,
+        'requests': stats['requests'],
+        'retries': stats['retries'],
+        'connections_opened': stats['connections_opened'],
+        'bytes_sent': stats['bytes_sent'],
+        'server_requests': server_counts,
+        'latency_p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'latency_p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 2)
+    }
+
+
+def print_report(results):
+    print(f"{'Scenario':<9} {'Forms':>5} {'Forms/s':>8} {'Qs/s':>8} {'Reqs':>5} {'Retries':>7} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    for row in results:
+        print(f"{row['scenario']:<9} {row['forms']:>5} {row['forms_per_second']:>8.2f} {row['questions_per_second']:>8.1f} "
+              f"{row['requests']:>5} {row['retries']:>7} {row['latency_p50_ms']:>7.1f} "
+              f"{row['latency_p95_ms']:>7.1f} {row['latency_p99_ms']:>7.1f}")
+        print(f"{'':<9} server: {', '.join(f'{k}={v}' for k, v in row['server_requests'].items())}")
+
+
+def check_regressions(results, baseline_path, max_regression):
+    """Return the scenarios whose forms/sec fell more than `max_regression` below the baseline."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {row['scenario']: row for row in json.load(f)['results']}
+    regressions = []
+    for row in results:
+        previous = baseline.get(row['scenario'])
+        if previous and previous['forms_per_second']:
+            change = row['forms_per_second'] / previous['forms_per_second'] - 1
+            if change < -max_regression:
+                regressions.append((row['scenario'], previous['forms_per_second'], row['forms_per_second'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark form creation throughput against a local mock Forms API')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated subset of: single,combined,bulk')
+    parser.add_argument('--files', type=int, default=20, help='Synthetic question files')
+    parser.add_argument('--questions', type=int, default=25, help='Questions per file')
+    parser.add_argument('--concurrency', type=int, default=4, help='Bulk workers and connection pool size')
+    parser.add_argument('--latency', type=float, default=0.02, help='Mock server latency per request (seconds)')
+    parser.add_argument('--latency-jitter', type=float, default=0.01, help='Extra random latency (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--backoff-base', type=float, default=0.01, help='Client retry backoff base (seconds)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for injected faults and jitter')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Previous --output file to compare forms/sec against')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed forms/sec drop vs baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"Error: Unknown scenario(s): {', '.join(unknown)}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_question_files(tmp_dir, args.files, args.questions)
+        print(f"{args.files} files x {args.questions} questions, latency {args.latency * 1000:.0f}ms, "
+              f"error rate {args.error_rate:.0%}, throttle rate {args.throttle_rate:.0%}")
+        results = [run_scenario(scenario, paths, args) for scenario in scenarios]
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = check_regressions(results, args.baseline, args.max_regression)
+        for scenario, before, after, change in regressions:
+            print(f"REGRESSION: {scenario} forms/sec {before:.2f} -> {after:.2f} ({change:+.0%})")
+        if regressions:
+            return 1
+        print(f"No scenario regressed more than {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark item analysis on a synthetic response store.
+Respondents of known ability answer items of known difficulty (a Rasch
+model), so the benchmark also checks that the statistics recover them:
+harder items get lower p-values and every item discriminates positively.
+
+Usage: python benchmarks/bench_item_analysis.py [--answers 1000000] [--forms 500] [--questions 20] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.item_analysis import distractor_rates, item_statistics, vocabulary_mastery
+
+OPTIONS = ['a', 'b', 'c', 'd']
+
+
+def make_dataset(answers, forms, questions, words, seed=7):
+    """Return (answers, items) DataFrames shaped like ResponseStore.load() and item_table()."""
+    rng = np.random.default_rng(seed)
+    respondents = answers // questions
+    form_of = rng.integers(0, forms, respondents)
+    ability = rng.normal(0, 1, respondents)
+    difficulty = rng.normal(0, 1, (forms, questions))
+
+    respondent = np.repeat(np.arange(respondents), questions)
+    position = np.tile(np.arange(questions), respondents)
+    form = form_of[respondent]
+    p_correct = 1 / (1 + np.exp(difficulty[form, position] - ability[respondent]))
+    correct = rng.random(len(respondent)) < p_correct
+    wrong_choice = rng.choice(np.array(OPTIONS[1:]), len(respondent), p=[0.6, 0.3, 0.1])
+    answer = np.where(correct, 'a', wrong_choice)
+
+    form_ids = np.array([f"form-{i}" for i in range(forms)], dtype=object)
+    question_ids = np.array([f"q-{i}" for i in range(questions)], dtype=object)
+    answer_frame = pd.DataFrame({
+        'form_id': form_ids[form],
+        'response_id': np.array([f"r-{i}" for i in range(respondents)], dtype=object)[respondent],
+        'respondent_email': np.array([f"s{i % 2000}@example.com" for i in range(respondents)], dtype=object)[respondent],
+        'question_id': question_ids[position],
+        'answer': answer,
+        'correct': correct,
+        'score': correct.astype(int)
+    })
+    items = pd.DataFrame({
+        'form_id': np.repeat(form_ids, questions),
+        'question_id': np.tile(question_ids, forms),
+        'position': np.tile(np.arange(questions), forms),
+        'title': [f"Question {q} of form {f}" for f in range(forms) for q in range(questions)],
+        'options': [OPTIONS] * (forms * questions),
+        'correct': [['a']] * (forms * questions),
+        'vocabulary': [f"word{(f * questions + q) % words}" for f in range(forms) for q in range(questions)]
+    })
+    return answer_frame, items, difficulty
+
+
+def best_of(repeat, func):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vectorized item analysis')
+    parser.add_argument('--answers', type=int, default=1000000, help='Answer rows in the synthetic store')
+    parser.add_argument('--forms', type=int, default=500, help='Forms the respondents are spread over')
+    parser.add_argument('--questions', type=int, default=20, help='Questions per form')
+    parser.add_argument('--words', type=int, default=3000, help='Distinct vocabulary words')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per step; the fastest is reported')
+    args = parser.parse_args()
+
+    answers, items, difficulty = make_dataset(args.answers, args.forms, args.questions, args.words)
+    print(f"{len(answers)} answers from {answers['response_id'].nunique()} respondents "
+          f"on {len(items)} items ({args.forms} forms x {args.questions} questions)\n")
+
+    stats_time, stats = best_of(args.repeat, lambda: item_statistics(answers, items))
+    distractor_time, distractors = best_of(args.repeat, lambda: distractor_rates(answers, items))
+    mastery_time, mastery = best_of(args.repeat, lambda: vocabulary_mastery(answers, items))
+    learner_time, learners = best_of(args.repeat, lambda: vocabulary_mastery(answers, items, by_respondent=True))
+
+    print(f"{'step':<28} {'seconds':>8} {'answers/s':>12}")
+    for name, elapsed in (('item statistics', stats_time), ('distractor rates', distractor_time),
+                          ('vocabulary mastery', mastery_time), ('mastery per learner', learner_time)):
+        print(f"{name:<28} {elapsed:>8.3f} {len(answers) / elapsed:>12,.0f}")
+
+    expected = pd.Series(difficulty.ravel(), index=pd.MultiIndex.from_frame(items[['form_id', 'question_id']]))
+    observed = stats.set_index(['form_id', 'question_id'])['p_value']
+    rank = np.corrcoef(expected.loc[observed.index].rank(), -observed.rank())[0, 1]
+    print(f"\nrank correlation of p-value with true easiness: {rank:.3f}")
+    print(f"items with positive point-biserial: {(stats['point_biserial'] > 0).mean():.1%}")
+    print(f"distractor rows: {len(distractors)}, words: {len(mastery)}, learner x word rows: {len(learners)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON backends on the three hot paths: loading question files,
+writing vocabulary chunks and encoding batchUpdate request bodies.
+
+Usage: python benchmarks/bench_json_backend.py [--files 2000] [--questions 20] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import json_backend
+from utils.question import parse_questions
+
+
+def make_questions(count):
+    return [
+        {
+            "question": f"Which word best completes sentence {i}: 'The committee ___ the proposal'?",
+            "options": {"option-1": "endorsed", "option-2": "endorses", "option-3": "endorsing", "option-4": "endorse"},
+            "correct_option": "option-1",
+            "explanation": f"Past tense narrative (question {i}); 'endorsed' – lời giải thích."
+        }
+        for i in range(count)
+    ]
+
+
+def make_chunk(count):
+    return [
+        {"Meaning": f"nghĩa {i}", "Collocation": None, "Context": f"context sentence {i}",
+         "IPA": "/ɪnˈdɔːs/", "Time": "05/07/2025", "Vocabulary": f"word{i}"}
+        for i in range(count)
+    ]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(backend, paths, chunks, bodies, repeat):
+    json_backend.set_backend(backend)
+    load = best_of(repeat, lambda: [json_backend.load_file(path) for path in paths])
+    write = best_of(repeat, lambda: [json_backend.dumps_pretty(chunk) for chunk in chunks])
+    encode = best_of(repeat, lambda: [json_backend.dumps_bytes(body) for body in bodies])
+    return load, write, encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the json and orjson backends')
+    parser.add_argument('--files', type=int, default=2000, help='Question files to load')
+    parser.add_argument('--questions', type=int, default=20, help='Questions per file')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    backends = ['json'] + (['orjson'] if json_backend.orjson is not None else [])
+    if len(backends) == 1:
+        print("orjson is not installed; only the json backend will be measured")
+
+    questions = make_questions(args.questions)
+    chunks = [make_chunk(20) for _ in range(args.files)]
+    items = [q.build_item(1) for q in parse_questions(questions)[0]]
+    bodies = [{"requests": [{"createItem": {"item": item, "location": {"index": i}}} for i, item in enumerate(items)]}
+              for _ in range(args.files)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_backend.set_backend('json')
+        paths = []
+        for n in range(args.files):
+            path = os.path.join(tmp_dir, f"{n}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json_backend.dumps_pretty(questions))
+            paths.append(path)
+
+        results = {backend: run(backend, paths, chunks, bodies, args.repeat) for backend in backends}
+
+    print(f"{args.files} files x {args.questions} questions, best of {args.repeat}")
+    print(f"{'Backend':<8} {'Load (s)':>10} {'Chunks (s)':>11} {'Bodies (s)':>11}")
+    for backend, (load, write, encode) in results.items():
+        print(f"{backend:<8} {load:>10.3f} {write:>11.3f} {encode:>11.3f}")
+    if 'orjson' in results:
+        base, fast = results['json'], results['orjson']
+        print(f"{'speedup':<8} {base[0] / fast[0]:>9.1f}x {base[1] / fast[1]:>10.1f}x {base[2] / fast[2]:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Google Forms API used by the benchmarks.
+Implements forms.create, forms.batchUpdate, forms.get and forms.responses.list
+in memory, with configurable latency, random 5xx errors and injected 429
+throttling. Responses are added with submit_response().
+
+Usage: python benchmarks/mock_forms_server.py [--port 8080] [--latency 0.05] [--error-rate 0.01] [--throttle-rate 0.02]
+Then point the CLI at it with FORMS_API_ENDPOINT=http://127.0.0.1:8080 FORMS_ACCESS_TOKEN=dummy.
+"""
+
+import argparse
+import gzip
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+def _timestamp(moment):
+    """RFC 3339 UTC timestamp with milliseconds, as the Forms API returns them."""
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class MockFormsServer:
+    """In-memory Forms API on a background thread.
+
+    `latency` (+ up to `latency_jitter`) seconds are added to every response;
+    `error_rate` and `throttle_rate` are the fractions of requests answered
+    with a 503 or a 429 carrying `Retry-After: retry_after`. fail_next()
+    scripts exact statuses, and requests with a token in `revoked_tokens`
+    get a 401.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=0, seed=None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.forms = {}
+        self.responses = {}  # form id -> responses in submission order
+        self.counts = Counter()  # (endpoint, status) -> requests
+        self.revoked_tokens = set()
+        self._scripted_faults = []
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def request_counts(self):
+        """Requests served per endpoint and status, e.g. {'batchUpdate 200': 12}."""
+        with self._lock:
+            return {f"{endpoint} {status}": count for (endpoint, status), count in sorted(self.counts.items())}
+
+    def fail_next(self, *statuses):
+        """Answer the next requests with these error statuses, in order, without applying them.
+
+        A None lets its request through, e.g. fail_next(None, 500) fails the second request.
+        """
+        with self._lock:
+            self._scripted_faults.extend(statuses)
+
+    def _inject_fault(self):
+        """Return an error status or None for the next request, after the configured delay."""
+        with self._lock:
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            scripted = self._scripted_faults.pop(0) if self._scripted_faults else None
+        if delay:
+            time.sleep(delay)
+        if scripted:
+            return scripted
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def _create(self, body):
+        with self._lock:
+            form_id = f"mock-form-{next(self._ids)}"
+            self.forms[form_id] = {
+                'formId': form_id,
+                'info': dict(body.get('info', {})),
+                'settings': {},
+                'items': [],
+                'responderUri': f'https://docs.google.com/forms/d/e/{form_id}/viewform'
+            }
+            return 200, self.forms[form_id]
+
+    def _batch_update(self, form_id, body):
+        with self._lock:
+            form = self.forms.get(form_id)
+            if form is None:
+                return 404, {'error': {'code': 404, 'message': f'Form {form_id} not found'}}
+            # Validate against a copy so a rejected batch leaves the form untouched
+            items = list(form['items'])
+            info = dict(form['info'])
+            settings = form['settings']
+            for request in body.get('requests', []):
+                if 'createItem' in request:
+                    index = request['createItem'].get('location', {}).get('index', len(items))
+                    if index > len(items):
+                        return 400, {'error': {'code': 400, 'message': f'Index {index} out of range'}}
+                    item = json.loads(json.dumps(request['createItem']['item']))
+                    item['itemId'] = f"item-{next(self._ids)}"
+                    question = item.get('questionItem', {}).get('question')
+                    if question is not None:
+                        question['questionId'] = f"q-{next(self._ids)}"
+                    items.insert(index, item)
+                elif 'updateItem' in request:
+                    index = request['updateItem']['location']['index']
+                    items[index] = dict(request['updateItem']['item'], itemId=items[index].get('itemId'))
+                elif 'deleteItem' in request:
+                    del items[request['deleteItem']['location']['index']]
+                elif 'moveItem' in request:
+                    item = items.pop(request['moveItem']['originalLocation']['index'])
+                    items.insert(request['moveItem']['newLocation']['index'], item)
+                elif 'updateFormInfo' in request:
+                    info.update(request['updateFormInfo']['info'])
+                elif 'updateSettings' in request:
+                    settings = request['updateSettings']['settings']
+            form.update(items=items, info=info, settings=settings)
+            return 200, {'replies': [{} for _ in body.get('requests', [])]}
+
+    def _get(self, form_id):
+        with self._lock:
+            form = self.forms.get(form_id)
+            if form is None:
+                return 404, {'error': {'code': 404, 'message': f'Form {form_id} not found'}}
+            return 200, json.loads(json.dumps(form))
+
+    def submit_response(self, form_id, choices, submitted=None, email=None):
+        """Record a graded response; `choices` maps question ids to the chosen option value.
+
+        Returns the stored response. `submitted` defaults to now; `email` is
+        kept only when the form's settings collect emails.
+        """
+        with self._lock:
+            questions = {}
+            for item in self.forms[form_id]['items']:
+                question = item.get('questionItem', {}).get('question')
+                if question is not None:
+                    questions[question['questionId']] = question
+            answers, total = {}, 0
+            for question_id, value in choices.items():
+                grading = questions[question_id].get('grading', {})
+                correct = value in [answer['value'] for answer in grading.get('correctAnswers', {}).get('answers', [])]
+                score = grading.get('pointValue', 0) if correct else 0
+                total += score
+                answers[question_id] = {'questionId': question_id, 'textAnswers': {'answers': [{'value': value}]},
+                                        'grade': {'score': score, 'correct': correct}}
+            submitted = submitted or datetime.now(timezone.utc)
+            response = {
+                'formId': form_id,
+                'responseId': f"response-{next(self._ids)}",
+                'createTime': _timestamp(submitted),
+                'lastSubmittedTime': _timestamp(submitted),
+                'answers': answers,
+                'totalScore': total
+            }
+            if email and self.forms[form_id]['settings'].get('emailCollectionType', 'DO_NOT_COLLECT') != 'DO_NOT_COLLECT':
+                # Like the API, an email is only recorded when the form collects it
+                response['respondentEmail'] = email
+            self.responses.setdefault(form_id, []).append(response)
+            return response
+
+    def _list_responses(self, form_id, query):
+        with self._lock:
+            if form_id not in self.forms:
+                return 404, {'error': {'code': 404, 'message': f'Form {form_id} not found'}}
+            responses = self.responses.get(form_id, [])
+            condition = query.get('filter', '').split()
+            if condition:
+                if len(condition) != 3 or condition[0] != 'timestamp' or condition[1] not in ('>', '>='):
+                    return 400, {'error': {'code': 400, 'message': f"Invalid filter {query['filter']}"}}
+                since = _parse_timestamp(condition[2])
+                responses = [response for response in responses
+                             if _parse_timestamp(response['lastSubmittedTime']) > since
+                             or (condition[1] == '>=' and _parse_timestamp(response['lastSubmittedTime']) == since)]
+            start = int(query.get('pageToken') or 0)
+            page_size = min(int(query.get('pageSize') or 5000), 5000)
+            payload = {}
+            if responses[start:start + page_size]:
+                payload['responses'] = json.loads(json.dumps(responses[start:start + page_size]))
+            if start + page_size < len(responses):
+                payload['nextPageToken'] = str(start + page_size)
+            return 200, payload
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, endpoint, status, payload, headers=None):
+                with server._lock:
+                    server.counts[(endpoint, status)] += 1
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _read_body(self):
+                data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    data = gzip.decompress(data)
+                return json.loads(data) if data else {}
+
+            def _dispatch(self, endpoint, handler):
+                token = self.headers.get('Authorization', '').split(' ', 1)[-1]
+                if token in server.revoked_tokens:
+                    self._respond(endpoint, 401, {'error': {'code': 401, 'message': 'Invalid credentials'}})
+                    return
+                fault = server._inject_fault()
+                if fault == 429:
+                    self._respond(endpoint, 429, {'error': {'code': 429, 'message': 'Quota exceeded'}},
+                                  {'Retry-After': str(server.retry_after)})
+                elif fault:
+                    self._respond(endpoint, fault, {'error': {'code': fault, 'message': 'Backend error'}})
+                else:
+                    self._respond(endpoint, *handler())
+
+            def do_POST(self):
+                body = self._read_body()
+                path = self.path.split('?')[0]
+                if path == '/v1/forms':
+                    self._dispatch('create', lambda: server._create(body))
+                elif path.startswith('/v1/forms/') and path.endswith(':batchUpdate'):
+                    form_id = path[len('/v1/forms/'):-len(':batchUpdate')]
+                    self._dispatch('batchUpdate', lambda: server._batch_update(form_id, body))
+                else:
+                    self._respond('unknown', 404, {'error': {'code': 404, 'message': 'Not found'}})
+
+            def do_GET(self):
+                path, _, query_string = self.path.partition('?')
+                query = dict(parse_qsl(query_string))
+                if path.startswith('/v1/forms/') and path.endswith('/responses'):
+                    form_id = path[len('/v1/forms/'):-len('/responses')]
+                    self._dispatch('responses.list', lambda: server._list_responses(form_id, query))
+                elif path.startswith('/v1/forms/') and '/' not in path[len('/v1/forms/'):]:
+                    form_id = path[len('/v1/forms/'):]
+                    self._dispatch('get', lambda: server._get(form_id))
+                else:
+                    self._respond('unknown', 404, {'error': {'code': 404, 'message': 'Not found'}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local mock of the Google Forms API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='Extra random seconds, uniform in [0, jitter]')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=0, help='Retry-After seconds sent with 429 responses')
+    args = parser.parse_args()
+
+    server = MockFormsServer(args.host, args.port, args.latency, args.latency_jitter,
+                             args.error_rate, args.throttle_rate, args.retry_after)
+    print(f"Mock Forms API listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"Requests served: {server.request_counts()}")
+
+
+if __name__ == "__main__":
+    main()
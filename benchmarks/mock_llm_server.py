@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an OpenAI-compatible chat completions API, used by the
+question generation tests. It answers POST /v1/chat/completions by reading
+the vocabulary list at the end of the prompt and returning one well-formed
+MCQ per entry, with configurable latency, 503 errors and malformed replies.
+
+Usage: python benchmarks/mock_llm_server.py [--port 8090] [--latency 0.5] [--invalid-rate 0.1]
+Then run: LLM_API_ENDPOINT=http://127.0.0.1:8090 python utils/question_generator.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VOCABULARY_MARKER = "Begin generating MCQs from the provided vocabulary list:"
+
+
+def make_questions(entries):
+    """One deterministic MCQ per vocabulary entry, using the other entries' meanings as distractors."""
+    meanings = [entry.get('Meaning') or entry.get('Vocabulary', '') for entry in entries]
+    fillers = ["to move quickly", "a feeling of regret", "very old-fashioned", "to make something smaller"]
+    questions = []
+    for position, entry in enumerate(entries):
+        correct = position % 4
+        distractors = [meaning for meaning in meanings if meaning != meanings[position]] + fillers
+        options = distractors[:3]
+        options.insert(correct, meanings[position])
+        questions.append({
+            "question": f"Which meaning best fits '{entry.get('Vocabulary')}'?",
+            "options": {f"option-{i + 1}": option for i, option in enumerate(options)},
+            "correct_option": f"option-{correct + 1}",
+            "explanation": f"'{entry.get('Vocabulary')}' means {meanings[position]}."
+        })
+    return questions
+
+
+class MockLLMServer:
+    """Chat completions stub on a background thread.
+
+    `error_rate` and `invalid_rate` are the fractions of requests answered
+    with a 503 or with text that is not the requested JSON list.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, invalid_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.invalid_rate = invalid_rate
+        self.prompts = []
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _complete(self, body):
+        """Return (status, payload) for one chat completion request."""
+        prompt = body['messages'][-1]['content']
+        with self._lock:
+            self.requests += 1
+            self.prompts.append(prompt)
+            roll = self._random.random()
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.error_rate:
+            return 503, {'error': {'message': 'The model is overloaded'}}
+        if roll < self.error_rate + self.invalid_rate:
+            content = "Sure! Here are your questions:\n[{\"question\": "
+        else:
+            entries = json.loads(prompt.split(VOCABULARY_MARKER, 1)[1])
+            content = json.dumps(make_questions(entries), ensure_ascii=False)
+        return 200, {
+            'object': 'chat.completion',
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}]
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path.split('?')[0] == '/v1/chat/completions':
+                    status, payload = server._complete(json.loads(data))
+                else:
+                    status, payload = 404, {'error': {'message': 'Not found'}}
+                encoded = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local stand-in for an OpenAI-compatible chat completions API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--invalid-rate', type=float, default=0.0, help='Fraction of replies that are not valid JSON')
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.error_rate, args.invalid_rate)
+    print(f"Mock LLM API listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"Requests served: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,79 @@ DEFAULT_FORM_DESCRIPTION = "Complete this quiz and receive immediate feedback wi
 POINTS_PER_QUESTION = 1
 ENABLE_IMMEDIATE_FEEDBACK = True
 SHOW_CORRECT_ANSWERS = True
-COLLECT_EMAIL_ADDRESSES = False
+COLLECT_EMAIL_ADDRESSES = False  # Record respondents' verified emails (needed for --adaptive --learner)
 
 # API settings
 OAUTH_PORT = 50699
 REQUEST_TIMEOUT = 30
 
+# HTTP transport settings
+HTTP_POOL_SIZE = 10            # Max pooled keep-alive connections to the Forms API
+HTTP_KEEP_ALIVE = True
+GZIP_REQUEST_MIN_BYTES = None  # Gzip request bodies at least this large (None disables)
+
+# Quota and retry settings (match your Google Cloud project's Forms API quota)
+WRITE_QUOTA_PER_MINUTE = 60    # Shared budget for create/batchUpdate requests
+READ_QUOTA_PER_MINUTE = 180    # Shared budget for get/list requests
+RATE_LIMIT_BURST = 5           # Requests allowed back-to-back before throttling
+MAX_RETRIES = 5                # Retries on 429/5xx and connection errors
+RETRY_BACKOFF_BASE = 1.0       # Seconds; doubled each attempt with full jitter
+RETRY_BACKOFF_MAX = 32.0
+
+# Bulk mode settings
+BULK_MAX_WORKERS = 4           # Forms created concurrently by --bulk
+
+# Batch submission settings
+BATCH_CHUNK_SIZE = 100         # Questions per batchUpdate; rejected chunks are bisected
+BATCH_MAX_BYTES = 1000000      # Serialized bytes per batchUpdate body (None = count limit only)
+
+# Idempotency cache: unchanged input reuses the previously created form
+FORM_CACHE_PATH = ".cache/form_cache.json"  # Set to None to disable
+FORM_CACHE_TTL_DAYS = 30       # Entries older than this are evicted
+
+# Pre-flight validation: results are cached per file by mtime and size
+VALIDATION_CACHE_PATH = ".cache/validation_cache.json"  # Set to None to disable
+VALIDATION_WORKERS = None      # Processes for validating many files (None = CPU count)
+
+# Duplicate questions: "off", "report" (print them) or "drop" (also leave repeats out of a form)
+DEDUP_MODE = "off"
+DEDUP_THRESHOLD = 0.8          # Minimum estimated similarity for a near-duplicate
+QUESTION_INDEX_PATH = ".cache/question_index.json"  # Persistent question bank index
+
+# Split combined forms into parts of at most this many questions (None = one form)
+MAX_QUESTIONS_PER_FORM = None
+
+# JSON encoding: "auto" uses orjson when installed, "json" forces the standard library
+JSON_BACKEND = "auto"
+
+# LLM question generation (utils/question_generator.py); LLM_API_ENDPOINT, LLM_MODEL
+# and LLM_API_KEY environment variables override the endpoint, model and key
+LLM_ENDPOINT = "https://api.openai.com"   # Any OpenAI-compatible chat completions server
+LLM_MODEL = "gpt-4o-mini"
+LLM_MAX_WORKERS = 4            # Model calls in flight
+LLM_MAX_ATTEMPTS = 3           # Re-asks when a reply is not a valid MCQ list
+LLM_TIMEOUT = 120              # Seconds per model call
+PROMPT_TEMPLATE_PATH = "docs/questionGeneratedPrompt.md"
+GENERATION_CACHE_PATH = ".cache/generation_cache.json"  # Replies per vocabulary entry; None to disable
+PROMPT_TOKEN_BUDGET = None     # Estimated tokens per call to pack entries into (None = one call per chunk file)
+PROMPT_REPLY_TOKENS_PER_ENTRY = 200  # Reply tokens reserved per entry (one MCQ with explanation)
+PROMPT_PACK_ACROSS_DATES = False     # Let one packed call mix vocabulary from different dates
+
+# Response harvesting (utils/response_harvester.py)
+RESPONSES_STORE_DIR = "material/responses"  # Part files plus per-form watermarks
+RESPONSES_STORE_FORMAT = "auto"  # "parquet", "csv", or "auto" (parquet when pyarrow/fastparquet is installed)
+RESPONSES_PAGE_SIZE = 5000     # forms.responses.list page size (API maximum)
+RESPONSES_COMPACT_PARTS = 64   # After a harvest, merge the part files into one once there are this many
+HARVEST_MAX_WORKERS = 8        # Forms fetched concurrently
+ANALYSIS_DIR = "material/analysis"  # Item analysis reports (utils/item_analysis.py)
+
+# Adaptive quizzes (main.py --adaptive): per-word review schedule of each learner
+ADAPTIVE_STATE_DIR = ".cache/learners"
+ADAPTIVE_BANK_CACHE_PATH = ".cache/adaptive_bank.json"  # Words of each question file by mtime and size; None to disable
+REVIEW_MIN_INTERVAL_DAYS = 1   # A missed word comes back after this long
+REVIEW_MAX_INTERVAL_DAYS = 60  # Correct answers double the interval up to this
+ERROR_URGENCY_DAYS = 7         # A word always answered wrong is reviewed this much earlier
+
 # File paths (relative to project root)
 CSV_FILE_PATH="material/reading.csv"
 JSON_PATH_DIR="material/json"
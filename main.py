@@ -7,13 +7,37 @@ import os
 import json
 import sys
 import argparse
+import cProfile
+import fnmatch
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
-from utils.gg_form_api import get_credentials, SERVICE_ENDPOINT
+from utils.gg_form_api import get_credential_provider, SERVICE_ENDPOINT
+from utils.http_transport import HttpTransport
+from utils.rate_limiter import get_shared_bucket
+from utils.form_cache import FormCache, form_cache_key
+from utils.form_sync import plan_sync_requests
+from utils.question import parse_questions
+from utils.question_index import DuplicateFilter, QuestionIndex, print_duplicates
+from utils.question_validator import ValidationCache, print_validation_report, validate_files
+from utils.quiz_assembler import BankCache, LearnerState, QuizAssembler, load_bank, words_by_form_item
+from utils.response_harvester import ResponseStore
+from utils import json_backend
+from utils.metrics import RunMetrics, print_phase_timings, timed, track_form
+from utils.batch_submitter import CONTENT_ERROR_STATUS_CODES, ChunkedSubmitter, SENT, REJECTED, FAILED
+from utils.request_planner import (
+    build_description_request, plan_form_requests
+)
+from utils.request_log import (
+    AckLog, ack_log_path, compile_form_records, load_acks, read_records_by_form,
+    write_records
+)
 import requests
 
 # Import configuration
@@ -26,27 +50,101 @@ except ImportError:
     SHOW_CORRECT_ANSWERS = True
     COLLECT_EMAIL_ADDRESSES = False
     REQUEST_TIMEOUT = 30
+    HTTP_POOL_SIZE = 10
+    HTTP_KEEP_ALIVE = True
+    GZIP_REQUEST_MIN_BYTES = None
+    WRITE_QUOTA_PER_MINUTE = 60
+    READ_QUOTA_PER_MINUTE = 180
+    RATE_LIMIT_BURST = 5
+    MAX_RETRIES = 5
+    RETRY_BACKOFF_BASE = 1.0
+    RETRY_BACKOFF_MAX = 32.0
+    BULK_MAX_WORKERS = 4
+    BATCH_CHUNK_SIZE = 100
+    BATCH_MAX_BYTES = 1000000
+    FORM_CACHE_PATH = ".cache/form_cache.json"
+    FORM_CACHE_TTL_DAYS = 30
+    VALIDATION_CACHE_PATH = ".cache/validation_cache.json"
+    VALIDATION_WORKERS = None
+    DEDUP_MODE = "off"
+    DEDUP_THRESHOLD = 0.8
+    QUESTION_INDEX_PATH = ".cache/question_index.json"
+    MAX_QUESTIONS_PER_FORM = None
+    RESPONSES_STORE_DIR = "material/responses"
+    ADAPTIVE_STATE_DIR = ".cache/learners"
+    ADAPTIVE_BANK_CACHE_PATH = ".cache/adaptive_bank.json"
     DEFAULT_FORM_DESCRIPTION = "Complete this quiz and receive immediate feedback with explanations."
 
+# Directory listings longer than this are truncated in the console output
+MAX_LISTED_FILES = 20
+
 
 class MCQFormGenerator:
-    def __init__(self):
+    def __init__(self, pool_size=None, force=False, credential_provider=None, endpoint=None, metrics=None,
+                 dedup=None, form_cache_path=FORM_CACHE_PATH, rate_limit=True):
         self.credentials = None
-        self.headers = None
+        self.metrics = metrics or RunMetrics()
+        self.credential_provider = credential_provider or get_credential_provider()
+        self.force = force
+        self.form_cache = FormCache(form_cache_path, FORM_CACHE_TTL_DAYS) if form_cache_path else None
+        # 'off', 'report' (print repeated questions) or 'drop' (also leave repeats out of the form)
+        self.dedup = dedup or DEDUP_MODE
+        self.question_index = QuestionIndex(QUESTION_INDEX_PATH, DEDUP_THRESHOLD) if self.dedup != 'off' else None
+        self._auth_lock = threading.Lock()
+        self._local = threading.local()
+        self.transport = HttpTransport(
+            endpoint or SERVICE_ENDPOINT,
+            pool_size=pool_size or HTTP_POOL_SIZE,
+            keep_alive=HTTP_KEEP_ALIVE,
+            gzip_min_bytes=GZIP_REQUEST_MIN_BYTES,
+            timeout=REQUEST_TIMEOUT,
+            # rate_limit=False skips the shared quota buckets, e.g. against a local mock server
+            write_limiter=get_shared_bucket('forms-write', WRITE_QUOTA_PER_MINUTE, RATE_LIMIT_BURST) if rate_limit else None,
+            read_limiter=get_shared_bucket('forms-read', READ_QUOTA_PER_MINUTE, RATE_LIMIT_BURST) if rate_limit else None,
+            max_retries=MAX_RETRIES,
+            backoff_base=RETRY_BACKOFF_BASE,
+            backoff_max=RETRY_BACKOFF_MAX,
+            metrics=self.metrics
+        )
         
+    @timed('authenticate')
     def authenticate(self):
-        """Authenticate and set up headers for API requests."""
-        self.credentials = get_credentials()
-        self.headers = {
-            'Authorization': f'Bearer {self.credentials.token}',
-            'Content-Type': 'application/json'
-        }
-        
+        """Authenticate and let the transport pull a fresh bearer token for every request."""
+        self.credentials = self.credential_provider.get_credentials()
+        self.transport.auth = self.credential_provider
+
+    def ensure_authenticated(self):
+        """Authenticate once and share the credentials across concurrent form builds."""
+        with self._auth_lock:
+            if not self.credentials:
+                self.authenticate()
+        return self.credentials is not None
+
+    def _post(self, path, body):
+        """POST a JSON body to the Forms API, counting round trips for the current form."""
+        self._local.round_trips = getattr(self._local, 'round_trips', 0) + 1
+        return self.transport.post(path, json_body=body)
+
+    def _get(self, path):
+        """GET a Forms API resource, counting round trips for the current form."""
+        self._local.round_trips = getattr(self._local, 'round_trips', 0) + 1
+        return self.transport.get(path)
+
+    def _reset_round_trips(self):
+        self._local.round_trips = 0
+
+    def _round_trips(self):
+        return getattr(self._local, 'round_trips', 0)
+
+    @timed('load_questions')
     def load_questions(self, json_file_path):
-        """Load questions from JSON file."""
+        """Load and validate questions from JSON file, skipping invalid entries."""
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                questions = json.load(f)
+            raw_questions = json_backend.load_file(json_file_path)
+            questions, errors = parse_questions(raw_questions, json_file_path)
+            for index, message in errors:
+                location = f"question #{index + 1}" if index is not None else "file"
+                print(f"Warning: Skipping {location} in {json_file_path}: {message}")
             print(f"Loaded {len(questions)} questions from {json_file_path}")
             return questions
         except FileNotFoundError:
@@ -56,6 +154,7 @@ class MCQFormGenerator:
             print(f"Error: Invalid JSON in {json_file_path}: {e}")
             return []
     
+    @timed('create_quiz_form')
     def create_quiz_form(self, title, description=""):
         """Create a new Google Form configured as a quiz."""
         # Step 1: Create basic form with title only
@@ -66,33 +165,15 @@ class MCQFormGenerator:
         }
         
         try:
-            response = requests.post(f'{SERVICE_ENDPOINT}/v1/forms', 
-                                   headers=self.headers, 
-                                   json=form_data,
-                                   timeout=REQUEST_TIMEOUT)
+            response = self._post('/v1/forms', form_data)
             response.raise_for_status()
             form = response.json()
             form_id = form['formId']
             
-            # Step 2: Update form with description and quiz settings if needed
+            # Step 2: Update form with description if needed
             if description:
-                update_data = {
-                    "requests": [{
-                        "updateFormInfo": {
-                            "info": {
-                                "description": description
-                            },
-                            "updateMask": "description"
-                        }
-                    }]
-                }
-                
-                update_response = requests.post(
-                    f'{SERVICE_ENDPOINT}/v1/forms/{form_id}:batchUpdate',
-                    headers=self.headers,
-                    json=update_data,
-                    timeout=REQUEST_TIMEOUT
-                )
+                update_data = {"requests": [build_description_request(description)]}
+                update_response = self._post(f'/v1/forms/{form_id}:batchUpdate', update_data)
                 update_response.raise_for_status()
             
             print(f"Quiz form created successfully!")
@@ -106,226 +187,187 @@ class MCQFormGenerator:
                 print(f"Response: {e.response.text}")
             return None
     
-    def convert_option_key_to_index(self, option_key):
-        """Convert option key (option-1, option-2, etc.) to zero-based index."""
-        try:
-            return int(option_key.split('-')[1]) - 1
-        except (IndexError, ValueError):
-            return 0
-    
-    def add_all_questions_batch(self, form_id, questions):
-        """Add all questions in a single batch request to avoid index conflicts."""
-        # Prepare all question requests
-        requests_list = []
-        
-        for i, question_data in enumerate(questions):
-            # Prepare options for Google Forms
-            options = []
-            correct_option_index = None
-            
-            # Convert options to list format expected by Google Forms
-            for key in ['option-1', 'option-2', 'option-3', 'option-4']:
-                if key in question_data['options']:
-                    options.append({"value": question_data['options'][key]})
-                    
-                    # Check if this is the correct option
-                    if key == question_data['correct_option']:
-                        correct_option_index = len(options) - 1
-            
-            # Create question request
-            question_request = {
-                "createItem": {
-                    "item": {
-                        "title": question_data['question'],
-                        "description": "",
-                        "questionItem": {
-                            "question": {
-                                "required": True,
-                                "grading": {
-                                    "pointValue": POINTS_PER_QUESTION,
-                                    "correctAnswers": {
-                                        "answers": [{"value": options[correct_option_index]["value"]}]
-                                    },
-                                    "whenRight": {
-                                        "text": "Correct! " + question_data.get('explanation', 'Well done!')
-                                    },
-                                    "whenWrong": {
-                                        "text": question_data.get('explanation', 'Please review the explanation.')
-                                    }
-                                },
-                                "choiceQuestion": {
-                                    "type": "RADIO",
-                                    "options": options
-                                }
-                            }
-                        }
-                    },
-                    "location": {"index": i}
-                }
-            }
-            requests_list.append(question_request)
-        
-        # Send all questions in one batch
-        batch_data = {"requests": requests_list}
-        
+    def print_rejected_questions(self, rejected):
+        """Print the source file and position of each question the API rejected."""
+        if not rejected:
+            return
+        print(f"Rejected Questions: {len(rejected)}")
+        for source_file, index in rejected:
+            print(f"  - {source_file} question #{index + 1}")
+
+    def print_connection_stats(self):
+        """Print HTTP connection reuse counters for this generator's transport."""
+        stats = self.transport.connection_stats()
+        print(f"HTTP Requests: {stats['requests']} "
+              f"(connections opened: {stats['connections_opened']}, "
+              f"reused: {stats['connections_reused']}, "
+              f"gzipped: {stats['gzipped_requests']}, "
+              f"retries: {stats['retries']}, "
+              f"throttled: {stats['throttle_wait_seconds']:.1f}s)")
+
+    def build_question_item(self, question):
+        """Return the cached Forms item body (without location) for one question."""
+        return question.build_item(POINTS_PER_QUESTION)
+
+    def _send_batch(self, form_id, requests_list):
+        """Send one batchUpdate, classifying the outcome for the chunked submitter."""
         try:
-            response = requests.post(
-                f'{SERVICE_ENDPOINT}/v1/forms/{form_id}:batchUpdate',
-                headers=self.headers,
-                json=batch_data,
-                timeout=REQUEST_TIMEOUT
-            )
+            response = self._post(f'/v1/forms/{form_id}:batchUpdate', {"requests": requests_list})
             response.raise_for_status()
-            print(f"Successfully added all {len(questions)} questions in batch!")
-            return True
+            return SENT
         except requests.exceptions.RequestException as e:
-            print(f"Error adding questions in batch: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
-            return False
-
-    def add_mcq_question(self, form_id, question_data, question_index):
-        """Add a multiple choice question to the form with correct answer and feedback."""
-        # Prepare options for Google Forms
-        options = []
-        correct_option_index = None
-        
-        # Convert options to list format expected by Google Forms
-        for key in ['option-1', 'option-2', 'option-3', 'option-4']:
-            if key in question_data['options']:
-                options.append({"value": question_data['options'][key]})
-                
-                # Check if this is the correct option
-                if key == question_data['correct_option']:
-                    correct_option_index = len(options) - 1
-        
-        # Create the question item
-        question_item = {
-            "requests": [{
-                "createItem": {
-                    "item": {
-                        "title": question_data['question'],
-                        "description": "",
-                        "questionItem": {
-                            "question": {
-                                "required": True,
-                                "grading": {
-                                    "pointValue": POINTS_PER_QUESTION,
-                                    "correctAnswers": {
-                                        "answers": [{"value": options[correct_option_index]["value"]}]
-                                    },
-                                    "whenRight": {
-                                        "text": "Correct! " + question_data.get('explanation', 'Well done!')
-                                    },
-                                    "whenWrong": {
-                                        "text": question_data.get('explanation', 'Please review the explanation.')
-                                    }
-                                },
-                                "choiceQuestion": {
-                                    "type": "RADIO",
-                                    "options": options
-                                }
-                            }
-                        }
-                    },
-                    "location": {"index": question_index}
-                }
-            }]
-        }
+            print(f"Error sending batch of {len(requests_list)} requests: {e}")
+            response = getattr(e, 'response', None)
+            if response is not None:
+                print(f"Response: {response.text}")
+                if response.status_code in CONTENT_ERROR_STATUS_CODES:
+                    return REJECTED
+            return FAILED
+
+    def populate_form(self, form_id, questions, description=""):
+        """Apply description, quiz settings and all questions via planned, chunked batchUpdates.
+
+        Questions are packed into batches of at most BATCH_CHUNK_SIZE questions
+        and BATCH_MAX_BYTES serialized bytes, with the form settings in the
+        first batch. A rejected chunk is bisected to isolate the bad
+        questions, reported by their (source_file, index).
+        Batches are timed as phases: the settings sent on their own as
+        'configure_quiz_settings', bisection retries as 'fallback' and the
+        rest, including the first batch that carries the settings along with
+        its questions, as 'question_batch'.
+        Returns the submitter result dict.
+        """
+        items = [(self.build_question_item(question), question.source) for question in questions]
         
-        try:
-            response = requests.post(
-                f'{SERVICE_ENDPOINT}/v1/forms/{form_id}:batchUpdate',
-                headers=self.headers,
-                json=question_item,
-                timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            print(f"Added question {question_index + 1}: {question_data['question'][:50]}...")
-            return True
-        except requests.exceptions.RequestException as e:
-            print(f"Error adding question {question_index + 1}: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
-            return False
-    
-    def configure_quiz_settings(self, form_id):
-        """Configure quiz settings for assessment and feedback."""
-        settings_update = {
-            "requests": [{
-                "updateSettings": {
-                    "settings": {
-                        "quizSettings": {
-                            "isQuiz": True
-                        }
-                    },
-                    "updateMask": "quizSettings.isQuiz"
-                }
-            }]
-        }
+        def send_batch(requests_list):
+            if not any('createItem' in request for request in requests_list):
+                phase = 'configure_quiz_settings'
+            else:
+                phase = 'fallback' if submitter.fallback else 'question_batch'
+            with self.metrics.phase(phase):
+                return self._send_batch(form_id, requests_list)
         
-        try:
-            response = requests.post(
-                f'{SERVICE_ENDPOINT}/v1/forms/{form_id}:batchUpdate',
-                headers=self.headers,
-                json=settings_update,
-                timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            print("Quiz settings configured successfully!")
-            return True
-        except requests.exceptions.RequestException as e:
-            print(f"Error configuring quiz settings: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
-            return False
-    
+        print(f"Submitting form settings + {len(questions)} questions in chunks of up to {BATCH_CHUNK_SIZE}...")
+        submitter = ChunkedSubmitter(send_batch, chunk_size=BATCH_CHUNK_SIZE, max_batch_bytes=BATCH_MAX_BYTES)
+        prefix = plan_form_requests(description, quiz=True, collect_email=COLLECT_EMAIL_ADDRESSES)
+        result = submitter.submit(items, prefix_requests=prefix)
+        
+        if not result['prefix_applied']:
+            print("Warning: Failed to configure quiz settings")
+        if result['added'] == len(questions):
+            print(f"Successfully added all {len(questions)} questions!")
+        if result['failed']:
+            print(f"Warning: {len(result['failed'])} questions were not sent because the API became unavailable")
+        return result
+
+    def remove_duplicates(self, questions, duplicate_filter=None):
+        """Report repeated questions and, in 'drop' mode, leave them out.
+
+        Pass the same `duplicate_filter` for every file of one form so questions
+        are also compared across files. Returns the questions to use.
+        """
+        if self.question_index is None or not questions:
+            return questions
+        with self.metrics.phase('dedup'):
+            unique, duplicates = (duplicate_filter or DuplicateFilter(self.question_index)).filter(questions)
+            self.question_index.save()
+        print_duplicates(duplicates, dropped=self.dedup == 'drop')
+        return unique if self.dedup == 'drop' else questions
+
+    def new_duplicate_filter(self):
+        return DuplicateFilter(self.question_index) if self.question_index is not None else None
+
+    def load_question_files(self, json_file_paths):
+        """Load several question files; returns (questions, per-file summaries)."""
+        combined_questions = []
+        file_info = []
+        duplicate_filter = self.new_duplicate_filter()
+        for json_file_path in json_file_paths:
+            questions = self.remove_duplicates(self.load_questions(json_file_path), duplicate_filter)
+            if questions:
+                combined_questions.extend(questions)
+                filename = Path(json_file_path).stem
+                file_info.append(f"{filename} ({len(questions)} questions)")
+            else:
+                print(f"Warning: No questions loaded from {json_file_path}")
+        return combined_questions, file_info
+
+    def default_form_info(self, json_file_paths, file_info, question_count, form_title=None, form_description="",
+                          combined=False, part=None):
+        """Return the (title, description) a form gets when built from these files."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        if not combined:
+            return form_title or f"MCQ Quiz - {Path(json_file_paths[0]).stem} ({timestamp})", form_description
+        if not form_title:
+            form_title = f"Combined MCQ Quiz ({len(json_file_paths)} files, {question_count} questions) - {timestamp}"
+        if part is not None:
+            form_title = f"{form_title} - Part {part}"
+        # Add file info to description
+        files_summary = "Sources: " + " | ".join(file_info)
+        if form_description:
+            form_description = f"{form_description}\n\n{files_summary}"
+        else:
+            form_description = files_summary
+        return form_title, form_description
+
+    def _form_cache_key(self, questions, form_title, form_description, part=None):
+        """Key on the title and description as given, before timestamps and source lists are added."""
+        settings = {'quiz': True, 'points_per_question': POINTS_PER_QUESTION, 'collect_email': COLLECT_EMAIL_ADDRESSES}
+        if part is not None:
+            settings['part'] = part
+        return form_cache_key([question.to_dict() for question in questions], form_title, form_description, settings)
+
+    def _cached_form(self, cache_key):
+        """Return the cached result for unchanged input, unless caching is off or forced."""
+        if self.form_cache is None or self.force:
+            return None
+        cached = self.form_cache.get(cache_key)
+        if cached:
+            print(f"Input unchanged: reusing form {cached['form_id']} (use --force to recreate)")
+            print(f"Edit URL: {cached['edit_url']}")
+            print(f"Response URL: {cached['response_url']}")
+            cached['cached'] = True
+            cached['round_trips'] = 0
+        return cached
+
+    def _remember_form(self, cache_key, result):
+        """Cache a form only if every question made it in, so partial forms are retried."""
+        if self.form_cache is not None and result['questions_added'] == result['total_questions']:
+            self.form_cache.put(cache_key, result)
+
+    @track_form
     def create_mcq_form_from_json(self, json_file_path, form_title=None, form_description=""):
         """Main method to create a complete MCQ form from JSON data."""
-        # Authenticate
-        self.authenticate()
-        if not self.credentials:
-            print("Authentication failed!")
-            return None
-        
         # Load questions
-        questions = self.load_questions(json_file_path)
+        questions = self.remove_duplicates(self.load_questions(json_file_path))
         if not questions:
             return None
         
+        # Identical input reuses the previously created form without any API call
+        cache_key = self._form_cache_key(questions, form_title, form_description)
+        cached = self._cached_form(cache_key)
+        if cached:
+            return cached
+        
+        # Authenticate
+        if not self.ensure_authenticated():
+            print("Authentication failed!")
+            return None
+        
         # Generate form title if not provided
-        if not form_title:
-            filename = Path(json_file_path).stem
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-            form_title = f"MCQ Quiz - {filename} ({timestamp})"
+        form_title, form_description = self.default_form_info([json_file_path], [], len(questions),
+                                                              form_title, form_description)
         
-        # Create the form
-        form = self.create_quiz_form(form_title, form_description)
+        # Create the form, then apply description, quiz settings and questions in one batch
+        self._reset_round_trips()
+        form = self.create_quiz_form(form_title)
         if not form:
             return None
         
         form_id = form['formId']
-        
-        # Configure quiz settings FIRST (before adding questions with grading)
-        print("Configuring quiz settings...")
-        if not self.configure_quiz_settings(form_id):
-            print("Warning: Failed to configure quiz settings")
-        
-        # Add all questions in batch to avoid index conflicts
-        print(f"Adding {len(questions)} questions in batch...")
-        if self.add_all_questions_batch(form_id, questions):
-            success_count = len(questions)
-            print(f"Successfully added all {success_count} questions!")
-        else:
-            success_count = 0
-            print("Failed to add questions. Trying individual approach as fallback...")
-            
-            # Fallback: Add questions one by one
-            for i, question_data in enumerate(questions):
-                if self.add_mcq_question(form_id, question_data, i):
-                    success_count += 1
-        
-        # Quiz settings already configured above
+        submit_result = self.populate_form(form_id, questions, form_description)
+        success_count = submit_result['added']
+        round_trips = self._round_trips()
         
         print(f"\n=== FORM CREATION SUMMARY ===")
         print(f"Form Title: {form_title}")
@@ -334,77 +376,70 @@ class MCQFormGenerator:
         print(f"Edit URL: https://docs.google.com/forms/d/{form_id}/edit")
         print(f"Response URL: {form['responderUri']}")
         print(f"Assessment: Enabled with explanations after submission")
+        self.print_rejected_questions(submit_result['rejected'])
+        print(f"API Round Trips: {round_trips}")
+        self.print_connection_stats()
         
-        return {
+        result = {
             'form_id': form_id,
             'edit_url': f"https://docs.google.com/forms/d/{form_id}/edit",
             'response_url': form['responderUri'],
             'questions_added': success_count,
-            'total_questions': len(questions)
+            'total_questions': len(questions),
+            'rejected_questions': submit_result['rejected'],
+            'round_trips': round_trips
         }
+        self._remember_form(cache_key, result)
+        return result
     
+    @track_form
     def create_combined_mcq_form_from_multiple_json(self, json_file_paths, form_title=None, form_description=""):
         """Create a single MCQ form combining questions from multiple JSON files."""
-        # Authenticate
-        self.authenticate()
-        if not self.credentials:
-            print("Authentication failed!")
-            return None
-        
         # Load and combine all questions
-        combined_questions = []
-        file_info = []
-        
-        for json_file_path in json_file_paths:
-            questions = self.load_questions(json_file_path)
-            if questions:
-                combined_questions.extend(questions)
-                filename = Path(json_file_path).stem
-                file_info.append(f"{filename} ({len(questions)} questions)")
-            else:
-                print(f"Warning: No questions loaded from {json_file_path}")
+        combined_questions, file_info = self.load_question_files(json_file_paths)
         
         if not combined_questions:
             print("No questions found in any of the provided files!")
             return None
         
-        # Generate form title if not provided
-        if not form_title:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-            form_title = f"Combined MCQ Quiz ({len(json_file_paths)} files, {len(combined_questions)} questions) - {timestamp}"
+        return self.create_form_from_questions(json_file_paths, combined_questions, file_info,
+                                               form_title, form_description)
+    
+    @track_form
+    def create_form_from_questions(self, json_file_paths, combined_questions, file_info, form_title=None,
+                                   form_description="", part=None):
+        """Create one combined form from questions already loaded from `json_file_paths`.
+
+        `form_title` and `form_description` are taken as the user gave them;
+        the default title, `part` suffix and source list are added here.
+        """
+        # Identical input reuses the previously created form without any API call
+        cache_key = self._form_cache_key(combined_questions, form_title, form_description, part)
+        cached = self._cached_form(cache_key)
+        if cached:
+            return cached
         
-        # Add file info to description
-        files_summary = "Sources: " + " | ".join(file_info)
-        if form_description:
-            form_description = f"{form_description}\n\n{files_summary}"
-        else:
-            form_description = files_summary
+        # Authenticate
+        if not self.ensure_authenticated():
+            print("Authentication failed!")
+            return None
+        
+        # Generate form title if not provided and list the sources in the description
+        form_title, form_description = self.default_form_info(json_file_paths, file_info, len(combined_questions),
+                                                              form_title, form_description, combined=True,
+                                                              part=part)
         
-        # Create the form
-        form = self.create_quiz_form(form_title, form_description)
+        # Create the form, then apply description, quiz settings and questions in one batch
+        self._reset_round_trips()
+        form = self.create_quiz_form(form_title)
         if not form:
             return None
         
         form_id = form['formId']
-        
-        # Configure quiz settings
-        print("Configuring quiz settings...")
-        if not self.configure_quiz_settings(form_id):
-            print("Warning: Failed to configure quiz settings")
-        
-        # Add all questions in batch
-        print(f"Adding {len(combined_questions)} questions from {len(json_file_paths)} files in batch...")
-        if self.add_all_questions_batch(form_id, combined_questions):
-            success_count = len(combined_questions)
-            print(f"Successfully added all {success_count} questions!")
-        else:
-            success_count = 0
-            print("Failed to add questions. Trying individual approach as fallback...")
-            
-            # Fallback: Add questions one by one
-            for i, question_data in enumerate(combined_questions):
-                if self.add_mcq_question(form_id, question_data, i):
-                    success_count += 1
+        print(f"Adding {len(combined_questions)} questions from {len(json_file_paths)} files...")
+        submit_result = self.populate_form(form_id, combined_questions, form_description)
+        success_count = submit_result['added']
+        round_trips = self._round_trips()
         
         print(f"\n=== COMBINED FORM CREATION SUMMARY ===")
         print(f"Form Title: {form_title}")
@@ -416,16 +451,473 @@ class MCQFormGenerator:
         print(f"Edit URL: https://docs.google.com/forms/d/{form_id}/edit")
         print(f"Response URL: {form['responderUri']}")
         print(f"Assessment: Enabled with explanations after submission")
+        self.print_rejected_questions(submit_result['rejected'])
+        print(f"API Round Trips: {round_trips}")
+        self.print_connection_stats()
         
-        return {
+        result = {
             'form_id': form_id,
             'edit_url': f"https://docs.google.com/forms/d/{form_id}/edit",
             'response_url': form['responderUri'],
             'questions_added': success_count,
             'total_questions': len(combined_questions),
-            'source_files': json_file_paths
+            'source_files': json_file_paths,
+            'rejected_questions': submit_result['rejected'],
+            'round_trips': round_trips
+        }
+        self._remember_form(cache_key, result)
+        return result
+
+    @timed('get_form')
+    def get_form(self, form_id):
+        """Fetch a form with its current items."""
+        try:
+            response = self._get(f'/v1/forms/{form_id}')
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching form {form_id}: {e}")
+            if hasattr(e, 'response') and e.response is not None:
+                print(f"Response: {e.response.text}")
+            return None
+
+    @track_form
+    def sync_form_from_json(self, form_id, json_file_paths):
+        """Bring an existing form in line with JSON questions using one minimal batchUpdate."""
+        questions = []
+        for json_file_path in json_file_paths:
+            questions.extend(self.load_questions(json_file_path))
+        if not questions:
+            print("No questions found in any of the provided files!")
+            return None
+        
+        if not self.ensure_authenticated():
+            print("Authentication failed!")
+            return None
+        
+        self._reset_round_trips()
+        form = self.get_form(form_id)
+        if not form:
+            return None
+        
+        desired_items = [self.build_question_item(question) for question in questions]
+        requests_list, counts = plan_sync_requests(form.get('items', []), desired_items)
+        if requests_list and not form.get('settings', {}).get('quizSettings', {}).get('isQuiz'):
+            requests_list = plan_form_requests(quiz=True, collect_email=COLLECT_EMAIL_ADDRESSES) + requests_list
+        
+        if not requests_list:
+            print("Form is already up to date; nothing to change.")
+        else:
+            print(f"Syncing form {form_id}: {counts['created']} to create, {counts['updated']} to update, "
+                  f"{counts['deleted']} to delete, {counts['moved']} to move...")
+            if self._send_batch(form_id, requests_list) != SENT:
+                print("Sync failed; the form was left unchanged.")
+                return None
+        round_trips = self._round_trips()
+        
+        print(f"\n=== FORM SYNC SUMMARY ===")
+        print(f"Form ID: {form_id}")
+        print(f"Questions: {len(questions)} ({counts['unchanged']} unchanged)")
+        print(f"Created: {counts['created']}, Updated: {counts['updated']}, "
+              f"Deleted: {counts['deleted']}, Moved: {counts['moved']}")
+        print(f"Edit URL: https://docs.google.com/forms/d/{form_id}/edit")
+        print(f"Response URL: {form.get('responderUri')}")
+        print(f"API Round Trips: {round_trips}")
+        
+        return dict(counts,
+                    form_id=form_id,
+                    edit_url=f"https://docs.google.com/forms/d/{form_id}/edit",
+                    response_url=form.get('responderUri'),
+                    total_questions=len(questions),
+                    round_trips=round_trips)
+
+    def create_forms_in_bulk(self, jobs, max_workers=None, form_title=None, form_description=""):
+        """Create one form per job concurrently using a bounded worker pool.
+
+        Each job is a (name, [json_file_paths]) tuple; jobs with several files are
+        combined into a single form. Returns one result row per job, in job order.
+        """
+        max_workers = max(1, min(max_workers or BULK_MAX_WORKERS, len(jobs)))
+        print(f"Creating {len(jobs)} forms with up to {max_workers} concurrent workers...")
+
+        def run_job(name, json_file_paths):
+            title = f"{form_title} - {name}" if form_title else None
+            started = time.perf_counter()
+            try:
+                if len(json_file_paths) == 1:
+                    result = self.create_mcq_form_from_json(json_file_paths[0], title, form_description)
+                else:
+                    result = self.create_combined_mcq_form_from_multiple_json(json_file_paths, title, form_description)
+                error = None if result else "form creation failed"
+            except Exception as e:
+                result, error = None, str(e)
+            return {
+                'name': name,
+                'source_files': json_file_paths,
+                'result': result,
+                'error': error,
+                'elapsed': time.perf_counter() - started
+            }
+
+        rows = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_job, name, paths): i for i, (name, paths) in enumerate(jobs)}
+            for future in as_completed(futures):
+                rows[futures[future]] = future.result()
+
+        self.print_bulk_summary(rows)
+        return rows
+
+    def iter_question_shards(self, json_file_paths, max_questions):
+        """Yield (json_file_paths, questions, file_info) shards of at most `max_questions`.
+
+        Files are loaded one at a time, in order; a file larger than the room
+        left in the current shard is split across consecutive shards.
+        """
+        shard_paths, shard_questions, shard_info = [], [], []
+        duplicate_filter = self.new_duplicate_filter()
+        for json_file_path in json_file_paths:
+            questions = self.remove_duplicates(self.load_questions(json_file_path), duplicate_filter)
+            if not questions:
+                print(f"Warning: No questions loaded from {json_file_path}")
+                continue
+            while questions:
+                room = max_questions - len(shard_questions)
+                taken, questions = questions[:room], questions[room:]
+                shard_paths.append(json_file_path)
+                shard_questions.extend(taken)
+                shard_info.append(f"{Path(json_file_path).stem} ({len(taken)} questions)")
+                if len(shard_questions) == max_questions:
+                    yield shard_paths, shard_questions, shard_info
+                    shard_paths, shard_questions, shard_info = [], [], []
+        if shard_questions:
+            yield shard_paths, shard_questions, shard_info
+
+    def create_sharded_forms(self, json_file_paths, max_questions, max_workers=None, form_title=None,
+                             form_description=""):
+        """Spread the questions of `json_file_paths` over forms of at most `max_questions` each.
+
+        Each shard is submitted to the worker pool as soon as it is loaded, so
+        forms are created while later files are still being read. Returns one
+        row per form in part order, in the same shape as create_forms_in_bulk.
+        """
+        max_workers = max(1, max_workers or BULK_MAX_WORKERS)
+        print(f"Splitting questions into forms of at most {max_questions} questions "
+              f"with up to {max_workers} concurrent workers...")
+
+        def run_shard(part, shard_paths, questions, file_info):
+            started = time.perf_counter()
+            try:
+                result = self.create_form_from_questions(shard_paths, questions, file_info, form_title,
+                                                         form_description, part)
+                error = None if result else "form creation failed"
+            except Exception as e:
+                result, error = None, str(e)
+            return {
+                'name': f"part-{part}",
+                'source_files': shard_paths,
+                'result': result,
+                'error': error,
+                'elapsed': time.perf_counter() - started
+            }
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_shard, part, *shard)
+                       for part, shard in enumerate(self.iter_question_shards(json_file_paths, max_questions), 1)]
+            rows = [future.result() for future in futures]
+
+        if rows:
+            self.print_bulk_summary(rows)
+        else:
+            print("No questions found in any of the provided files!")
+        return rows
+
+    def create_adaptive_form(self, json_file_paths, count, learner=None, store_dir=RESPONSES_STORE_DIR,
+                             state_dir=ADAPTIVE_STATE_DIR, form_title=None, form_description=""):
+        """Create a form of the `count` words a learner most needs to review.
+
+        Harvested responses the learner's saved state has not applied yet are
+        recorded first; without `learner` every respondent's answers are pooled.
+        """
+        bank, words_by_text = load_bank(json_file_paths, BankCache(ADAPTIVE_BANK_CACHE_PATH))
+        if not bank:
+            print("No questions found in any of the provided files!")
+            return None
+        state = LearnerState(learner or 'all', state_dir)
+        assembler = QuizAssembler(bank, state)
+        store = ResponseStore(store_dir)
+        if store.part_files():
+            answers = store.load()
+            if learner:
+                answers = answers[answers['respondent_email'] == learner]
+            applied = assembler.apply_results(answers, words_by_form_item(store.items(), words_by_text))
+            print(f"Applied {applied} new answers from '{store_dir}' to the review schedule of '{state.learner}'")
+
+        questions, source_files = assembler.next_quiz(count)
+        print(f"Picked {len(questions)} of {len(bank)} words for review")
+        file_info = [f"{Path(path).stem} ({sum(1 for q in questions if q.source_file == path)} questions)"
+                     for path in source_files]
+        form_title = form_title or f"Adaptive Review Quiz - {state.learner} ({datetime.now().strftime('%Y-%m-%d %H:%M')})"
+        result = self.create_form_from_questions(source_files, questions, file_info, form_title, form_description)
+        if result:
+            # Only a quiz that was actually created advances the question rotation
+            state.save()
+        return result
+
+    def print_bulk_summary(self, rows):
+        """Print a single summary table for a bulk run."""
+        name_width = max([len(row['name']) for row in rows] + [6])
+        print(f"\n=== BULK FORM CREATION SUMMARY ===")
+        print(f"{'#':>3}  {'Source':<{name_width}}  {'Status':<6}  {'Questions':>9}  {'Trips':>5}  {'Time':>7}  Response URL")
+        for i, row in enumerate(rows, 1):
+            result = row['result']
+            if result:
+                status = "CACHED" if result.get('cached') else "OK"
+                questions = f"{result['questions_added']}/{result['total_questions']}"
+                trips = result['round_trips']
+                url = result['response_url']
+            else:
+                status = "FAILED"
+                questions = trips = "-"
+                url = row['error']
+            print(f"{i:>3}  {row['name']:<{name_width}}  {status:<6}  {questions:>9}  {trips:>5}  {row['elapsed']:>6.1f}s  {url}")
+        succeeded = sum(1 for row in rows if row['result'])
+        print(f"Forms Created: {succeeded}/{len(rows)}")
+        self.print_connection_stats()
+
+    def compile_forms(self, jobs, output_path, form_title=None, form_description=""):
+        """Plan every API call for the given jobs and write them as JSON lines, without network access.
+
+        Jobs are (name, [json_file_paths]) tuples as in bulk mode; a job with
+        several files becomes one combined form. Returns the number of records.
+        """
+        records = []
+        for name, json_file_paths in jobs:
+            questions, file_info = self.load_question_files(json_file_paths)
+            if not questions:
+                print(f"Warning: Skipping {name}: no questions found")
+                continue
+            title = f"{form_title} - {name}" if form_title and len(jobs) > 1 else form_title
+            title, description = self.default_form_info(json_file_paths, file_info, len(questions), title,
+                                                        form_description, combined=len(json_file_paths) > 1)
+            records.extend(compile_form_records(name, title, description, questions,
+                                                POINTS_PER_QUESTION, BATCH_CHUNK_SIZE, BATCH_MAX_BYTES,
+                                                COLLECT_EMAIL_ADDRESSES))
+        if not records:
+            print("No questions found; nothing compiled.")
+            return 0
+        count = write_records(output_path, records)
+        if os.path.exists(ack_log_path(output_path)):
+            # Acknowledgements refer to the old record numbers
+            os.remove(ack_log_path(output_path))
+        forms = sum(1 for record in records if record['op'] == 'create')
+        print(f"\nCompiled {forms} forms into {count} API calls: {output_path}")
+        print(f"Send them with: python main.py --replay {output_path}")
+        return count
+
+    @track_form
+    def replay_form(self, form_key, records, acks, ack_log):
+        """Send one compiled form's records in order, skipping acknowledged ones.
+
+        Batches go through the chunked submitter, so a rejected batch is bisected
+        and later indices stay correct. Stops at the first unavailable-API error,
+        leaving the rest for the next replay.
+        """
+        create = records[0]
+        create_ack = acks.get(create['record'])
+        if create_ack:
+            form_id, response_url = create_ack['form_id'], create_ack.get('response_url')
+        else:
+            form = self.create_quiz_form(create['body']['info']['title'])
+            if not form:
+                return None
+            form_id, response_url = form['formId'], form.get('responderUri')
+            ack_log.append({'record': create['record'], 'form': form_key, 'status': 'done',
+                            'form_id': form_id, 'response_url': response_url})
+
+        added = sum(acks.get(record['record'], {}).get('added', 0) for record in records[1:])
+        rejected = [source for record in records[1:] for source in acks.get(record['record'], {}).get('rejected', [])]
+        for record in records[1:]:
+            ack = acks.get(record['record'], {})
+            if ack.get('status') == 'done':
+                continue
+            requests_list = record['body']['requests']
+            prefix = [request for request in requests_list if 'createItem' not in request]
+            items = [(request['createItem']['item'], tuple(source)) for request, source in
+                     zip((request for request in requests_list if 'createItem' in request), record['sources'])]
+            if ack:
+                # Partly sent before: only the items that never went out, and the prefix if still pending
+                pending = set(tuple(source) for source in ack.get('failed', []))
+                items = [item for item in items if item[1] in pending]
+                if ack.get('prefix_applied'):
+                    prefix = []
+
+            def send_batch(requests_list):
+                with self.metrics.phase('fallback' if submitter.fallback else 'question_batch'):
+                    return self._send_batch(form_id, requests_list)
+
+            submitter = ChunkedSubmitter(send_batch, chunk_size=len(items) or 1, max_batch_bytes=BATCH_MAX_BYTES)
+            result = submitter.submit(items, prefix_requests=prefix, start_index=added)
+            added += result['added']
+            rejected.extend(result['rejected'])
+            ack_log.append({
+                'record': record['record'],
+                'form': form_key,
+                'status': 'partial' if result['failed'] else 'done',
+                'added': result['added'],
+                'rejected': [list(source) for source in result['rejected']],
+                'failed': [list(source) for source in result['failed']],
+                'prefix_applied': result['prefix_applied'] or ack.get('prefix_applied', False)
+            })
+            if result['failed']:
+                print(f"Replay of {form_key} stopped at record {record['record']}; re-run to resume.")
+                return None
+
+        return {
+            'form_id': form_id,
+            'edit_url': f"https://docs.google.com/forms/d/{form_id}/edit",
+            'response_url': response_url,
+            'questions_added': added,
+            'total_questions': create.get('questions', added),
+            'rejected_questions': rejected,
+            'round_trips': self._round_trips()
         }
 
+    def replay_request_log(self, path, max_workers=None):
+        """Submit a compiled request log with bounded concurrency, resuming from its ack log.
+
+        Forms are replayed concurrently; records within a form go in order.
+        Returns one result row per form, like bulk mode.
+        """
+        forms = read_records_by_form(path)
+        acks = load_acks(ack_log_path(path))
+        if not self.ensure_authenticated():
+            print("Authentication failed!")
+            return []
+        done = sum(1 for records in forms.values() if all(acks.get(r['record'], {}).get('status') == 'done' for r in records))
+        max_workers = max(1, min(max_workers or BULK_MAX_WORKERS, len(forms) or 1))
+        print(f"Replaying {len(forms)} forms from {path} ({done} already complete) with up to {max_workers} workers...")
+
+        ack_log = AckLog(ack_log_path(path))
+
+        def run_form(form_key, records):
+            started = time.perf_counter()
+            self._reset_round_trips()
+            try:
+                result = self.replay_form(form_key, records, acks, ack_log)
+                error = None if result else "replay incomplete"
+            except Exception as e:
+                result, error = None, str(e)
+            return {
+                'name': form_key,
+                'source_files': records[0].get('sources', []),
+                'result': result,
+                'error': error,
+                'elapsed': time.perf_counter() - started
+            }
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                rows = list(executor.map(lambda entry: run_form(*entry), forms.items()))
+        finally:
+            ack_log.close()
+        self.print_bulk_summary(rows)
+        return rows
+
+
+def _matches_any(relative_path, name, patterns):
+    return any(fnmatch.fnmatch(relative_path.lower(), pattern.lower()) or
+               fnmatch.fnmatch(name.lower(), pattern.lower()) for pattern in patterns)
+
+
+def find_json_files(directory, recursive=False, include=None, exclude=None):
+    """Return the sorted JSON files in a directory, and its sub-folders when `recursive`.
+
+    `include` and `exclude` are case-insensitive glob lists matched against the
+    path relative to `directory` and against the bare name; an excluded folder
+    is not descended into. Hidden files and folders (e.g. .cache) are skipped.
+    """
+    include = include or ['*.json']
+    exclude = exclude or []
+    found = []
+    folders = [directory]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                relative_path = os.path.relpath(entry.path, directory).replace(os.sep, '/')
+                if _matches_any(relative_path, entry.name, exclude):
+                    continue
+                if entry.is_dir():
+                    if recursive:
+                        folders.append(entry.path)
+                elif entry.is_file() and _matches_any(relative_path, entry.name, include):
+                    found.append(entry.path)
+    return sorted(found)
+
+
+def build_bulk_jobs(json_file_paths, directory=None, group_by='file', **discovery):
+    """Build (name, [json_file_paths]) jobs for bulk mode.
+
+    `group_by='file'` makes one job per JSON file. `group_by='date'` makes one
+    job per sub-folder of `directory` (e.g. each date under material/questions),
+    collecting its files with `find_json_files(folder, **discovery)`.
+    """
+    if group_by == 'date':
+        jobs = []
+        for entry in sorted(os.listdir(directory)):
+            folder = os.path.join(directory, entry)
+            if os.path.isdir(folder) and not entry.startswith('.'):
+                folder_files = find_json_files(folder, **discovery)
+                if folder_files:
+                    jobs.append((entry, folder_files))
+        return jobs
+    return [(Path(path).stem if directory is None else os.path.relpath(path, directory), [path])
+            for path in json_file_paths]
+
+
+def write_form_index(rows, index_path):
+    """Write the forms created by a bulk or sharded run as a JSON index."""
+    forms = []
+    for row in rows:
+        result = row['result'] or {}
+        forms.append({
+            'name': row['name'],
+            'source_files': row['source_files'],
+            'status': ('cached' if result.get('cached') else 'ok') if result else 'failed',
+            'form_id': result.get('form_id'),
+            'edit_url': result.get('edit_url'),
+            'response_url': result.get('response_url'),
+            'questions_added': result.get('questions_added'),
+            'total_questions': result.get('total_questions'),
+            'error': row['error']
+        })
+    directory = os.path.dirname(index_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(json_backend.dumps_pretty({'created': datetime.now().isoformat(timespec='seconds'), 'forms': forms}))
+    print(f"Form index written to {index_path}")
+
+
+def preflight_validate(json_file_paths, metrics=None):
+    """Validate every input file before any API call; returns True when all are valid."""
+    started = time.perf_counter()
+    cache = ValidationCache(VALIDATION_CACHE_PATH) if VALIDATION_CACHE_PATH else None
+    if metrics:
+        with metrics.phase('validate'):
+            reports, cached = validate_files(json_file_paths, VALIDATION_WORKERS, cache)
+    else:
+        reports, cached = validate_files(json_file_paths, VALIDATION_WORKERS, cache)
+    if print_validation_report(reports):
+        print("\nNo API calls were made. Fix the files above or re-run with --skip-validation.")
+        return False
+    questions = sum(report['questions'] for report in reports)
+    print(f"Validated {len(reports)} files, {questions} questions "
+          f"({cached} unchanged since last check) in {time.perf_counter() - started:.2f}s")
+    return True
+
 
 def main():
     """Main function to handle command line arguments and create forms."""
@@ -434,15 +926,95 @@ def main():
     parser.add_argument('--title', '-t', help='Form title (optional)')
     parser.add_argument('--description', '-d', default='', help='Form description (optional)')
     parser.add_argument('--directory', '-r', help='Directory path containing JSON files. All JSON files in the directory will be combined into one form')
+    parser.add_argument('--recursive', '-R', action='store_true', help='Also collect JSON files from sub-folders of --directory')
+    parser.add_argument('--include', action='append', metavar='GLOB', help='Only use files matching GLOB (relative path or file name; repeatable, default: *.json)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', help='Skip files and folders matching GLOB (repeatable)')
+    parser.add_argument('--bulk', '-b', action='store_true', help='Create one form per JSON file (or per date folder with --group-by date) concurrently instead of one combined form')
+    parser.add_argument('--group-by', choices=['file', 'date'], default='file', help='Bulk mode grouping: one form per file, or one form per sub-folder of --directory (default: file)')
+    parser.add_argument('--max-questions-per-form', type=int, default=MAX_QUESTIONS_PER_FORM, metavar='N', help='Split the combined questions into several forms of at most N questions each, created concurrently')
+    parser.add_argument('--index', metavar='FILE', help='Write a JSON index of every form created in bulk or split mode to FILE')
+    parser.add_argument('--sync', '-s', metavar='FORM_ID', help='Update an existing form in place to match the JSON file(s) instead of creating a new form')
+    parser.add_argument('--force', '-f', action='store_true', help='Recreate forms even if identical input was already turned into a form')
+    parser.add_argument('--concurrency', '-c', type=int, default=BULK_MAX_WORKERS, help=f'Maximum forms created concurrently in bulk mode (default: {BULK_MAX_WORKERS})')
+    parser.add_argument('--dedup', choices=['off', 'report', 'drop'], default=DEDUP_MODE, help=f'Check for repeated questions across files and the question bank: report them, or drop repeats within a form (default: {DEDUP_MODE})')
+    parser.add_argument('--skip-validation', action='store_true', help='Do not check every input file against the question format before making API calls')
+    parser.add_argument('--adaptive', '-a', type=int, metavar='N', help='Create a review quiz of the N words most due for review, scheduled from harvested responses')
+    parser.add_argument('--learner', metavar='EMAIL', help='With --adaptive: schedule from this respondent\'s answers only (default: all respondents pooled)')
+    parser.add_argument('--compile', metavar='FILE', help='Plan every API call offline and write them to FILE as JSON lines instead of creating forms')
+    parser.add_argument('--overwrite', action='store_true', help='With --compile: replace an existing FILE and its acknowledgement log')
+    parser.add_argument('--replay', metavar='FILE', help='Submit a file written by --compile, resuming after the last acknowledged record')
+    parser.add_argument('--metrics', '-m', metavar='FILE', help='Write a JSON-lines metrics record per form plus a run summary to FILE')
+    parser.add_argument('--profile', nargs='?', const='mcq_profile.prof', metavar='FILE', help='Write a cProfile dump of the run (default: mcq_profile.prof)')
     
     args = parser.parse_args()
     
+    metrics = RunMetrics(args.metrics)
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        return run_from_args(args, metrics)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile written to {args.profile} (inspect with: python -m pstats {args.profile})")
+        summary = metrics.close()
+        if args.metrics:
+            print_phase_timings(summary)
+            print(f"Metrics written to {args.metrics}")
+
+
+def run_from_args(args, metrics):
+    """Run the mode selected on the command line; returns the exit status."""
+    if args.replay:
+        if not os.path.isfile(args.replay):
+            print(f"Error: Request log '{args.replay}' does not exist.")
+            return 1
+        generator = MCQFormGenerator(pool_size=args.concurrency, metrics=metrics)
+        rows = generator.replay_request_log(args.replay, args.concurrency)
+        return 0 if rows and all(row['result'] for row in rows) else 1
+    
+    if args.overwrite and not args.compile:
+        print("Error: --overwrite only applies to --compile.")
+        return 1
+    if args.compile and os.path.exists(args.compile) and not args.overwrite:
+        print(f"Error: '{args.compile}' already exists; use --overwrite to replace it (its acknowledgements are discarded).")
+        return 1
+    
+    if args.max_questions_per_form is not None:
+        if args.max_questions_per_form < 1:
+            print("Error: --max-questions-per-form must be at least 1.")
+            return 1
+        if args.bulk or args.sync or args.compile:
+            print("Error: --max-questions-per-form cannot be combined with --bulk, --sync or --compile.")
+            return 1
+    
+    if args.adaptive is not None:
+        if args.adaptive < 1:
+            print("Error: --adaptive must be at least 1.")
+            return 1
+        if args.bulk or args.sync or args.compile or args.max_questions_per_form:
+            print("Error: --adaptive cannot be combined with --bulk, --sync, --compile or --max-questions-per-form.")
+            return 1
+        if args.learner and not COLLECT_EMAIL_ADDRESSES:
+            print("Error: --learner needs COLLECT_EMAIL_ADDRESSES = True in config/config.py, "
+                  "so quizzes record who answered them.")
+            return 1
+    elif args.learner:
+        print("Error: --learner requires --adaptive.")
+        return 1
+    
+    discovery = {'recursive': args.recursive, 'include': args.include, 'exclude': args.exclude}
+    
     # Check if either json_files or directory is provided
     if not args.json_files and not args.directory:
         print("Error: You must provide either JSON files or a directory path.")
         print("Usage examples:")
         print("  python main.py file1.json,file2.json")
         print("  python main.py -r /path/to/directory")
+        print("  python main.py --replay forms.jsonl")
+        print("  python main.py -r material/questions --adaptive 20 --learner student@example.com")
         return 1
     
     # If directory is provided, get all JSON files from it
@@ -455,21 +1027,35 @@ def main():
             print(f"Error: '{args.directory}' is not a directory.")
             return 1
         
-        # Find all JSON files in the directory
-        json_files_in_dir = []
-        for file in os.listdir(args.directory):
-            if file.lower().endswith('.json'):
-                json_files_in_dir.append(os.path.join(args.directory, file))
+        if args.bulk and args.group_by == 'date':
+            # One combined form per date folder, e.g. material/questions/<date>/
+            jobs = build_bulk_jobs([], args.directory, group_by='date', **discovery)
+            if not jobs:
+                print(f"Error: No sub-folders with JSON files found in '{args.directory}'.")
+                return 1
+            if not args.skip_validation and not preflight_validate([path for _name, paths in jobs for path in paths], metrics):
+                return 1
+            generator = MCQFormGenerator(pool_size=args.concurrency, force=args.force, metrics=metrics,
+                                         dedup=args.dedup)
+            if args.compile:
+                return 0 if generator.compile_forms(jobs, args.compile, args.title, args.description) else 1
+            rows = generator.create_forms_in_bulk(jobs, args.concurrency, args.title, args.description)
+            if args.index:
+                write_form_index(rows, args.index)
+            return 0 if rows and all(row['result'] for row in rows) else 1
+        
+        # Find all JSON files in the directory, sorted for consistent ordering
+        json_file_paths = find_json_files(args.directory, **discovery)
         
-        if not json_files_in_dir:
+        if not json_file_paths:
             print(f"Error: No JSON files found in directory '{args.directory}'.")
             return 1
         
-        # Sort files for consistent ordering
-        json_file_paths = sorted(json_files_in_dir)
         print(f"Found {len(json_file_paths)} JSON files in directory '{args.directory}':")
-        for i, file_path in enumerate(json_file_paths, 1):
-            print(f"  {i}. {os.path.basename(file_path)}")
+        for i, file_path in enumerate(json_file_paths[:MAX_LISTED_FILES], 1):
+            print(f"  {i}. {os.path.relpath(file_path, args.directory)}")
+        if len(json_file_paths) > MAX_LISTED_FILES:
+            print(f"  ... and {len(json_file_paths) - MAX_LISTED_FILES} more")
         
     else:
         # Parse multiple file paths from command line argument
@@ -487,8 +1073,53 @@ def main():
             print(f"  - {file_path}")
         return 1
     
+    if not args.skip_validation and not preflight_validate(json_file_paths, metrics):
+        return 1
+    
+    if args.compile:
+        if args.bulk:
+            jobs = build_bulk_jobs(json_file_paths, args.directory)
+        elif len(json_file_paths) == 1:
+            jobs = [(Path(json_file_paths[0]).stem, json_file_paths)]
+        else:
+            jobs = [(Path(args.directory).name if args.directory else 'combined', json_file_paths)]
+        generator = MCQFormGenerator(force=args.force, metrics=metrics, dedup=args.dedup)
+        return 0 if generator.compile_forms(jobs, args.compile, args.title, args.description) else 1
+    
+    if args.sync:
+        generator = MCQFormGenerator(metrics=metrics)
+        result = generator.sync_form_from_json(args.sync, json_file_paths)
+        return 0 if result else 1
+    
+    if args.bulk:
+        if args.group_by == 'date':
+            print("Error: --group-by date requires --directory.")
+            return 1
+        jobs = build_bulk_jobs(json_file_paths, args.directory)
+        generator = MCQFormGenerator(pool_size=args.concurrency, force=args.force, metrics=metrics,
+                                     dedup=args.dedup)
+        rows = generator.create_forms_in_bulk(jobs, args.concurrency, args.title, args.description)
+        if args.index:
+            write_form_index(rows, args.index)
+        return 0 if rows and all(row['result'] for row in rows) else 1
+    
+    if args.adaptive:
+        generator = MCQFormGenerator(force=args.force, metrics=metrics)
+        result = generator.create_adaptive_form(json_file_paths, args.adaptive, args.learner,
+                                                form_title=args.title, form_description=args.description)
+        return 0 if result else 1
+    
+    if args.max_questions_per_form:
+        generator = MCQFormGenerator(pool_size=args.concurrency, force=args.force, metrics=metrics,
+                                     dedup=args.dedup)
+        rows = generator.create_sharded_forms(json_file_paths, args.max_questions_per_form, args.concurrency,
+                                              args.title, args.description)
+        if args.index and rows:
+            write_form_index(rows, args.index)
+        return 0 if rows and all(row['result'] for row in rows) else 1
+    
     # Create form generator
-    generator = MCQFormGenerator()
+    generator = MCQFormGenerator(force=args.force, metrics=metrics, dedup=args.dedup)
     
     total_files = len(json_file_paths)
     
@@ -533,6 +1164,13 @@ if __name__ == "__main__":
         print("python main.py file1.json,file2.json,file3.json --title 'Combined Quiz' --description 'Test your knowledge'")
         print("python main.py -r material/questions/05-07-2025/ --title 'Directory Quiz'")
         print("python main.py --directory material/questions/05-07-2025/")
+        print("python main.py -r material/questions/05-07-2025/ --bulk --concurrency 8")
+        print("python main.py -r material/questions/ --bulk --group-by date")
+        print("python main.py material/questions/05-07-2025/1.json --sync <form_id>")
+        print("python main.py -r material/questions/05-07-2025/ --bulk --metrics run.jsonl --profile")
+        print("python main.py -r material/questions/ --bulk --group-by date --compile build/forms.jsonl")
+        print("python main.py --replay build/forms.jsonl --concurrency 8")
+        print("python main.py -r material/questions/ --recursive --exclude 'drafts/*' --max-questions-per-form 50 --index forms.json")
         
         # For demonstration, use the provided file
         default_file = "material/questions/05-07-2025/1.json"
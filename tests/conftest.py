@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures: question files and clients wired to the local mock Forms API.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import MCQFormGenerator
+from utils.gg_form_api import StaticCredentialProvider
+from utils.response_harvester import new_transport
+
+# Never reached: generators that only compile requests still need an endpoint
+UNREACHABLE_ENDPOINT = 'http://127.0.0.1:9'
+
+
+@pytest.fixture
+def write_questions():
+    """Write `count` valid questions named `prefix0`, `prefix1`, ... to `path`; returns the path."""
+    def write(path, count=3, prefix="Q", correct_option="option-1"):
+        options = {"option-1": "a", "option-2": "b", "option-3": "c", "option-4": "d"}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps([
+            {"question": f"{prefix}{i}", "options": options, "correct_option": correct_option,
+             "explanation": options[correct_option]}
+            for i in range(count)
+        ]), encoding='utf-8')
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def write_vocabulary_questions():
+    """Write one "What does 'word' mean?" question per word, tagged with its vocabulary; returns the path."""
+    def write(path, words):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps([
+            {"question": f"What does '{word}' mean?",
+             "options": {"option-1": f"{word} A", "option-2": f"{word} B", "option-3": f"{word} C",
+                         "option-4": f"{word} D"},
+             "correct_option": "option-1", "explanation": "A", "vocabulary": word}
+            for word in words
+        ]), encoding='utf-8')
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def make_generator():
+    """MCQFormGenerator against `server` (or no server), forcing new forms, without form cache or quota buckets.
+
+    Keyword arguments override the constructor defaults, e.g. form_cache_path.
+    """
+    def make(server=None, **kwargs):
+        kwargs.setdefault('force', True)
+        kwargs.setdefault('form_cache_path', None)
+        return MCQFormGenerator(credential_provider=StaticCredentialProvider('test'),
+                                endpoint=server.url if server else UNREACHABLE_ENDPOINT, rate_limit=False, **kwargs)
+    return make
+
+
+@pytest.fixture
+def make_read_transport():
+    """Harvesting transport against `server`, without the shared read quota bucket."""
+    def make(server, pool_size=2):
+        return new_transport(pool_size, server.url, StaticCredentialProvider('test'), rate_limit=False)
+    return make
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the chunked batch submitter and its bisection failure isolation.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import json_backend
+from utils.batch_packer import pack_batches
+from utils.batch_submitter import ChunkedSubmitter, SENT, REJECTED, FAILED
+
+
+class FakeFormsApi:
+    """Accepts a batch only if it holds no bad item and every index is contiguous."""
+
+    def __init__(self, bad_titles=(), bad_prefix=False, fail_after=None):
+        self.bad_titles = set(bad_titles)
+        self.bad_prefix = bad_prefix
+        self.fail_after = fail_after
+        self.items = []
+        self.prefix_applied = False
+        self.calls = 0
+
+    def send(self, requests_list):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            return FAILED
+        expected_index = len(self.items)
+        new_items = []
+        for request in requests_list:
+            if 'createItem' not in request:
+                if self.bad_prefix:
+                    return REJECTED
+                continue
+            item = request['createItem']['item']
+            if item['title'] in self.bad_titles:
+                return REJECTED
+            if request['createItem']['location']['index'] != expected_index + len(new_items):
+                return REJECTED
+            new_items.append(item['title'])
+        self.items.extend(new_items)
+        if any('createItem' not in request for request in requests_list):
+            self.prefix_applied = True
+        return SENT
+
+
+def make_items(count, source="quiz.json"):
+    return [({"title": f"Q{i}"}, (source, i)) for i in range(count)]
+
+
+def test_all_items_sent_in_chunks():
+    api = FakeFormsApi()
+    result = ChunkedSubmitter(api.send, chunk_size=10).submit(make_items(25), prefix_requests=[{"updateSettings": {}}])
+    assert result['added'] == 25
+    assert result['rejected'] == []
+    assert result['prefix_applied']
+    assert api.calls == 3
+    assert api.items == [f"Q{i}" for i in range(25)]
+
+
+def test_bisection_isolates_bad_items_with_contiguous_indices():
+    api = FakeFormsApi(bad_titles={"Q13", "Q57"})
+    result = ChunkedSubmitter(api.send, chunk_size=100).submit(make_items(100))
+    assert result['rejected'] == [("quiz.json", 13), ("quiz.json", 57)]
+    assert result['added'] == 98
+    assert api.items == [f"Q{i}" for i in range(100) if i not in (13, 57)]
+    # Two bad items in 100 cost far fewer requests than one per question
+    assert api.calls < 30
+
+
+def test_rejected_prefix_does_not_reject_items():
+    api = FakeFormsApi(bad_prefix=True)
+    result = ChunkedSubmitter(api.send, chunk_size=8).submit(make_items(8), prefix_requests=[{"updateSettings": {}}])
+    assert not result['prefix_applied']
+    assert result['rejected'] == []
+    assert result['added'] == 8
+
+
+def test_transport_failure_stops_submission():
+    api = FakeFormsApi(fail_after=1)
+    result = ChunkedSubmitter(api.send, chunk_size=5).submit(make_items(15))
+    assert result['added'] == 5
+    assert len(result['failed']) == 10
+    assert api.calls == 2
+
+
+def test_byte_budget_splits_large_items_in_order():
+    sizes = [100, 300, 250, 900, 50, 50]
+    assert pack_batches(sizes, max_items=10, max_bytes=600) == [(0, 2), (2, 3), (3, 4), (4, 6)]
+    assert pack_batches(sizes, max_items=2) == [(0, 2), (2, 4), (4, 6)]
+
+    api = FakeFormsApi()
+    bodies = []
+    send = lambda requests_list: bodies.append(json_backend.dumps_bytes({"requests": requests_list})) or api.send(requests_list)
+    items = [({"title": f"Q{i}", "description": "x" * (50 if i % 3 else 900)}, ("quiz.json", i)) for i in range(30)]
+    result = ChunkedSubmitter(send, chunk_size=100, max_batch_bytes=2000).submit(
+        items, prefix_requests=[{"updateSettings": {"quizSettings": {"isQuiz": True}}}])
+    assert result['added'] == 30
+    assert result['prefix_applied']
+    assert api.items == [f"Q{i}" for i in range(30)]
+    assert len(bodies) > 1
+    assert all(len(body) <= 2000 for body in bodies)
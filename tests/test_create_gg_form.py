@@ -8,91 +8,8 @@ import json
 import sys
 from pathlib import Path
 
-
-def validate_question_format(question_data, index):
-    """Validate a single question's format."""
-    errors = []
-    
-    # Check required fields
-    required_fields = ['question', 'options', 'correct_option', 'explanation']
-    for field in required_fields:
-        if field not in question_data:
-            errors.append(f"Missing required field: {field}")
-    
-    # Check options format
-    if 'options' in question_data:
-        options = question_data['options']
-        required_options = ['option-1', 'option-2', 'option-3', 'option-4']
-        
-        for opt in required_options:
-            if opt not in options:
-                errors.append(f"Missing option: {opt}")
-            elif not isinstance(options[opt], str) or not options[opt].strip():
-                errors.append(f"Empty or invalid option: {opt}")
-    
-    # Check correct_option
-    if 'correct_option' in question_data:
-        correct_opt = question_data['correct_option']
-        if correct_opt not in ['option-1', 'option-2', 'option-3', 'option-4']:
-            errors.append(f"Invalid correct_option: {correct_opt}")
-    
-    # Check question text
-    if 'question' in question_data:
-        if not isinstance(question_data['question'], str) or not question_data['question'].strip():
-            errors.append("Question text is empty or invalid")
-    
-    # Check explanation
-    if 'explanation' in question_data:
-        if not isinstance(question_data['explanation'], str) or not question_data['explanation'].strip():
-            errors.append("Explanation is empty or invalid")
-    
-    return errors
-
-
-def validate_json_file(file_path):
-    """Validate a JSON file containing questions."""
-    print(f"🔍 Validating: {file_path}")
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON decode error: {e}")
-        return False
-    except FileNotFoundError:
-        print(f"❌ File not found: {file_path}")
-        return False
-    except Exception as e:
-        print(f"❌ Error reading file: {e}")
-        return False
-    
-    if not isinstance(data, list):
-        print(f"❌ Root element must be a list of questions")
-        return False
-    
-    if len(data) == 0:
-        print(f"❌ No questions found in file")
-        return False
-    
-    print(f"📊 Found {len(data)} questions")
-    
-    all_valid = True
-    for i, question in enumerate(data, 1):
-        errors = validate_question_format(question, i)
-        if errors:
-            print(f"❌ Question {i} errors:")
-            for error in errors:
-                print(f"   - {error}")
-            all_valid = False
-        else:
-            print(f"✅ Question {i}: Valid")
-    
-    if all_valid:
-        print(f"✅ File validation passed!")
-    else:
-        print(f"❌ File validation failed!")
-    
-    return all_valid
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.question_validator import validate_question_format, validate_json_file
 
 
 def test_sample_questions():
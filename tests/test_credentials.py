@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached, refresh-ahead OAuth credential provider.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import gg_form_api
+from utils.gg_form_api import SCOPES, CredentialProvider
+
+
+def utcnow():
+    # google-auth keeps expiry as a naive UTC datetime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def write_token(path, token='old', expires_in=timedelta(hours=1), scopes=SCOPES):
+    creds = Credentials(token=token, refresh_token='refresh', client_id='id', client_secret='secret',
+                        token_uri='https://oauth2.googleapis.com/token', scopes=scopes,
+                        expiry=utcnow() + expires_in)
+    path.write_text(creds.to_json(), encoding='utf-8')
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Count Credentials.refresh calls; each hands out a new token valid for an hour."""
+    calls = []
+
+    def fake_refresh(creds, request):
+        time.sleep(0.05)
+        calls.append(creds.token)
+        creds.token = f"new-{len(calls)}"
+        creds.expiry = utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(Credentials, 'refresh', fake_refresh)
+    return calls
+
+
+def test_token_is_refreshed_ahead_of_expiry(tmp_path, refreshes):
+    token_path = tmp_path / "token.json"
+    write_token(token_path, expires_in=timedelta(minutes=30))
+    assert CredentialProvider(str(token_path), refresh_margin=600).get_credentials().token == 'old'
+    assert refreshes == []
+
+    # Still valid for google-auth, but inside the 15 minute margin
+    write_token(token_path, expires_in=timedelta(minutes=10))
+    provider = CredentialProvider(str(token_path), refresh_margin=900)
+    assert provider.get_credentials().token == 'new-1' and refreshes == ['old']
+    assert json.loads(token_path.read_text(encoding='utf-8'))['token'] == 'new-1'
+    assert provider.get_credentials().token == 'new-1' and len(refreshes) == 1
+
+
+def test_concurrent_callers_share_one_refresh(tmp_path, refreshes):
+    token_path = tmp_path / "token.json"
+    write_token(token_path, expires_in=timedelta(minutes=1))
+    provider = CredentialProvider(str(token_path))
+    barrier = threading.Barrier(8)
+    tokens = []
+
+    def worker():
+        barrier.wait()
+        tokens.append(provider.get_credentials().token)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert refreshes == ['old'] and tokens == ['new-1'] * 8
+
+
+def test_invalidate_refreshes_only_the_rejected_token(tmp_path, refreshes):
+    token_path = tmp_path / "token.json"
+    write_token(token_path)
+    provider = CredentialProvider(str(token_path))
+    assert provider.authorization_header() == {'Authorization': 'Bearer old'}
+
+    provider.invalidate('some-other-token')
+    assert provider.get_credentials().token == 'old' and refreshes == []
+    provider.invalidate('old')
+    assert provider.authorization_header() == {'Authorization': 'Bearer new-1'}
+    # A late report about the already replaced token is ignored
+    provider.invalidate('old')
+    assert provider.get_credentials().token == 'new-1' and refreshes == ['old']
+
+
+def test_failed_save_leaves_the_old_token_file_intact(tmp_path, refreshes, monkeypatch):
+    token_path = tmp_path / "token.json"
+    write_token(token_path, expires_in=timedelta(minutes=1))
+    before = token_path.read_text(encoding='utf-8')
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(gg_form_api.os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        CredentialProvider(str(token_path)).get_credentials()
+    assert token_path.read_text(encoding='utf-8') == before
+    assert os.listdir(tmp_path) == ["token.json"]
+
+
+def test_token_missing_a_scope_asks_for_consent_again(tmp_path, monkeypatch):
+    token_path = tmp_path / "token.json"
+    write_token(token_path, scopes=SCOPES[:1])
+    granted = Credentials(token='consented', expiry=utcnow() + timedelta(hours=1))
+    flows = []
+
+    class FakeFlow:
+        def run_local_server(self, port):
+            return granted
+
+    def from_client_secrets_file(path, scopes):
+        flows.append(scopes)
+        return FakeFlow()
+
+    monkeypatch.setattr(gg_form_api.InstalledAppFlow, 'from_client_secrets_file', from_client_secrets_file)
+    provider = CredentialProvider(str(token_path), creds_path=str(tmp_path / "credentials.json"))
+    assert not provider._token_has_scopes()
+    assert provider.get_credentials().token == 'consented' and flows == [SCOPES]
+
+    # A token granted every scope (or one that does not list them) is used as is
+    write_token(token_path)
+    assert CredentialProvider(str(token_path))._token_has_scopes()
+    token_path.write_text(json.dumps({'token': 'x'}), encoding='utf-8')
+    assert CredentialProvider(str(token_path))._token_has_scopes()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests for the CSV to JSON vocabulary pipeline.
+"""
+
+import csv
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import data_handler
+
+FIELDS = ['Vocabulary', 'Meaning', 'Collocation', 'Context', 'IPA', 'Time']
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_output(output_dir):
+    result = {}
+    for date in sorted(os.listdir(output_dir)):
+        folder = os.path.join(output_dir, date)
+        if not os.path.isdir(folder):
+            continue
+        numbers = sorted(int(name[:-5]) for name in os.listdir(folder) if name.endswith('.json'))
+        result[date] = []
+        for number in numbers:
+            with open(os.path.join(folder, f"{number}.json"), encoding='utf-8') as f:
+                result[date].append(json.load(f))
+    return result
+
+
+def make_rows(count, dates=('05/07/2025', '09/07/2025')):
+    return [
+        {'Vocabulary': f"word{i}", 'Meaning': f"meaning {i}", 'Collocation': '', 'Context': f"context {i}",
+         'IPA': '', 'Time': dates[i % len(dates)]}
+        for i in range(count)
+    ]
+
+
+def test_streaming_matches_dict_pipeline_without_duplicates(tmp_path, monkeypatch):
+    csv_path = tmp_path / "vocab.csv"
+    write_csv(csv_path, make_rows(55) + [{'Vocabulary': 'undated', 'Time': ''}])
+
+    monkeypatch.setattr(data_handler, 'JSON_PATH_DIR', str(tmp_path / "dict"))
+    data_handler.from_dict_to_json_file(data_handler.build_vocabulary_dict(csv_path))
+
+    counts = data_handler.stream_csv_to_json_files(csv_path, output_dir=str(tmp_path / "stream"))
+
+    assert read_output(tmp_path / "stream") == read_output(tmp_path / "dict")
+    assert counts == {'05/07/2025': 28, '09/07/2025': 27}
+    assert [len(chunk) for chunk in read_output(tmp_path / "stream")['05-07-2025']] == [20, 8]
+
+
+def test_streaming_keeps_last_row_for_duplicate_vocabulary(tmp_path):
+    rows = make_rows(4)
+    rows.append({'Vocabulary': 'word0', 'Meaning': 'updated', 'Time': '10/07/2025'})
+    csv_path = tmp_path / "vocab.csv"
+    write_csv(csv_path, rows)
+
+    data_handler.stream_csv_to_json_files(csv_path, output_dir=str(tmp_path / "out"))
+    output = read_output(tmp_path / "out")
+
+    assert [entry['Vocabulary'] for entry in output['05-07-2025'][0]] == ['word2']
+    assert output['10-07-2025'][0][0]['Meaning'] == 'updated'
+    expected = data_handler.build_vocabulary_dict(csv_path)['word0']
+    assert {k: v for k, v in output['10-07-2025'][0][0].items() if k != 'Vocabulary'} == expected
+
+
+def test_streaming_orders_duplicates_by_last_occurrence(tmp_path):
+    rows = make_rows(6)
+    rows.append({'Vocabulary': 'word0', 'Meaning': 'updated', 'Time': '05/07/2025'})
+    csv_path = tmp_path / "vocab.csv"
+    write_csv(csv_path, rows)
+
+    data_handler.stream_csv_to_json_files(csv_path, output_dir=str(tmp_path / "out"))
+    streamed = [entry['Vocabulary'] for entry in read_output(tmp_path / "out")['05-07-2025'][0]]
+    # The dict pipeline keeps word0 at its first position; streaming moves it to its last row
+    in_dict = [vocab for vocab, value in data_handler.build_vocabulary_dict(csv_path).items()
+               if value['Time'] == '05/07/2025']
+    assert in_dict == ['word0', 'word2', 'word4'] and streamed == ['word2', 'word4', 'word0']
+
+
+def test_dict_writer_skips_unchanged_dates_and_removes_stale_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_handler, 'JSON_PATH_DIR', str(tmp_path))
+    rows = {row['Vocabulary']: {k: row[k] for k in FIELDS[1:]} for row in make_rows(60)}
+
+    first = data_handler.from_dict_to_json_file({k: dict(v) for k, v in rows.items()})
+    assert sorted(first['written']) == ['05/07/2025', '09/07/2025']
+
+    second = data_handler.from_dict_to_json_file({k: dict(v) for k, v in rows.items()})
+    assert second['written'] == []
+    assert sorted(second['unchanged']) == ['05/07/2025', '09/07/2025']
+
+    # Shrink one date from 30 to 10 entries: its 2.json must disappear
+    shrunk = {k: dict(v) for i, (k, v) in enumerate(rows.items()) if i % 2 or i < 20}
+    third = data_handler.from_dict_to_json_file(shrunk)
+    assert third['written'] == ['05/07/2025']
+    assert sorted(os.listdir(tmp_path / "05-07-2025")) == ['1.json']
+    assert len(read_output(tmp_path)['09-07-2025']) == 2
+
+
+def test_incremental_mode_merges_appended_rows_and_detects_rewrites(tmp_path):
+    csv_path = tmp_path / "vocab.csv"
+    out = tmp_path / "out"
+    rows = make_rows(30)
+    write_csv(csv_path, rows)
+
+    first = data_handler.incremental_csv_to_json_files(csv_path, output_dir=str(out))
+    assert first['mode'] == 'full'
+
+    # Append a new word and re-note an old one under a new date
+    with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writerow({'Vocabulary': 'fresh', 'Meaning': 'new', 'Time': '09/07/2025'})
+        writer.writerow({'Vocabulary': 'word0', 'Meaning': 'moved', 'Time': '12/07/2025'})
+    second = data_handler.incremental_csv_to_json_files(csv_path, output_dir=str(out))
+    assert second['mode'] == 'incremental'
+    assert second['new_rows'] == 2
+    assert second['dates_written'] == ['05/07/2025', '09/07/2025', '12/07/2025']
+
+    # The merged output equals a from-scratch streaming rebuild
+    data_handler.stream_csv_to_json_files(csv_path, output_dir=str(tmp_path / "full"))
+    assert read_output(out) == read_output(tmp_path / "full")
+
+    # Nothing appended: nothing to do
+    third = data_handler.incremental_csv_to_json_files(csv_path, output_dir=str(out))
+    assert third == {'mode': 'incremental', 'new_rows': 0, 'dates_written': []}
+
+    # Editing an already-processed row forces a full rebuild
+    rows[3]['Meaning'] = 'edited'
+    write_csv(csv_path, rows)
+    fourth = data_handler.incremental_csv_to_json_files(csv_path, output_dir=str(out))
+    assert fourth['mode'] == 'full'
+    assert '12-07-2025' not in read_output(out)
+
+
+def test_incremental_mode_resumes_at_record_boundaries(tmp_path):
+    csv_path = tmp_path / "vocab.csv"
+    out = tmp_path / "out"
+    rows = make_rows(3)
+    rows[1]['Context'] = "first line\nsecond line"
+    write_csv(csv_path, rows)
+    data_handler.incremental_csv_to_json_files(csv_path, output_dir=str(out))
+    watermark = data_handler.load_watermark(str(out))
+    assert set(watermark) == {'csv_path', 'offset', 'header_sha256', 'prefix_sha256', 'words'}
+
+    # One multi-line row, then a row still being written (no newline yet)
+    with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+        f.write('fresh,new,,"spans\nlines",,09/07/2025\r\npartial,half')
+    second = data_handler.incremental_csv_to_json_files(csv_path, output_dir=str(out))
+    assert second == {'mode': 'incremental', 'new_rows': 1, 'dates_written': ['09/07/2025']}
+    fresh = [entry for chunk in read_output(out)['09-07-2025'] for entry in chunk if entry['Vocabulary'] == 'fresh']
+    assert fresh[0]['Context'] == "spans\nlines"
+
+    # Finishing the partial row picks it up whole
+    with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+        f.write('-done,,,,12/07/2025\r\n')
+    third = data_handler.incremental_csv_to_json_files(csv_path, output_dir=str(out))
+    assert third == {'mode': 'incremental', 'new_rows': 1, 'dates_written': ['12/07/2025']}
+    assert read_output(out)['12-07-2025'][0][0]['Vocabulary'] == 'partial'
+    assert read_output(out)['12-07-2025'][0][0]['Meaning'] == 'half-done'
+
+    data_handler.stream_csv_to_json_files(csv_path, output_dir=str(tmp_path / "full"))
+    assert read_output(out) == read_output(tmp_path / "full")
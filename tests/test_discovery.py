@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for recursive JSON discovery and splitting large combined forms.
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+from main import find_json_files, write_form_index
+
+
+def test_find_json_files_recursive_with_globs(tmp_path, write_questions):
+    for name in ("a.json", "b.JSON", "notes.txt", "week1/c.json", "week1/drafts/d.json", ".cache/e.json"):
+        write_questions(tmp_path / name, 1)
+
+    relative = lambda paths: [os.path.relpath(path, tmp_path).replace(os.sep, '/') for path in paths]
+    assert relative(find_json_files(str(tmp_path))) == ["a.json", "b.JSON"]
+    assert relative(find_json_files(str(tmp_path), recursive=True)) == [
+        "a.json", "b.JSON", "week1/c.json", "week1/drafts/d.json"]
+    assert relative(find_json_files(str(tmp_path), recursive=True, exclude=["drafts"])) == [
+        "a.json", "b.JSON", "week1/c.json"]
+    assert relative(find_json_files(str(tmp_path), recursive=True, include=["week1/*"])) == [
+        "week1/c.json", "week1/drafts/d.json"]
+
+
+def test_sharded_forms_split_files_and_keep_order(tmp_path, write_questions, make_generator):
+    paths = [write_questions(tmp_path / f"{name}.json", count, name) for name, count in (("a", 7), ("b", 4), ("c", 2))]
+
+    with MockFormsServer() as server:
+        rows = make_generator(server).create_sharded_forms(paths, 5, max_workers=3, form_title="Quiz")
+
+        assert [row['name'] for row in rows] == ["part-1", "part-2", "part-3"]
+        assert [row['source_files'] for row in rows] == [paths[:1], paths[:2], paths[1:]]
+        questions = [[item['title'] for item in server.forms[row['result']['form_id']]['items']] for row in rows]
+        assert questions == [["a0", "a1", "a2", "a3", "a4"], ["a5", "a6", "b0", "b1", "b2"], ["b3", "c0", "c1"]]
+        assert server.forms[rows[1]['result']['form_id']]['info']['title'] == "Quiz - Part 2"
+
+    index_path = tmp_path / "index.json"
+    write_form_index(rows, str(index_path))
+    index = json.loads(index_path.read_text(encoding='utf-8'))
+    assert [form['total_questions'] for form in index['forms']] == [5, 5, 3]
+    assert all(form['status'] == 'ok' for form in index['forms'])
+
+
+def test_untitled_shards_list_sources_once_and_reuse_cached_forms(tmp_path, write_questions, make_generator):
+    paths = [write_questions(tmp_path / f"{name}.json", count, name) for name, count in (("a", 3), ("b", 1))]
+
+    with MockFormsServer() as server:
+        def run():
+            generator = make_generator(server, force=False, form_cache_path=str(tmp_path / "form_cache.json"))
+            return generator.create_sharded_forms(paths, 4, max_workers=2)
+
+        rows = run()
+        form = server.forms[rows[0]['result']['form_id']]
+        assert form['info']['description'] == "Sources: a (3 questions) | b (1 questions)"
+        assert form['info']['title'].startswith("Combined MCQ Quiz") and form['info']['title'].endswith(" - Part 1")
+
+        # The generated title carries a timestamp, but the cache is keyed on the title as given
+        again = run()
+        assert again[0]['result']['form_id'] == rows[0]['result']['form_id'] and again[0]['result']['cached']
+        assert len(server.forms) == 1
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash form cache.
+"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+from utils.form_cache import FormCache
+
+
+@pytest.fixture
+def new_generator(make_generator):
+    """Generator sharing the form cache at `cache_path`; only reuses forms unless `force`."""
+    return lambda server, cache_path, force=False: make_generator(server, force=force, form_cache_path=cache_path)
+
+
+def test_stale_entries_are_evicted(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "form_cache.json")
+    cache = FormCache(cache_path, ttl_days=1)
+    cache.put('fresh', {'form_id': 'a'})
+    cache.put('old', {'form_id': 'b'})
+    assert cache.get('old') == {'form_id': 'b'}
+
+    # An entry past the TTL is a miss at once, and dropped from the file on the next load
+    real_time = time.time
+    monkeypatch.setattr(time, 'time', lambda: real_time() + 2 * 86400)
+    assert cache.get('old') is None
+    monkeypatch.setattr(time, 'time', real_time)
+    with open(cache_path, encoding='utf-8') as f:
+        entries = json.load(f)
+    entries['old']['created_at'] -= 2 * 86400
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+
+    reloaded = FormCache(cache_path, ttl_days=1)
+    assert reloaded.get('fresh') == {'form_id': 'a'} and reloaded.get('old') is None
+    with open(cache_path, encoding='utf-8') as f:
+        assert set(json.load(f)) == {'fresh'}
+
+
+def test_unchanged_input_reuses_the_form_unless_forced(tmp_path, write_questions, new_generator):
+    path = write_questions(tmp_path / "quiz.json")
+    cache_path = str(tmp_path / "form_cache.json")
+    with MockFormsServer() as server:
+        first = new_generator(server, cache_path).create_mcq_form_from_json(path, "Quiz")
+        again = new_generator(server, cache_path).create_mcq_form_from_json(path, "Quiz")
+        assert again['form_id'] == first['form_id'] and again['cached'] and again['round_trips'] == 0
+        assert len(server.forms) == 1
+
+        forced = new_generator(server, cache_path, force=True).create_mcq_form_from_json(path, "Quiz")
+        assert forced['form_id'] != first['form_id'] and len(server.forms) == 2
+        # The forced form replaces the cached one
+        assert new_generator(server, cache_path).create_mcq_form_from_json(path, "Quiz")['form_id'] == forced['form_id']
+
+
+def test_partially_populated_forms_are_not_cached(tmp_path, write_questions, new_generator):
+    path = write_questions(tmp_path / "quiz.json")
+    cache_path = str(tmp_path / "form_cache.json")
+    with MockFormsServer() as server:
+        generator = new_generator(server, cache_path)
+        generator.transport.max_retries = 0
+        # The form is created, then the question batch fails
+        server.fail_next(None, 503)
+        failed = generator.create_mcq_form_from_json(path, "Quiz")
+        assert failed['questions_added'] == 0 and failed['total_questions'] == 3
+
+        retried = new_generator(server, cache_path).create_mcq_form_from_json(path, "Quiz")
+        assert retried['form_id'] != failed['form_id'] and not retried.get('cached')
+        assert retried['questions_added'] == 3 and len(server.forms) == 2
+
+
+def test_untitled_combined_form_is_reused_despite_its_timestamped_title(tmp_path, write_questions, new_generator):
+    paths = [write_questions(tmp_path / "quiz.json"), write_questions(tmp_path / "more.json", 1, "Extra")]
+    cache_path = str(tmp_path / "form_cache.json")
+    with MockFormsServer() as server:
+        first = new_generator(server, cache_path).create_combined_mcq_form_from_multiple_json(paths)
+        again = new_generator(server, cache_path).create_combined_mcq_form_from_multiple_json(paths)
+    assert again['form_id'] == first['form_id'] and again['cached']
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental form sync planner.
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.form_sync import plan_sync_requests
+
+
+def make_item(title, answer="a", item_id=None):
+    item = {
+        "title": title,
+        "questionItem": {
+            "question": {
+                "required": True,
+                "grading": {"pointValue": 1, "correctAnswers": {"answers": [{"value": answer}]}},
+                "choiceQuestion": {"type": "RADIO", "options": [{"value": "a"}, {"value": "b"}]}
+            }
+        }
+    }
+    if item_id:
+        item["itemId"] = item_id
+    return item
+
+
+def apply_requests(items, requests_list):
+    """Apply planned requests to a list of items the way the Forms API would."""
+    items = [dict(item) for item in items]
+    for request in requests_list:
+        if 'deleteItem' in request:
+            del items[request['deleteItem']['location']['index']]
+        elif 'moveItem' in request:
+            item = items.pop(request['moveItem']['originalLocation']['index'])
+            items.insert(request['moveItem']['newLocation']['index'], item)
+        elif 'createItem' in request:
+            items.insert(request['createItem']['location']['index'], dict(request['createItem']['item']))
+        elif 'updateItem' in request:
+            index = request['updateItem']['location']['index']
+            assert items[index]['itemId'] == request['updateItem']['item']['itemId']
+            items[index] = dict(request['updateItem']['item'])
+    return items
+
+
+def test_unchanged_form_needs_no_requests():
+    existing = [make_item(f"Q{i}", item_id=f"id{i}") for i in range(5)]
+    desired = [make_item(f"Q{i}") for i in range(5)]
+    requests_list, counts = plan_sync_requests(existing, desired)
+    assert requests_list == []
+    assert counts['unchanged'] == 5
+
+
+def test_fixed_answer_becomes_single_update():
+    existing = [make_item(f"Q{i}", item_id=f"id{i}") for i in range(20)]
+    desired = [make_item(f"Q{i}") for i in range(20)]
+    desired[7] = make_item("Q7", answer="b")
+    requests_list, counts = plan_sync_requests(existing, desired)
+    assert len(requests_list) == 1
+    assert requests_list[0]['updateItem']['item']['itemId'] == "id7"
+    assert counts['updated'] == 1
+
+
+def test_moving_last_item_first_is_one_move():
+    existing = [make_item(f"Q{i}", item_id=f"id{i}") for i in range(6)]
+    desired = [make_item("Q5")] + [make_item(f"Q{i}") for i in range(5)]
+    requests_list, counts = plan_sync_requests(existing, desired)
+    assert counts['moved'] == 1
+    assert [item['title'] for item in apply_requests(existing, requests_list)] == [item['title'] for item in desired]
+
+
+def test_random_edits_converge_to_desired_order():
+    rng = random.Random(7)
+    for _ in range(200):
+        existing = [make_item(f"Q{i}", item_id=f"id{i}") for i in range(rng.randint(0, 12))]
+        titles = [item['title'] for item in existing if rng.random() > 0.2]
+        titles += [f"N{i}" for i in range(rng.randint(0, 4))]
+        rng.shuffle(titles)
+        desired = [make_item(title, answer=rng.choice("ab")) for title in titles]
+
+        requests_list, _counts = plan_sync_requests(existing, desired)
+        result = apply_requests(existing, requests_list)
+
+        assert [item['title'] for item in result] == titles
+        assert [item['questionItem']['question']['grading'] for item in result] == \
+            [item['questionItem']['question']['grading'] for item in desired]
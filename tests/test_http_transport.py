@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled HTTP transport and its rate limiting and retry helpers.
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+from utils.gg_form_api import StaticCredentialProvider
+from utils.http_transport import HttpTransport
+from utils.question_generator import ApiKeyAuth
+from utils.rate_limiter import TokenBucket, backoff_delay, parse_retry_after
+
+
+class RotatingAuth:
+    """Hands out token-1, then token-2 once the current token is invalidated."""
+
+    def __init__(self):
+        self.generation = 1
+        self.invalidated = []
+
+    def authorization_header(self):
+        return {'Authorization': f'Bearer token-{self.generation}'}
+
+    def invalidate(self, token):
+        self.invalidated.append(token)
+        self.generation += 1
+
+
+def new_transport(server, **kwargs):
+    kwargs.setdefault('max_retries', 3)
+    return HttpTransport(server.url, pool_size=2, backoff_base=0.001, **kwargs)
+
+
+def test_keep_alive_reuses_one_connection():
+    with MockFormsServer() as server:
+        transport = new_transport(server)
+        form_id = transport.post('/v1/forms', json_body={'info': {'title': 'Quiz'}}).json()['formId']
+        for _ in range(4):
+            assert transport.get(f'/v1/forms/{form_id}').status_code == 200
+        stats = transport.connection_stats()
+        transport.close()
+    assert stats['requests'] == 5 and stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 4 and stats['reuse_ratio'] == 0.8
+
+
+def test_create_is_only_replayed_when_the_server_did_not_process_it():
+    with MockFormsServer() as server:
+        transport = new_transport(server)
+        # A 500 may come after the form was created: replaying could duplicate it
+        server.fail_next(500)
+        assert transport.post('/v1/forms', json_body={'info': {'title': 'Quiz'}}).status_code == 500
+        server.fail_next(503, 429)
+        assert transport.post('/v1/forms', json_body={'info': {'title': 'Quiz'}}).status_code == 200
+        # Reads are replayed on any transient error
+        server.fail_next(500, 502)
+        form_id = next(iter(server.forms))
+        assert transport.get(f'/v1/forms/{form_id}').status_code == 200
+        counts = server.request_counts()
+        retries = transport.connection_stats()['retries']
+        transport.close()
+    assert counts['create 500'] == 1 and counts['create 503'] == 1 and counts['create 429'] == 1
+    assert counts['create 200'] == 1 and retries == 4
+
+
+def test_post_is_replayed_only_if_the_connection_was_never_established():
+    transport = HttpTransport('http://127.0.0.1:1', max_retries=2, backoff_base=0.001)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.post('/v1/forms', json_body={})
+    assert transport.connection_stats()['retries'] == 2
+
+
+def test_rejected_token_is_refreshed_once_and_replayed():
+    auth = RotatingAuth()
+    with MockFormsServer() as server:
+        server.revoked_tokens.add('token-1')
+        transport = new_transport(server, auth=auth)
+        assert transport.post('/v1/forms', json_body={'info': {'title': 'Quiz'}}).status_code == 200
+        assert auth.invalidated == ['token-1']
+
+        # A second rejection in the same request is returned rather than looping
+        server.revoked_tokens.update({'token-2', 'token-3'})
+        assert transport.post('/v1/forms', json_body={'info': {'title': 'Quiz'}}).status_code == 401
+        counts = server.request_counts()
+        transport.close()
+    assert auth.invalidated == ['token-1', 'token-2'] and counts['create 401'] == 3
+
+
+@pytest.mark.parametrize('auth', [ApiKeyAuth('key'), StaticCredentialProvider('key')])
+def test_rejected_static_key_is_not_replayed(auth):
+    with MockFormsServer() as server:
+        server.revoked_tokens.add('key')
+        transport = new_transport(server, auth=auth)
+        assert transport.post('/v1/forms', json_body={'info': {'title': 'Quiz'}}).status_code == 401
+        counts = server.request_counts()
+        transport.close()
+    assert counts['create 401'] == 1
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate_per_minute=600, capacity=3)
+    started = time.monotonic()
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    waited = bucket.acquire()
+    assert 0.05 <= waited <= 0.2 and time.monotonic() - started >= 0.05
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None and parse_retry_after('soon') is None
+    assert parse_retry_after('7') == 7.0 and parse_retry_after('-3') == 0.0
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(later) <= 30
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    random.seed(3)
+    for attempt in range(8):
+        delays = [backoff_delay(attempt, base=0.5, maximum=4.0) for _ in range(200)]
+        cap = min(4.0, 0.5 * 2 ** attempt)
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) > cap * 0.8 and min(delays) < cap * 0.2
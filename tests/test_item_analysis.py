@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for item analysis of responses harvested from the local mock Forms API.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+from utils.item_analysis import analyze_store, load_question_bank
+from utils.response_harvester import ResponseHarvester, ResponseStore
+
+WORDS = ["abandon", "vivid", "cement"]
+
+
+def test_statistics_join_back_to_question_file_and_word(tmp_path, write_vocabulary_questions, make_generator,
+                                                       make_read_transport):
+    bank_dir = tmp_path / "questions"
+    path = write_vocabulary_questions(bank_dir / "day1.json", WORDS)
+
+    with MockFormsServer() as server:
+        form_id = make_generator(server).create_mcq_form_from_json(path, "Quiz")['form_id']
+        ids = [item['questionItem']['question']['questionId'] for item in server.forms[form_id]['items']]
+
+        # Four students: the strongest get 'vivid' right, nobody knows 'cement'
+        for student in range(4):
+            server.submit_response(form_id, {ids[0]: "abandon A",
+                                             ids[1]: "vivid A" if student >= 2 else "vivid B",
+                                             ids[2]: "cement C" if student % 2 else "cement B"})
+        store = ResponseStore(str(tmp_path / "responses"), 'csv')
+        transport = make_read_transport(server)
+        ResponseHarvester(transport, store).harvest([form_id])
+        transport.close()
+
+    stats, distractors, vocabulary = analyze_store(ResponseStore(str(tmp_path / "responses"), 'csv'),
+                                                   load_question_bank(str(bank_dir)))
+    stats = stats.set_index('vocabulary')
+    assert stats.loc['abandon', 'p_value'] == 1.0 and stats.loc['abandon', 'flag'] == 'too easy'
+    assert stats.loc['vivid', 'p_value'] == 0.5 and stats.loc['cement', 'p_value'] == 0.0
+    assert list(stats['source_file']) == [path] * 3 and list(stats['question_index']) == [0, 1, 2]
+
+    cement = distractors[distractors['option'].str.startswith('cement')].set_index('option')
+    assert cement['rate'].to_dict() == {"cement A": 0.0, "cement B": 0.5, "cement C": 0.5, "cement D": 0.0}
+    assert cement.loc["cement A", 'is_correct'] and not cement.loc["cement B", 'is_correct']
+
+    assert list(vocabulary['vocabulary']) == ["cement", "vivid", "abandon"]
+    assert list(vocabulary['mastery']) == [0.0, 0.5, 1.0]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests that the JSON backends are interchangeable.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import json_backend
+
+
+@pytest.mark.skipif(json_backend.orjson is None, reason="orjson not installed")
+def test_backends_produce_identical_output():
+    chunk = [{"Vocabulary": "endorse", "Meaning": "tán thành", "Collocation": None, "IPA": "/ɪnˈdɔːs/", "Count": 3}]
+    body = {"requests": [{"createItem": {"item": {"title": "Q \"1\"\n", "options": []}, "location": {"index": 0}}}]}
+    previous = json_backend.get_backend()
+    try:
+        outputs = []
+        for backend in ('json', 'orjson'):
+            json_backend.set_backend(backend)
+            outputs.append((json_backend.dumps_pretty(chunk), json_backend.dumps_bytes(body),
+                            json_backend.dumps_bytes(body, sort_keys=True),
+                            json_backend.loads(json_backend.dumps_bytes(body))))
+        assert outputs[0] == outputs[1]
+        assert outputs[0][3] == body
+    finally:
+        json_backend.set_backend(previous)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for run instrumentation.
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+from utils.metrics import RunMetrics, endpoint_name
+
+
+def test_endpoint_names():
+    assert endpoint_name('POST', '/v1/forms') == 'forms.create'
+    assert endpoint_name('GET', '/v1/forms/abc') == 'forms.get'
+    assert endpoint_name('POST', '/v1/forms/abc:batchUpdate') == 'forms.batchUpdate'
+    assert endpoint_name('GET', '/v1/forms/abc/responses?pageToken=x') == 'forms.responses.list'
+
+
+def test_form_record_and_summary_are_written_as_json_lines(tmp_path, write_questions, make_generator):
+    path = write_questions(tmp_path / "quiz.json", 5)
+    metrics_path = tmp_path / "metrics.jsonl"
+    metrics = RunMetrics(str(metrics_path))
+
+    with MockFormsServer(error_rate=0.5, seed=4) as server:
+        generator = make_generator(server, metrics=metrics)
+        generator.transport.backoff_base = 0.001
+        generator.create_mcq_form_from_json(path, "Quiz")
+    metrics.close()
+
+    form, summary = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+    assert form['status'] == 'ok' and form['questions_added'] == 5
+    # The quiz settings ride along with the questions, in one question batch
+    assert set(form['phases']) == {'load_questions', 'authenticate', 'create_quiz_form', 'question_batch'}
+    assert form['phases']['question_batch']['calls'] == 1
+    endpoints = form['endpoints']
+    assert endpoints['forms.create']['requests'] + endpoints['forms.batchUpdate']['requests'] > 2
+    assert sum(stats['retries'] for stats in endpoints.values()) == sum(stats['errors'] for stats in endpoints.values())
+    assert summary['type'] == 'summary' and summary['forms_ok'] == 1
+    assert summary['endpoints'] == endpoints
+
+
+def test_settings_sent_on_their_own_are_timed_separately(tmp_path, write_questions, make_generator):
+    path = write_questions(tmp_path / "quiz.json", 1)
+    metrics_path = tmp_path / "metrics.jsonl"
+    metrics = RunMetrics(str(metrics_path))
+
+    with MockFormsServer() as server:
+        # The first batch is refused, so the settings and the question are tried apart
+        server.fail_next(None, 400)
+        make_generator(server, metrics=metrics).create_mcq_form_from_json(path, "Quiz")
+    metrics.close()
+
+    form = json.loads(metrics_path.read_text().splitlines()[0])
+    assert form['questions_added'] == 1
+    assert {phase: stats['calls'] for phase, stats in form['phases'].items()
+            if phase in ('question_batch', 'configure_quiz_settings', 'fallback')} == \
+        {'question_batch': 1, 'configure_quiz_settings': 1, 'fallback': 1}
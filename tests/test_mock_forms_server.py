@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+End-to-end form creation against the local mock Forms API.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+
+
+def test_form_is_created_in_two_round_trips_despite_throttling(tmp_path, write_questions, make_generator):
+    path = write_questions(tmp_path / "quiz.json", 12, correct_option="option-3")
+    with MockFormsServer(throttle_rate=0.3, seed=3) as server:
+        generator = make_generator(server)
+        generator.transport.backoff_base = 0.001
+        result = generator.create_mcq_form_from_json(path, "Quiz")
+        form = server.forms[result['form_id']]
+        counts = server.request_counts()
+
+    assert result['questions_added'] == 12
+    assert result['round_trips'] == 2
+    assert [item['title'] for item in form['items']] == [f"Q{i}" for i in range(12)]
+    assert form['settings'] == {'quizSettings': {'isQuiz': True}}
+    assert counts.get('create 429', 0) + counts.get('batchUpdate 429', 0) > 0
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for token-budget packing of vocabulary into generation prompts.
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_llm_server import MockLLMServer
+from utils.prompt_packer import entry_tokens, pack_by_tokens, plan_prompt_batches
+from utils.question_generator import (
+    GenerationCache, HttpLLMBackend, QuestionGenerator, find_vocabulary_chunks, load_prompt_template
+)
+
+
+def make_entry(word, date, context_words=0):
+    return {"Vocabulary": word, "Meaning": f"meaning of {word}", "Collocation": None,
+            "Context": " ".join([word] * context_words) or None, "IPA": None, "Time": date}
+
+
+def test_batches_fit_budget_and_respect_dates():
+    entries = [make_entry(f"word{i}", "05/07/2025" if i < 30 else "09/07/2025", context_words=(i % 7) * 40)
+               for i in range(45)]
+    costs = [entry_tokens(entry) for entry in entries]
+    batches = plan_prompt_batches(entries, template_tokens=500, budget=3000)
+
+    assert sorted(position for batch in batches for position in batch['positions']) == list(range(45))
+    assert all(batch['tokens'] <= 3000 for batch in batches)
+    assert all(len(batch['dates']) == 1 for batch in batches)
+    # Close to the lower bound set by the per-date totals
+    for date in ("05/07/2025", "09/07/2025"):
+        total = sum(cost for entry, cost in zip(entries, costs) if entry['Time'] == date)
+        assert sum(1 for batch in batches if batch['dates'] == [date]) <= -(-total // 2500) + 1
+
+    mixed = plan_prompt_batches(entries, template_tokens=500, budget=3000, across_dates=True)
+    assert len(mixed) <= len(batches)
+    # An entry over budget gets a batch of its own
+    assert pack_by_tokens([5, 50, 5], budget=20) == [[0, 2], [1]]
+
+
+def test_packed_generation_makes_fewer_calls(tmp_path):
+    for number in (1, 2, 3):
+        chunk = [make_entry(f"w{number}-{i}", "05/07/2025") for i in range(3)]
+        path = tmp_path / "json" / "05-07-2025" / f"{number}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(chunk), encoding='utf-8')
+    jobs = find_vocabulary_chunks(str(tmp_path / "json"), str(tmp_path / "questions"))
+    manifest_path = str(tmp_path / "questions" / ".prompt_batches.json")
+
+    with MockLLMServer() as server:
+        backend = HttpLLMBackend(server.url, 'stub', max_retries=0)
+        generator = QuestionGenerator(backend, load_prompt_template(), GenerationCache(str(tmp_path / "cache.json")))
+        rows, batches = generator.generate_files_packed(jobs, budget=100000, manifest_path=manifest_path)
+        backend.close()
+        assert server.requests == len(batches) == 1
+
+    assert [row['error'] for row in rows] == [None, None, None]
+    output = json.loads((tmp_path / "questions" / "05-07-2025" / "2.json").read_text(encoding='utf-8'))
+    assert [question['vocabulary'] for question in output] == ["w2-0", "w2-1", "w2-2"]
+    manifest = json.loads(open(manifest_path, encoding='utf-8').read())
+    assert manifest['batches'][0]['dates'] == ["05/07/2025"] and len(manifest['batches'][0]['words']) == 9
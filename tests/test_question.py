@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact question model.
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.question import parse_questions
+from utils.question_validator import validate_file
+
+
+def make_entry(text="Q", correct="option-2", explanation="Because"):
+    return {
+        "question": text,
+        "options": {"option-1": "a", "option-2": "b", "option-3": "c", "option-4": "d"},
+        "correct_option": correct,
+        "explanation": explanation
+    }
+
+
+def test_invalid_entries_are_reported_and_skipped():
+    raw = [make_entry("Q1"), make_entry("Q2", correct="option-9"), {"question": "Q3"}, make_entry("Q4")]
+    questions, errors = parse_questions(raw, "quiz.json")
+    assert [q.text for q in questions] == ["Q1", "Q4"]
+    assert [q.source for q in questions] == [("quiz.json", 0), ("quiz.json", 3)]
+    assert [index for index, _message in errors] == [1, 2]
+
+
+def test_item_is_built_once_and_matches_entry():
+    question = parse_questions([make_entry()])[0][0]
+    item = question.build_item(1)
+    assert question.build_item(1) is item
+    grading = item["questionItem"]["question"]["grading"]
+    assert grading["correctAnswers"]["answers"] == [{"value": "b"}]
+    assert grading["whenRight"]["text"] == "Correct! Because"
+    assert [o["value"] for o in item["questionItem"]["question"]["choiceQuestion"]["options"]] == ["a", "b", "c", "d"]
+    assert question.to_dict() == make_entry()
+
+
+def test_preflight_and_parsing_apply_the_same_rules(tmp_path):
+    two_options = make_entry("Q2")
+    del two_options["options"]["option-3"], two_options["options"]["option-4"]
+    no_explanation = make_entry("Q3")
+    del no_explanation["explanation"]
+    path = tmp_path / "quiz.json"
+    path.write_text(json.dumps([make_entry("Q1"), two_options, no_explanation]), encoding='utf-8')
+
+    questions, errors = parse_questions(json.loads(path.read_text(encoding='utf-8')))
+    report = validate_file(str(path))
+    assert [q.text for q in questions] == ["Q1"]
+    assert sorted({index for index, _message in errors}) == sorted({index for index, _f, _m in report['errors']}) == [1, 2]
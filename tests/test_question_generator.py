@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for LLM question generation against the local stub backend.
+"""
+
+import json
+import os
+import sys
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_llm_server import MockLLMServer
+from utils.question import parse_questions
+from utils.question_generator import (
+    VOCABULARY_MARKER, GenerationCache, HttpLLMBackend, QuestionGenerator, find_vocabulary_chunks,
+    load_prompt_template
+)
+
+
+def write_chunk(path, words):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entries = [{"Vocabulary": word, "Meaning": f"meaning of {word}", "Collocation": None, "Context": None,
+                "IPA": None, "Time": "05/07/2025"} for word in words]
+    path.write_text(json.dumps(entries), encoding='utf-8')
+
+
+def run_generation(server, cache_path, jobs):
+    backend = HttpLLMBackend(server.url, 'stub', pool_size=2, max_retries=0)
+    generator = QuestionGenerator(backend, load_prompt_template(), GenerationCache(cache_path), max_workers=2)
+    rows = generator.generate_files(jobs)
+    backend.close()
+    return rows
+
+
+def test_generation_is_cached_per_entry_and_retries_invalid_replies(tmp_path):
+    write_chunk(tmp_path / "json" / "05-07-2025" / "1.json", ["cement", "hallmark", "vivid"])
+    write_chunk(tmp_path / "json" / "05-07-2025" / "2.json", ["resilient", "abandon"])
+    jobs = find_vocabulary_chunks(str(tmp_path / "json"), str(tmp_path / "questions"), "05/07/2025")
+    cache_path = str(tmp_path / "cache.json")
+
+    # Seeded so the first reply is malformed and has to be asked again
+    with MockLLMServer(invalid_rate=0.5, seed=3) as server:
+        rows = run_generation(server, cache_path, jobs)
+        assert [row['error'] for row in rows] == [None, None]
+        assert server.requests > 2
+
+    output = json.loads((tmp_path / "questions" / "05-07-2025" / "1.json").read_text(encoding='utf-8'))
+    questions, errors = parse_questions(output)
+    assert errors == [] and len(questions) == 3
+    assert [question['vocabulary'] for question in output] == ["cement", "hallmark", "vivid"]
+
+    # Unchanged day: no model calls; one edited entry: one call for that entry only
+    write_chunk(tmp_path / "json" / "05-07-2025" / "2.json", ["resilient", "abandoned"])
+    with MockLLMServer() as server:
+        rows = run_generation(server, cache_path, jobs)
+        assert [row['model_calls'] for row in rows] == [0, 1]
+        assert [entry['Vocabulary'] for entry in json.loads(server.prompts[0].split(VOCABULARY_MARKER)[1])] == ["abandoned"]
+    output = json.loads((tmp_path / "questions" / "05-07-2025" / "2.json").read_text(encoding='utf-8'))
+    assert [question['vocabulary'] for question in output] == ["resilient", "abandoned"]
+
+
+def test_failed_generation_reports_the_calls_actually_made(tmp_path):
+    write_chunk(tmp_path / "json" / "05-07-2025" / "1.json", ["cement", "vivid"])
+    jobs = find_vocabulary_chunks(str(tmp_path / "json"), str(tmp_path / "questions"))
+
+    class Backend:
+        def __init__(self, reply=None):
+            self.reply = reply
+            self.calls = 0
+
+        def complete(self, prompt):
+            self.calls += 1
+            if self.reply is None:
+                raise requests.exceptions.ConnectionError("endpoint down")
+            return self.reply
+
+    # Unavailable endpoint: one call, not max_attempts
+    unavailable = Backend()
+    generator = QuestionGenerator(unavailable, load_prompt_template(), max_attempts=3)
+    [row] = generator.generate_files(jobs)
+    _rows, [batch] = generator.generate_files_packed(jobs, budget=100000)
+    assert row['error'] and row['model_calls'] == 1 and batch['model_calls'] == 1 and unavailable.calls == 2
+
+    # Invalid replies are asked again up to max_attempts
+    invalid = Backend("not json")
+    [row] = QuestionGenerator(invalid, load_prompt_template(), max_attempts=3).generate_files(jobs)
+    assert row['error'] and row['model_calls'] == 3 == invalid.calls
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for exact and near-duplicate detection across question files.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.question import Question
+from utils.question_index import DuplicateFilter, QuestionIndex
+
+
+def make_question(text, answer, source_file, index):
+    options = {"option-1": answer, "option-2": "something else", "option-3": "other", "option-4": "none"}
+    return Question.from_dict({"question": text, "options": options, "correct_option": "option-1",
+                               "explanation": answer}, source_file, index)
+
+
+def test_duplicates_found_within_form_and_across_bank(tmp_path):
+    day1, day2, day3 = (str(tmp_path / name) for name in ("day1.json", "day2.json", "day3.json"))
+    for path in (day1, day2, day3):
+        open(path, 'w').close()
+    index_path = str(tmp_path / "index.json")
+
+    bank = [make_question("Which word means to give up completely?", "abandon", day1, 0),
+            make_question("What is the meaning of 'meticulous'?", "very careful", day1, 1)]
+    index = QuestionIndex(index_path)
+    DuplicateFilter(index).filter(bank)
+    index.save()
+
+    meaning = "able to recover quickly from difficult conditions"
+    form = [make_question("In the passage, what does 'resilient' most nearly mean?", meaning, day2, 0),
+            make_question("WHICH word means to give up completely!", "Abandon", day2, 1),
+            make_question("In this passage, what does 'resilient' most nearly mean?", meaning, day3, 0),
+            make_question("Choose the synonym of 'rapid'.", "fast", day3, 1)]
+    reloaded = QuestionIndex(index_path)
+    unique, duplicates = DuplicateFilter(reloaded).filter(form)
+
+    assert [question.source for question in unique] == [(day2, 0), (day2, 1), (day3, 1)]
+    by_source = {duplicate['source']: duplicate for duplicate in duplicates}
+    assert by_source[(day3, 0)]['in_form'] and by_source[(day3, 0)]['duplicate_of'] == (day2, 0)
+    assert by_source[(day3, 0)]['similarity'] >= 0.8
+    assert not by_source[(day2, 1)]['in_form'] and by_source[(day2, 1)]['duplicate_of'] == (os.path.abspath(day1), 0)
+    assert len(duplicates) == 2
+
+    # Signatures of unchanged files are reused rather than recomputed
+    reloaded.save()
+    assert QuestionIndex(index_path)._stored(day2) is not None
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for pre-flight question file validation.
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import question_validator
+from utils.question_validator import ValidationCache, validate_files
+
+
+def make_question(**overrides):
+    question = {
+        "question": "Q",
+        "options": {"option-1": "a", "option-2": "b", "option-3": "c", "option-4": "d"},
+        "correct_option": "option-1",
+        "explanation": "a"
+    }
+    question.update(overrides)
+    return question
+
+
+def test_errors_are_reported_by_file_index_and_field(tmp_path):
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps([make_question()]), encoding='utf-8')
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps([make_question(), make_question(correct_option="option-5", explanation="")]),
+                   encoding='utf-8')
+    broken = tmp_path / "broken.json"
+    broken.write_text("[{", encoding='utf-8')
+
+    reports, cached = validate_files([str(good), str(bad), str(broken)])
+
+    assert cached == 0
+    assert reports[0]['errors'] == []
+    assert [(index, field) for index, field, _message in reports[1]['errors']] == \
+        [(1, 'correct_option'), (1, 'explanation')]
+    assert reports[2]['errors'][0][:2] == (None, None)
+
+
+def test_unchanged_files_are_not_revalidated(tmp_path, monkeypatch):
+    paths = []
+    for n in range(3):
+        path = tmp_path / f"{n}.json"
+        path.write_text(json.dumps([make_question()]), encoding='utf-8')
+        paths.append(str(path))
+    cache_path = str(tmp_path / "cache" / "validation.json")
+    validate_files(paths, cache=ValidationCache(cache_path))
+
+    calls = []
+    original = question_validator.validate_file
+    monkeypatch.setattr(question_validator, 'validate_file', lambda path: calls.append(path) or original(path))
+    reports, cached = validate_files(paths, cache=ValidationCache(cache_path))
+    assert cached == 3 and calls == []
+
+    with open(paths[1], 'w', encoding='utf-8') as f:
+        json.dump([make_question(question="")], f)
+    reports, cached = validate_files(paths, cache=ValidationCache(cache_path))
+    assert cached == 2 and calls == [paths[1]]
+    assert reports[1]['errors'][0][1] == 'question'
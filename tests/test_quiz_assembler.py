@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for adaptive quiz assembly from harvested responses.
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+import main
+from utils import quiz_assembler
+from utils.quiz_assembler import DAY, BankCache, LearnerState, QuizAssembler, WordPriorityIndex, load_bank
+from utils.response_harvester import ResponseHarvester, ResponseStore
+
+WORDS = ["abandon", "vivid", "cement", "lucid"]
+
+
+@pytest.fixture
+def bank_path(tmp_path, write_vocabulary_questions):
+    return write_vocabulary_questions(tmp_path / "day1.json", WORDS)
+
+
+def test_index_updates_reorder_words():
+    index = WordPriorityIndex({word: priority for priority, word in enumerate(WORDS)})
+    assert index.smallest(2) == ["abandon", "vivid"]
+    for step in range(200):
+        index.update("abandon", 10 + step)
+    index.update("lucid", -1)
+    assert index.smallest(3) == ["lucid", "vivid", "cement"]
+    assert index.smallest(10) == ["lucid", "vivid", "cement", "abandon"] and len(index) == 4
+
+
+def test_missed_words_come_back_first(tmp_path, bank_path):
+    bank, _words_by_text = load_bank([bank_path])
+    state = LearnerState("student@example.com", str(tmp_path / "learners"))
+    assembler = QuizAssembler(bank, state, now=0)
+    for word in WORDS:
+        assembler.record(word, word != "cement", 0)
+    assert assembler.next_words(2) == ["cement", "abandon"]
+    # A word right twice waits longer than a word right once
+    assembler.record("abandon", True, 0)
+    assert assembler.next_words(4) == ["cement", "vivid", "lucid", "abandon"]
+    assert state.words["abandon"]['interval'] == 2 * DAY
+
+    questions, source_files = assembler.next_quiz(1)
+    assert [question.text for question in questions] == ["What does 'cement' mean?"]
+    state.save()
+    reloaded = QuizAssembler(bank, LearnerState("student@example.com", str(tmp_path / "learners")), now=0)
+    assert reloaded.next_words(4) == ["cement", "vivid", "lucid", "abandon"]
+    assert reloaded.state.words["cement"]['asked'] == 1
+
+
+def test_adaptive_form_reviews_words_answered_wrong(tmp_path, monkeypatch, bank_path, make_generator,
+                                                    make_read_transport):
+    monkeypatch.setattr(main, 'COLLECT_EMAIL_ADDRESSES', True)
+    monkeypatch.setattr(main, 'ADAPTIVE_BANK_CACHE_PATH', str(tmp_path / "bank.json"))
+    store_dir, state_dir = str(tmp_path / "responses"), str(tmp_path / "learners")
+    with MockFormsServer() as server:
+        generator = make_generator(server)
+        form_id = generator.create_mcq_form_from_json(bank_path, "Quiz")['form_id']
+        assert server.forms[form_id]['settings']['emailCollectionType'] == 'VERIFIED'
+        ids = [item['questionItem']['question']['questionId'] for item in server.forms[form_id]['items']]
+        server.submit_response(form_id, {ids[0]: "abandon A", ids[1]: "vivid A", ids[2]: "cement B",
+                                         ids[3]: "lucid A"}, email="student@example.com")
+        server.submit_response(form_id, {question_id: "x" for question_id in ids}, email="other@example.com")
+
+        transport = make_read_transport(server)
+        ResponseHarvester(transport, ResponseStore(store_dir, 'csv')).harvest([form_id])
+        transport.close()
+
+        result = generator.create_adaptive_form([bank_path], 1, "student@example.com", store_dir, state_dir)
+        titles = [item['title'] for item in server.forms[result['form_id']]['items'] if 'questionItem' in item]
+        assert titles == ["What does 'cement' mean?"]
+
+    state = LearnerState("student@example.com", state_dir)
+    assert len(state.applied_responses) == 1
+    assert {word: stats['answers'] for word, stats in state.words.items()} == dict.fromkeys(WORDS, 1)
+    # Answers already applied are not counted twice on the next run
+    assembler = QuizAssembler(load_bank([bank_path])[0], state)
+    assert assembler.apply_results(ResponseStore(store_dir, 'csv').load(), {}) == 0
+
+
+def test_answers_are_applied_once_per_response_however_late_they_arrive(tmp_path, bank_path):
+    bank, _words_by_text = load_bank([bank_path])
+    state = LearnerState("student@example.com", str(tmp_path / "learners"))
+    assembler = QuizAssembler(bank, state, now=0)
+    words_by_item = {("form", "q0"): "abandon", ("form", "q1"): "vivid"}
+
+    def answer(response_id, question_id, submitted):
+        return {'form_id': "form", 'response_id': response_id, 'question_id': question_id, 'correct': True,
+                'last_submitted_time': submitted}
+
+    first = pd.DataFrame([answer("r1", "q0", "2025-07-05T10:00:00Z")])
+    assert assembler.apply_results(first, words_by_item) == 1
+    # Same second as the first response, and an older one harvested later
+    later = pd.DataFrame([answer("r1", "q0", "2025-07-05T10:00:00Z"), answer("r2", "q1", "2025-07-05T10:00:00Z"),
+                          answer("r3", "q0", "2025-07-01T08:00:00Z")])
+    assert assembler.apply_results(later, words_by_item) == 2
+    assert state.words["abandon"]['answers'] == 2 and state.words["vivid"]['answers'] == 1
+    state.save()
+    reloaded = LearnerState("student@example.com", str(tmp_path / "learners"))
+    assert QuizAssembler(bank, reloaded, now=0).apply_results(later, words_by_item) == 0
+
+
+def test_only_questions_put_on_the_quiz_count_as_asked(tmp_path, bank_path):
+    bank, _words_by_text = load_bank([bank_path])
+    questions = json.loads(open(bank_path, encoding='utf-8').read())
+    del questions[1]["explanation"]
+    with open(bank_path, 'w', encoding='utf-8') as f:
+        json.dump(questions, f)
+    assembler = QuizAssembler(bank, LearnerState("student@example.com", str(tmp_path / "learners")), now=0)
+    quiz, _source_files = assembler.next_quiz(2)
+    assert [question.text for question in quiz] == ["What does 'abandon' mean?"]
+    assert assembler.state.words["abandon"]['asked'] == 1 and assembler.state.words["vivid"]['asked'] == 0
+
+
+def test_learner_needs_email_collection(tmp_path, monkeypatch, capsys, bank_path, make_generator):
+    monkeypatch.setattr(sys, 'argv', ['main.py', bank_path, '--adaptive', '2', '--learner', 'student@example.com'])
+    assert main.main() == 1 and "COLLECT_EMAIL_ADDRESSES" in capsys.readouterr().out
+
+    with MockFormsServer() as server:
+        form_id = make_generator(server).create_mcq_form_from_json(bank_path, "Quiz")['form_id']
+        question_id = server.forms[form_id]['items'][0]['questionItem']['question']['questionId']
+        response = server.submit_response(form_id, {question_id: "abandon A"}, email="student@example.com")
+    assert 'emailCollectionType' not in server.forms[form_id]['settings'] and 'respondentEmail' not in response
+
+
+def test_bank_cache_parses_only_changed_files(tmp_path, monkeypatch, bank_path):
+    cache_path = str(tmp_path / "bank.json")
+    first = load_bank([bank_path], BankCache(cache_path))
+    parsed = []
+    real_bank_rows = quiz_assembler.bank_rows
+    monkeypatch.setattr(quiz_assembler, 'bank_rows', lambda file_path: parsed.append(file_path) or real_bank_rows(file_path))
+    assert load_bank([bank_path], BankCache(cache_path)) == first and parsed == []
+
+    questions = json.loads(open(bank_path, encoding='utf-8').read())
+    questions[0]['vocabulary'] = "relinquish"
+    with open(bank_path, 'w', encoding='utf-8') as f:
+        json.dump(questions, f)
+    bank, _words_by_text = load_bank([bank_path], BankCache(cache_path))
+    assert parsed == [bank_path] and "relinquish" in bank and "abandon" not in bank
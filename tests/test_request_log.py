@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for offline compilation and resumable replay of Forms API calls.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+import main
+from utils.request_log import read_records_by_form
+
+
+@pytest.fixture
+def make_generator(make_generator):
+    """Like the shared fixture, but without retries, so injected errors stop the replay."""
+    def make(server=None):
+        generator = make_generator(server)
+        generator.transport.max_retries = 0
+        return generator
+    return make
+
+
+def test_compile_then_replay_resumes_without_duplicates(tmp_path, monkeypatch, write_questions, make_generator):
+    monkeypatch.setattr('main.BATCH_CHUNK_SIZE', 4)
+    jobs = [(name, [write_questions(tmp_path / f"{name}.json", 10, name)]) for name in ('a', 'b', 'c')]
+    log_path = str(tmp_path / "forms.jsonl")
+
+    assert make_generator().compile_forms(jobs, log_path, "Quiz") == 12
+    forms = read_records_by_form(log_path)
+    assert [record['op'] for record in forms['a']] == ['create', 'batchUpdate', 'batchUpdate', 'batchUpdate']
+    assert forms['a'][0]['body'] == {'info': {'title': 'Quiz - a'}}
+    assert forms['a'][2]['sources'][0] == [jobs[0][1][0], 4]
+
+    with MockFormsServer(error_rate=0.3, seed=7) as server:
+        first = make_generator(server).replay_request_log(log_path, max_workers=2)
+        assert not all(row['result'] for row in first)
+        server.error_rate = 0.0
+        second = make_generator(server).replay_request_log(log_path, max_workers=2)
+        third = make_generator(server).replay_request_log(log_path)
+        titles = {form['info']['title']: [item['title'] for item in form['items']] for form in server.forms.values()}
+
+    assert all(row['result']['questions_added'] == 10 for row in second)
+    assert [row['result']['form_id'] for row in third] == [row['result']['form_id'] for row in second]
+    assert third[0]['result']['round_trips'] == 0
+    for name in ('a', 'b', 'c'):
+        assert titles[f"Quiz - {name}"] == [f"{name}{i}" for i in range(10)]
+
+
+def test_compile_refuses_to_replace_a_log_unless_told_to_overwrite(tmp_path, monkeypatch, capsys, write_questions):
+    path = write_questions(tmp_path / "quiz.json", 3)
+    log_path = tmp_path / "forms.jsonl"
+    log_path.write_text("old\n", encoding='utf-8')
+
+    def run(*options):
+        monkeypatch.setattr(sys, 'argv', ['main.py', path, '--skip-validation', '--compile', str(log_path), *options])
+        return main.main()
+
+    # --force is about recreating cached forms, not about replacing files
+    assert run('--force') == 1 and "--overwrite" in capsys.readouterr().out
+    assert log_path.read_text(encoding='utf-8') == "old\n"
+    assert run('--overwrite') == 0
+    assert sum(len(records) for records in read_records_by_form(str(log_path)).values()) > 0
+
+
+def test_auth_failure_stops_the_replay_instead_of_rejecting_questions(tmp_path, write_questions, make_generator):
+    jobs = [('a', [write_questions(tmp_path / "a.json", 16, "a")])]
+    log_path = str(tmp_path / "forms.jsonl")
+    make_generator().compile_forms(jobs, log_path, "Quiz")
+
+    with MockFormsServer() as server:
+        # The form is created, then the token is refused for the question batch
+        server.fail_next(None, 401)
+        first = make_generator(server).replay_request_log(log_path)
+        counts = server.request_counts()
+        second = make_generator(server).replay_request_log(log_path)
+        titles = [item['title'] for form in server.forms.values() for item in form['items']]
+
+    assert first[0]['result'] is None and counts['batchUpdate 401'] == 1 and 'batchUpdate 200' not in counts
+    assert second[0]['result']['questions_added'] == 16 and second[0]['result']['rejected_questions'] == []
+    assert titles == [f"a{i}" for i in range(16)]
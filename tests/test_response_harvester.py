@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for harvesting quiz responses from the local mock Forms API.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.mock_forms_server import MockFormsServer
+from utils.response_harvester import ResponseHarvester, ResponseStore
+
+
+@pytest.fixture
+def create_form(tmp_path, write_questions, make_generator):
+    """Create a three-question quiz (answer "c") on `server`; returns (form_id, question ids)."""
+    def create(server):
+        path = write_questions(tmp_path / "quiz.json", 3, correct_option="option-3")
+        form_id = make_generator(server).create_mcq_form_from_json(path, "Quiz")['form_id']
+        question_ids = [item['questionItem']['question']['questionId'] for item in server.forms[form_id]['items']
+                        if 'questionItem' in item]
+        return form_id, question_ids
+    return create
+
+
+@pytest.fixture
+def harvest(make_read_transport):
+    def run(server, store, form_ids):
+        transport = make_read_transport(server)
+        rows = ResponseHarvester(transport, store, page_size=3, max_workers=2).harvest(form_ids)
+        transport.close()
+        return rows
+    return run
+
+
+def test_harvest_is_paginated_and_incremental(tmp_path, create_form, harvest):
+    start = datetime(2025, 7, 5, 9, 0, tzinfo=timezone.utc)
+    with MockFormsServer() as server:
+        form_id, question_ids = create_form(server)
+        empty_id, _ = create_form(server)
+        for student in range(7):
+            choices = {question_id: "c" if student % 2 else "a" for question_id in question_ids}
+            server.submit_response(form_id, choices, start + timedelta(minutes=student))
+
+        store = ResponseStore(str(tmp_path / "responses"), 'csv')
+        rows = harvest(server, store, [form_id, empty_id])
+        assert [(row['responses'], row['pages'], row['error']) for row in rows] == [(7, 3, None), (0, 1, None)]
+
+        # Second run only transfers the two new submissions
+        for minute in (30, 31):
+            server.submit_response(form_id, {question_ids[0]: "c"}, start + timedelta(minutes=minute))
+        rows = harvest(server, ResponseStore(str(tmp_path / "responses"), 'csv'), [form_id, empty_id])
+        assert [row['responses'] for row in rows] == [2, 0]
+        assert server.request_counts()['responses.list 200'] == 4 + 2
+
+    frame = ResponseStore(str(tmp_path / "responses"), 'csv').load()
+    assert frame['response_id'].nunique() == 9 and len(frame) == 7 * 3 + 2
+    assert frame.groupby('response_id')['total_score'].first().sum() == 3 * 3 + 2
+    assert frame['correct'].sum() == 3 * 3 + 2
+
+
+def test_pages_are_written_as_they_arrive_and_the_watermark_waits_for_the_last(tmp_path, create_form,
+                                                                              make_read_transport):
+    start = datetime(2025, 7, 5, 9, 0, tzinfo=timezone.utc)
+    with MockFormsServer() as server:
+        form_id, question_ids = create_form(server)
+        for student in range(7):
+            server.submit_response(form_id, {question_ids[0]: "c"}, start + timedelta(minutes=student))
+
+        # The second page fails: the first page is kept but the watermark does not move
+        store = ResponseStore(str(tmp_path / "responses"), 'csv')
+        transport = make_read_transport(server)
+        transport.max_retries = 0
+        server.fail_next(None, 500)
+        [row] = ResponseHarvester(transport, store, page_size=3).harvest([form_id])
+        assert row['error'] and row['pages'] == 1
+        assert len(store.part_files()) == 1 and store.watermark(form_id) is None
+
+        [row] = ResponseHarvester(transport, store, page_size=3).harvest([form_id])
+        transport.close()
+        assert row['error'] is None and row['pages'] == 3
+        assert len(store.part_files()) == 1 + 3 and store.watermark(form_id) == "2025-07-05T09:06:00.000Z"
+
+    frame = ResponseStore(str(tmp_path / "responses"), 'csv').load()
+    assert frame['response_id'].nunique() == 7 and len(frame) == 7
+
+
+def test_part_files_are_compacted_once_there_are_enough(tmp_path, create_form, harvest):
+    start = datetime(2025, 7, 5, 9, 0, tzinfo=timezone.utc)
+    with MockFormsServer() as server:
+        form_id, question_ids = create_form(server)
+        for student in range(7):
+            server.submit_response(form_id, {question_ids[0]: "c"}, start + timedelta(minutes=student))
+        store = ResponseStore(str(tmp_path / "responses"), 'csv', compact_parts=3)
+        # Three pages make three part files, merged into one at the end of the harvest
+        assert harvest(server, store, [form_id])[0]['pages'] == 3
+        assert len(store.part_files()) == 1
+        merged = store.load()
+
+        # An edit and a new submission: two more parts, below the threshold
+        server.responses[form_id][0]['lastSubmittedTime'] = '2025-07-05T10:00:00Z'
+        server.submit_response(form_id, {question_ids[0]: "a"}, start + timedelta(hours=2))
+        harvest(server, store, [form_id])
+        assert len(store.part_files()) == 2
+
+    before = store.load()
+    assert store.compact(min_parts=2) == 2 and len(store.part_files()) == 1
+    after = store.load()
+    assert len(merged) == 7 and len(after) == 8
+    assert after.sort_values('response_id').reset_index(drop=True).equals(
+        before.sort_values('response_id').reset_index(drop=True))
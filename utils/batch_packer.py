@@ -0,0 +1,49 @@
+"""
+Size-aware packing of batchUpdate requests.
+Question items vary a lot in size (explanations are repeated in both the
+right and wrong answer feedback), so a fixed number of questions per batch
+can still produce a request body the API refuses. The packer groups
+consecutive items into batches that stay under both an item and a byte budget.
+"""
+
+from utils import json_backend
+
+# Bytes of the {"requests":[...]} envelope around the request list
+ENVELOPE_BYTES = len(b'{"requests":[]}')
+
+# Room for the location index digits, which are only known at send time
+INDEX_DIGITS = 10
+
+
+def request_bytes(request):
+    """Serialized size of one request in a batch, including its separating comma."""
+    return len(json_backend.dumps_bytes(request)) + 1
+
+
+def create_item_bytes(item_body):
+    """Serialized size of the createItem request for `item_body`, whatever its index."""
+    return request_bytes({"createItem": {"item": item_body, "location": {"index": 0}}}) + INDEX_DIGITS
+
+
+def pack_batches(sizes, max_items=None, max_bytes=None, reserved_bytes=0):
+    """Split items with the given serialized `sizes` into consecutive batches.
+
+    Returns (start, end) ranges covering every item in order. A batch holds
+    at most `max_items` items and, with the envelope, at most `max_bytes`
+    bytes; `reserved_bytes` (e.g. settings requests) count against the first
+    batch only. An item too big for any batch is sent alone rather than dropped.
+    """
+    batches = []
+    start = 0
+    used = ENVELOPE_BYTES + reserved_bytes
+    for position, size in enumerate(sizes):
+        full = max_items and position - start >= max_items
+        too_big = max_bytes and position > start and used + size > max_bytes
+        if full or too_big:
+            batches.append((start, position))
+            start = position
+            used = ENVELOPE_BYTES
+        used += size
+    if start < len(sizes):
+        batches.append((start, len(sizes)))
+    return batches
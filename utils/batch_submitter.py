@@ -0,0 +1,138 @@
+"""
+Chunked batchUpdate submission with bisection-based failure isolation.
+Questions are sent in chunks; when the API rejects a chunk it is split in
+half and retried, so each bad question is isolated in O(log n) requests
+instead of falling back to one request per question.
+"""
+
+from utils.batch_packer import create_item_bytes, pack_batches, request_bytes
+
+# Outcomes returned by the send callback
+SENT = 'sent'           # batch accepted
+REJECTED = 'rejected'   # batch refused because of its content - bisect it
+FAILED = 'failed'       # transport, server or auth failure - stop submitting
+
+# Statuses that blame the request body; any other error (401, 403, 404, 429, 5xx)
+# would fail every sub-batch the same way, so bisecting it only wastes calls
+CONTENT_ERROR_STATUS_CODES = {400, 413}
+
+
+class ChunkedSubmitter:
+    """Submit createItem requests in chunks, bisecting rejected chunks.
+
+    `send_batch(requests_list)` must return SENT, REJECTED or FAILED.
+    Chunks hold at most `chunk_size` items and, when `max_batch_bytes` is
+    set, at most that many serialized bytes per request body. Location
+    indices are assigned at send time from the number of items already
+    accepted, so isolating a bad item never leaves a gap that would
+    invalidate the indices of the items after it.
+    """
+
+    def __init__(self, send_batch, chunk_size=100, max_batch_bytes=None):
+        self.send_batch = send_batch
+        self.chunk_size = max(1, chunk_size or 1)
+        self.max_batch_bytes = max_batch_bytes
+        # True while the batch being sent is a retry isolating a rejected chunk
+        self.fallback = False
+
+    def submit(self, items, prefix_requests=(), start_index=0):
+        """Submit `items`, a list of (item_body, source) tuples.
+
+        `prefix_requests` (e.g. form description and quiz settings) ride along
+        with the first batch and are isolated like an item if they are rejected.
+        Returns a dict with the added count, the sources of rejected items, the
+        sources of items that were never sent, and the number of batches sent.
+        """
+        self._prefix = list(prefix_requests)
+        self._result = {
+            'added': 0,
+            'rejected': [],
+            'failed': [],
+            'prefix_applied': not self._prefix,
+            'batches': 0
+        }
+        self._start_index = start_index
+        self._aborted = False
+
+        for start, end in self._plan_chunks(items):
+            self._submit_chunk(items[start:end])
+
+        if self._prefix and not self._aborted and not self._result['prefix_applied']:
+            # Nothing was accepted alongside the prefix; apply it on its own
+            self.fallback = bool(items)
+            self._submit_prefix_alone()
+        self.fallback = False
+        return self._result
+
+    def _plan_chunks(self, items):
+        """Return the (start, end) ranges of `items` sent as the initial chunks."""
+        if not self.max_batch_bytes:
+            return pack_batches([0] * len(items), self.chunk_size)
+        sizes = [create_item_bytes(item_body) for item_body, _source in items]
+        reserved = sum(request_bytes(request) for request in self._prefix)
+        return pack_batches(sizes, self.chunk_size, self.max_batch_bytes, reserved)
+
+    def _send(self, chunk, with_prefix=True):
+        index = self._start_index + self._result['added']
+        requests_list = list(self._prefix) if with_prefix else []
+        for offset, (item_body, _source) in enumerate(chunk):
+            requests_list.append({
+                "createItem": {
+                    "item": item_body,
+                    "location": {"index": index + offset}
+                }
+            })
+        self._result['batches'] += 1
+        return self.send_batch(requests_list)
+
+    def _accept(self, chunk):
+        self._result['added'] += len(chunk)
+        if self._prefix:
+            self._prefix = []
+            self._result['prefix_applied'] = True
+
+    def _submit_chunk(self, chunk, depth=0):
+        if self._aborted:
+            self._result['failed'].extend(source for _item, source in chunk)
+            return
+
+        self.fallback = depth > 0
+        outcome = self._send(chunk)
+        if outcome == SENT:
+            self._accept(chunk)
+        elif outcome == FAILED:
+            self._aborted = True
+            self._result['failed'].extend(source for _item, source in chunk)
+        elif len(chunk) == 1:
+            self.fallback = True
+            self._isolate_single(chunk)
+        else:
+            mid = len(chunk) // 2
+            self._submit_chunk(chunk[:mid], depth + 1)
+            self._submit_chunk(chunk[mid:], depth + 1)
+
+    def _isolate_single(self, chunk):
+        """A single item was rejected; make sure the prefix is not the culprit."""
+        if self._prefix:
+            self._submit_prefix_alone()
+            if self._aborted:
+                self._result['failed'].extend(source for _item, source in chunk)
+                return
+            outcome = self._send(chunk, with_prefix=False)
+            if outcome == SENT:
+                self._result['added'] += 1
+                return
+            if outcome == FAILED:
+                self._aborted = True
+                self._result['failed'].extend(source for _item, source in chunk)
+                return
+        self._result['rejected'].extend(source for _item, source in chunk)
+
+    def _submit_prefix_alone(self):
+        outcome = self._send([], with_prefix=True)
+        if outcome == SENT:
+            self._result['prefix_applied'] = True
+        elif outcome == FAILED:
+            self._aborted = True
+        # Either way the prefix is settled and no longer rides along
+        self._prefix = []
@@ -1,13 +1,24 @@
+import base64
 import csv
 import sys
 import os
 import json
+import hashlib
+import argparse
+import tempfile
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pprint import pprint
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import JSON_PATH_DIR, CSV_FILE_PATH
+from utils import json_backend
+
+CHUNK_SIZE = 20  # vocabulary entries per JSON file
+MANIFEST_FILE = '.manifest.json'  # per-date content hashes of the written chunks
+DATE_WRITER_WORKERS = 8  # date folders written in parallel
+WATERMARK_FILE = '.csv_watermark.json'  # incremental mode state: offset, checksums, packed word dates
 
 def build_vocabulary_dict(csv_file_path) -> dict:
     vocabulary_dict = {}
@@ -52,25 +63,413 @@ def from_dict_to_json_file(vocabulary_dict: dict, date: str = None):
     # - split to multiple json files, named as whatever can be unique
     # - each file contains maximum 20 entries
     # - each file is saved in a folder named as the date in Time field
-    for time, entries in working_dict.items():
-        if not entries:
+    # Date folders whose content hash is unchanged since the last run are skipped,
+    # and independent date folders are written in parallel.
+    manifest = load_manifest(JSON_PATH_DIR)
+    dates = [time for time, entries in working_dict.items() if entries]
+
+    def write_date(time):
+        return write_date_folder(JSON_PATH_DIR, time, working_dict[time], manifest.get(date_folder_name(time)))
+
+    summary = {'written': [], 'unchanged': []}
+    with ThreadPoolExecutor(max_workers=DATE_WRITER_WORKERS) as executor:
+        for time, (digest, changed) in zip(dates, executor.map(write_date, dates)):
+            manifest[date_folder_name(time)] = digest
+            summary['written' if changed else 'unchanged'].append(time)
+
+    if summary['written']:
+        save_manifest(JSON_PATH_DIR, manifest)
+    return summary
+
+def date_folder_name(noted_time: str) -> str:
+    return noted_time.replace('/', '-')
+
+def serialize_chunk(chunk) -> str:
+    return json_backend.dumps_pretty(chunk)
+
+def write_file_atomically(file_path, text):
+    """Write via a temp file in the same folder and rename, so readers never see partial files."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.write(text)
+        os.replace(tmp_path, file_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_chunk_file(output_dir, noted_time, number, chunk) -> str:
+    """Write one N.json chunk into the folder for its date, unless it is already identical.
+
+    Returns the serialized chunk so callers can hash it.
+    """
+    date_folder = os.path.join(output_dir, date_folder_name(noted_time))
+    if not os.path.exists(date_folder):
+        os.makedirs(date_folder, exist_ok=True)
+    file_path = os.path.join(date_folder, f"{number}.json")
+    text = serialize_chunk(chunk)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as json_file:
+            if json_file.read() == text:
+                return text
+    except FileNotFoundError:
+        pass
+    write_file_atomically(file_path, text)
+    return text
+
+def remove_stale_chunks(output_dir, noted_time, chunk_count):
+    """Delete trailing N.json files left over from a run that produced more chunks."""
+    date_folder = os.path.join(output_dir, date_folder_name(noted_time))
+    number = chunk_count + 1
+    while os.path.exists(os.path.join(date_folder, f"{number}.json")):
+        os.remove(os.path.join(date_folder, f"{number}.json"))
+        number += 1
+
+def remove_date_folder(output_dir, noted_time):
+    """Remove every chunk of a date that no longer has vocabulary, and the folder if empty."""
+    remove_stale_chunks(output_dir, noted_time, 0)
+    date_folder = os.path.join(output_dir, date_folder_name(noted_time))
+    if os.path.isdir(date_folder) and not os.listdir(date_folder):
+        os.rmdir(date_folder)
+
+def write_date_folder(output_dir, noted_time, entries, known_hash=None):
+    """Write all chunks for one date; skip the folder if its content hash is unchanged.
+
+    Returns (content_hash, changed).
+    """
+    texts = [serialize_chunk(entries[i:i + CHUNK_SIZE]) for i in range(0, len(entries), CHUNK_SIZE)]
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+    content_hash = digest.hexdigest()
+
+    date_folder = os.path.join(output_dir, date_folder_name(noted_time))
+    if content_hash == known_hash \
+            and os.path.exists(os.path.join(date_folder, f"{len(texts)}.json")) \
+            and not os.path.exists(os.path.join(date_folder, f"{len(texts) + 1}.json")):
+        return content_hash, False
+
+    for i in range(len(texts)):
+        write_chunk_file(output_dir, noted_time, i + 1, entries[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE])
+    remove_stale_chunks(output_dir, noted_time, len(texts))
+    return content_hash, True
+
+def load_manifest(output_dir) -> dict:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(output_dir, manifest: dict):
+    os.makedirs(output_dir, exist_ok=True)
+    write_file_atomically(os.path.join(output_dir, MANIFEST_FILE), json.dumps(manifest, indent=4, sort_keys=True))
+
+# Streaming pipeline: read -> normalize -> dedup -> group by Time -> chunk writer.
+# No entry values are held beyond one open chunk per date; the dedup index still
+# grows with the vocabulary, one dict item (8-byte key, row number) per distinct
+# word, so memory is O(distinct words) rather than O(CSV size).
+
+def read_vocabulary_rows(csv_file_path, complete_only: bool = False):
+    """Stage 1: stream raw CSV rows; `complete_only` leaves out an unterminated final record."""
+    if complete_only:
+        yield from (row for row, _end_offset in read_complete_rows(csv_file_path))
+        return
+    with open(csv_file_path, mode='r', encoding='utf-8') as file:
+        yield from csv.DictReader(file)
+
+def normalize_rows(rows):
+    """Stage 2: yield (vocabulary, entry) pairs shaped like build_vocabulary_dict values."""
+    for row in rows:
+        vocab = (row.get('Vocabulary') or '').strip()
+        if not vocab:  # skip empty vocabulary entries
+            continue
+        yield vocab, {
+            'Meaning': (row.get('Meaning') or '').strip() or None,
+            'Collocation': (row.get('Collocation') or '').strip() or None,
+            'Context': (row.get('Context') or '').strip() or None,
+            'IPA': (row.get('IPA') or '').strip() or None,
+            'Time': (row.get('Time') or '').strip() or None
+        }
+
+def vocabulary_key(vocab: str) -> bytes:
+    """Fixed-size key for the dedup index, so long words do not grow it."""
+    return hashlib.blake2b(vocab.encode('utf-8'), digest_size=8).digest()
+
+def build_last_occurrence_index(csv_file_path, complete_only: bool = False) -> dict:
+    """First pass: map each vocabulary key to the row number of its last occurrence."""
+    index = {}
+    for row_number, (vocab, _entry) in enumerate(normalize_rows(read_vocabulary_rows(csv_file_path, complete_only))):
+        index[vocabulary_key(vocab)] = row_number
+    return index
+
+def dedup_rows(entries, last_occurrence: dict):
+    """Stage 3: keep only the last row for each vocabulary, matching build_vocabulary_dict."""
+    for row_number, (vocab, entry) in enumerate(entries):
+        if last_occurrence.get(vocabulary_key(vocab)) == row_number:
+            yield vocab, entry
+
+def write_grouped_chunks(entries, date: str = None, output_dir: str = JSON_PATH_DIR, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Stages 4-5: group entries by Time and flush each chunk file as soon as it fills.
+
+    Returns the number of entries written per date.
+    """
+    open_chunks = defaultdict(list)
+    written_chunks = defaultdict(int)
+    counts = defaultdict(int)
+    hashes = defaultdict(hashlib.sha256)
+
+    for vocab, entry in entries:
+        noted_time = entry.get('Time', None)
+        if not noted_time or (date and noted_time != date):
+            continue
+        entry['Vocabulary'] = vocab
+        chunk = open_chunks[noted_time]
+        chunk.append(entry)
+        counts[noted_time] += 1
+        if len(chunk) == chunk_size:
+            written_chunks[noted_time] += 1
+            text = write_chunk_file(output_dir, noted_time, written_chunks[noted_time], chunk)
+            hashes[noted_time].update(text.encode('utf-8'))
+            del open_chunks[noted_time]
+
+    for noted_time, chunk in open_chunks.items():
+        written_chunks[noted_time] += 1
+        text = write_chunk_file(output_dir, noted_time, written_chunks[noted_time], chunk)
+        hashes[noted_time].update(text.encode('utf-8'))
+
+    # Unchanged chunks were left untouched above; drop leftovers and record hashes
+    manifest = load_manifest(output_dir)
+    for noted_time, chunk_count in written_chunks.items():
+        remove_stale_chunks(output_dir, noted_time, chunk_count)
+        manifest[date_folder_name(noted_time)] = hashes[noted_time].hexdigest()
+    if written_chunks:
+        save_manifest(output_dir, manifest)
+    return dict(counts)
+
+def stream_csv_to_json_files(csv_file_path, date: str = None, output_dir: str = JSON_PATH_DIR,
+                             complete_only: bool = False) -> dict:
+    """Convert the vocabulary CSV into date-grouped chunk files with bounded memory.
+
+    Duplicate vocabulary keeps the values of its last row, as build_vocabulary_dict
+    does, but within a date entries are ordered by that last occurrence, whereas
+    from_dict_to_json_file keeps the position of the first one. This is the order
+    incremental mode produces when a word is noted again, so a full rebuild and
+    an incremental run write the same chunks.
+    """
+    last_occurrence = build_last_occurrence_index(csv_file_path, complete_only)
+    entries = dedup_rows(normalize_rows(read_vocabulary_rows(csv_file_path, complete_only)), last_occurrence)
+    return write_grouped_chunks(entries, date, output_dir)
+
+# Watermarked incremental mode: the vocabulary sheet is append-only, so a run
+# only parses the records added after the last processed byte offset.
+
+def read_complete_records(csv_file_path, offset: int = 0):
+    """Yield (fields, end_offset) for each CSV record from `offset` that ends in a newline.
+
+    Offsets are record boundaries, so quoted fields spanning lines stay whole.
+    A final record cut off by the end of the file (no trailing newline, or an
+    unclosed quote) is not yielded and is picked up whole by the next run.
+    """
+    state = {'position': offset, 'terminated': True, 'eof': False}
+
+    def lines(f):
+        for line in f:
+            state['position'] += len(line)
+            state['terminated'] = line.endswith(b'\n')
+            yield line.decode('utf-8')
+        state['eof'] = True
+
+    with open(csv_file_path, 'rb') as f:
+        f.seek(offset)
+        reader = csv.reader(lines(f))
+        try:
+            for fields in reader:
+                if state['eof'] or not state['terminated']:
+                    return
+                yield fields, state['position']
+        except csv.Error:
+            # Only an unterminated final record is malformed this way
+            return
+
+def read_complete_rows(csv_file_path, offset: int = 0, header: list = None):
+    """Yield (row dict, end_offset) for complete records; without `header` the first record is it."""
+    for fields, end_offset in read_complete_records(csv_file_path, offset):
+        if header is None:
+            header = fields
             continue
-        noted_time = time.replace('/', '-')
-        date_folder = os.path.join(JSON_PATH_DIR, noted_time)
-        if not os.path.exists(date_folder):
-            os.makedirs(date_folder)
-        for i in range(0, len(entries), 20):
-            chunk = entries[i:i + 20]
-            file_name = f"{i // 20 + 1}.json"
-            file_path = os.path.join(date_folder, file_name)
-            with open(file_path, 'w', encoding='utf-8') as json_file:
-                json.dump(chunk, json_file, ensure_ascii=False, indent=4)
+        yield dict(zip(header, fields)), end_offset
+
+def csv_header(csv_file_path):
+    """Return (header fields, byte offset just past the header record)."""
+    for fields, end_offset in read_complete_records(csv_file_path):
+        return fields, end_offset
+    return None, 0
+
+def header_hash(header) -> str:
+    return hashlib.sha256(json.dumps(header, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def hash_file_prefix(csv_file_path, length: int, start: int = 0, digest=None):
+    """Feed bytes [start, length) of the file into `digest` (a new sha256 by default) and return it."""
+    digest = digest or hashlib.sha256()
+    remaining = length - start
+    with open(csv_file_path, 'rb') as f:
+        f.seek(start)
+        while remaining > 0:
+            data = f.read(min(1 << 20, remaining))
+            if not data:
+                break
+            digest.update(data)
+            remaining -= len(data)
+    return digest
+
+def pack_word_dates(word_dates: dict) -> dict:
+    """Store the dedup index as {Time: base64 of the 8-byte vocabulary keys noted under it}."""
+    by_date = defaultdict(list)
+    for key, noted_time in word_dates.items():
+        if noted_time:
+            by_date[noted_time].append(key)
+    return {noted_time: base64.b64encode(b''.join(sorted(keys))).decode('ascii')
+            for noted_time, keys in sorted(by_date.items())}
+
+def unpack_word_dates(packed: dict) -> dict:
+    word_dates = {}
+    for noted_time, encoded in packed.items():
+        keys = base64.b64decode(encoded)
+        for i in range(0, len(keys), 8):
+            word_dates[keys[i:i + 8]] = noted_time
+    return word_dates
+
+def load_watermark(output_dir) -> dict:
+    try:
+        with open(os.path.join(output_dir, WATERMARK_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_watermark(output_dir, watermark: dict):
+    os.makedirs(output_dir, exist_ok=True)
+    write_file_atomically(os.path.join(output_dir, WATERMARK_FILE), json.dumps(watermark, ensure_ascii=False))
+
+def read_date_entries(output_dir, noted_time) -> list:
+    """Read back every entry currently written for one date, in chunk order."""
+    date_folder = os.path.join(output_dir, date_folder_name(noted_time))
+    entries = []
+    number = 1
+    while os.path.exists(os.path.join(date_folder, f"{number}.json")):
+        entries.extend(json_backend.load_file(os.path.join(date_folder, f"{number}.json")))
+        number += 1
+    return entries
+
+def full_rebuild_with_watermark(csv_file_path, output_dir: str = JSON_PATH_DIR) -> dict:
+    """Rebuild every date folder from the complete records and record a fresh watermark."""
+    previous_dates = set(load_manifest(output_dir))
+    counts = stream_csv_to_json_files(csv_file_path, output_dir=output_dir, complete_only=True)
+
+    # Dates that vanished from an edited sheet lose their chunk files
+    manifest = load_manifest(output_dir)
+    current_dates = set(date_folder_name(time) for time in counts)
+    for folder in previous_dates - current_dates:
+        remove_date_folder(output_dir, folder)
+        manifest.pop(folder, None)
+    save_manifest(output_dir, manifest)
+
+    header, offset = csv_header(csv_file_path)
+    word_dates = {}
+    new_rows = 0
+    for row, end_offset in read_complete_rows(csv_file_path, offset, header):
+        offset = end_offset
+        for vocab, entry in normalize_rows([row]):
+            word_dates[vocabulary_key(vocab)] = entry['Time']
+            new_rows += 1
+
+    save_watermark(output_dir, {
+        'csv_path': os.path.abspath(csv_file_path),
+        'offset': offset,
+        'header_sha256': header_hash(header),
+        'prefix_sha256': hash_file_prefix(csv_file_path, offset).hexdigest(),
+        'words': pack_word_dates(word_dates)
+    })
+    return {'mode': 'full', 'new_rows': new_rows, 'dates_written': sorted(counts)}
+
+def incremental_csv_to_json_files(csv_file_path, output_dir: str = JSON_PATH_DIR) -> dict:
+    """Process only records appended since the last run, touching only affected dates.
+
+    Falls back to a full rebuild when there is no watermark or the checksum of the
+    already-processed prefix shows the file was edited in place.
+    """
+    watermark = load_watermark(output_dir)
+    offset = watermark.get('offset', 0)
+    if 'words' not in watermark or watermark.get('csv_path') != os.path.abspath(csv_file_path) \
+            or os.path.getsize(csv_file_path) < offset:
+        return full_rebuild_with_watermark(csv_file_path, output_dir)
+
+    digest = hash_file_prefix(csv_file_path, offset)
+    header, _header_end = csv_header(csv_file_path)
+    if digest.hexdigest() != watermark.get('prefix_sha256') or header_hash(header) != watermark.get('header_sha256'):
+        print("CSV was edited in place; falling back to a full rebuild.")
+        return full_rebuild_with_watermark(csv_file_path, output_dir)
+
+    # Seek straight past the processed prefix; last row wins among the new rows too
+    updates = {}
+    new_rows = 0
+    end = offset
+    for row, end_offset in read_complete_rows(csv_file_path, offset, header):
+        end = end_offset
+        for vocab, entry in normalize_rows([row]):
+            updates.pop(vocab, None)
+            updates[vocab] = entry
+            new_rows += 1
+
+    # A re-noted word leaves its old date and joins its new one
+    word_dates = unpack_word_dates(watermark['words'])
+    affected = {}
+    for vocab, entry in updates.items():
+        key = vocabulary_key(vocab)
+        old_time = word_dates.get(key)
+        if old_time:
+            affected.setdefault(old_time, [])
+        if entry['Time']:
+            entry['Vocabulary'] = vocab
+            affected.setdefault(entry['Time'], []).append(entry)
+        word_dates[key] = entry['Time']
+
+    manifest = load_manifest(output_dir)
+    for time, new_entries in affected.items():
+        kept = [entry for entry in read_date_entries(output_dir, time) if entry.get('Vocabulary') not in updates]
+        entries = kept + new_entries
+        if entries:
+            content_hash, _changed = write_date_folder(output_dir, time, entries, manifest.get(date_folder_name(time)))
+            manifest[date_folder_name(time)] = content_hash
+        else:
+            remove_date_folder(output_dir, time)
+            manifest.pop(date_folder_name(time), None)
+    if affected:
+        save_manifest(output_dir, manifest)
+
+    if end != offset:
+        watermark.update({
+            'offset': end,
+            'prefix_sha256': hash_file_prefix(csv_file_path, end, offset, digest).hexdigest(),
+            'words': pack_word_dates(word_dates)
+        })
+        save_watermark(output_dir, watermark)
+    return {'mode': 'incremental', 'new_rows': new_rows, 'dates_written': sorted(affected)}
 
 # Example usage:
 if __name__ == "__main__":
-    vocab_dict = build_vocabulary_dict(CSV_FILE_PATH)
-    len_vocab = len(vocab_dict)
-    # pprint(vocab_dict)
-    print("---------------------------")
-    from_dict_to_json_file(vocab_dict)
-    print(f"Vocabulary dictionary created with {len_vocab} entries.")
+    parser = argparse.ArgumentParser(description='Convert the vocabulary CSV into date-grouped JSON chunk files')
+    parser.add_argument('--incremental', '-i', action='store_true', help='Only process rows appended since the last run (falls back to a full rebuild if the CSV was edited)')
+    args = parser.parse_args()
+
+    if args.incremental:
+        result = incremental_csv_to_json_files(CSV_FILE_PATH)
+        print("---------------------------")
+        print(f"{result['mode'].capitalize()} run: {result['new_rows']} rows processed, "
+              f"{len(result['dates_written'])} dates updated.")
+    else:
+        counts = stream_csv_to_json_files(CSV_FILE_PATH)
+        len_vocab = sum(counts.values())
+        print("---------------------------")
+        print(f"Vocabulary JSON files created for {len_vocab} entries across {len(counts)} dates.")
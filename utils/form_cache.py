@@ -0,0 +1,95 @@
+"""
+Content-hash idempotency cache for created forms.
+Maps a hash of the normalized questions, title and settings to the form that
+was created from them, so re-running on unchanged input costs no API calls.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def _normalize(value):
+    """Collapse whitespace in every string so cosmetic edits don't change the key."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def form_cache_key(questions, title=None, description="", settings=None):
+    """Hash the normalized question payload together with title and settings."""
+    payload = {
+        'title': title,
+        'description': description,
+        'settings': settings or {},
+        'questions': _normalize(questions)
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class FormCache:
+    """Thread-safe JSON manifest of created forms keyed by content hash."""
+
+    def __init__(self, path, ttl_days=30):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        if self._evict_stale():
+            self._save()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: Ignoring unreadable form cache {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.form_cache.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _evict_stale(self):
+        if not self.ttl_seconds:
+            return False
+        cutoff = time.time() - self.ttl_seconds
+        stale = [key for key, entry in self._entries.items() if entry.get('created_at', 0) < cutoff]
+        for key in stale:
+            del self._entries[key]
+        return bool(stale)
+
+    def get(self, key):
+        """Return the cached form result for `key`, or None if missing or stale."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self.ttl_seconds and entry.get('created_at', 0) < time.time() - self.ttl_seconds:
+                return None
+            return dict(entry['result']) if entry else None
+
+    def put(self, key, result):
+        """Record a created form and persist the manifest atomically."""
+        with self._lock:
+            self._entries[key] = {'created_at': time.time(), 'result': result}
+            self._evict_stale()
+            self._save()
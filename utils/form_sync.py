@@ -0,0 +1,161 @@
+"""
+Incremental sync of an existing Google Form with a question list.
+Diffs the form's current items against the desired question items and plans
+the minimal deleteItem/moveItem/createItem/updateItem requests for one
+batchUpdate, so fixing one question keeps the form and its URL intact.
+"""
+
+UPDATE_MASK = "title,description,questionItem.question"
+
+
+def question_key(title):
+    """Stable key for matching a form item to a question: its normalized text."""
+    return " ".join((title or "").split()).casefold()
+
+
+def is_choice_question(item):
+    """True for the multiple-choice question items this tool manages."""
+    return 'choiceQuestion' in item.get('questionItem', {}).get('question', {})
+
+
+def item_signature(item):
+    """Comparable summary of the item fields the generator controls."""
+    question = item.get('questionItem', {}).get('question', {})
+    grading = question.get('grading', {})
+    return (
+        item.get('title', ''),
+        item.get('description', ''),
+        question.get('required', False),
+        tuple(option.get('value') for option in question.get('choiceQuestion', {}).get('options', [])),
+        tuple(answer.get('value') for answer in grading.get('correctAnswers', {}).get('answers', [])),
+        grading.get('pointValue', 0),
+        grading.get('whenRight', {}).get('text', ''),
+        grading.get('whenWrong', {}).get('text', '')
+    )
+
+
+def _longest_increasing_subsequence(values):
+    """Return the set of positions in `values` forming a longest increasing run."""
+    tails, tails_pos, previous = [], [], [None] * len(values)
+    for pos, value in enumerate(values):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        previous[pos] = tails_pos[lo - 1] if lo else None
+        if lo == len(tails):
+            tails.append(value)
+            tails_pos.append(pos)
+        else:
+            tails[lo] = value
+            tails_pos[lo] = pos
+    keep = set()
+    pos = tails_pos[-1] if tails_pos else None
+    while pos is not None:
+        keep.add(pos)
+        pos = previous[pos]
+    return keep
+
+
+def plan_sync_requests(existing_items, desired_items):
+    """Plan the batchUpdate requests turning `existing_items` into `desired_items`.
+
+    `existing_items` are the form's items as returned by forms.get;
+    `desired_items` are item bodies as built for createItem. Items are matched
+    by question key; leftover unmatched pairs are matched by position and
+    updated in place. Items this tool does not manage (page breaks, text,
+    other question types) are kept, after the managed questions.
+    Returns (requests_list, counts).
+    """
+    counts = {'created': 0, 'updated': 0, 'deleted': 0, 'moved': 0, 'unchanged': 0}
+
+    # Match desired questions to existing managed items by key, then by position
+    by_key = {}
+    for index, item in enumerate(existing_items):
+        if is_choice_question(item):
+            by_key.setdefault(question_key(item.get('title')), []).append(index)
+    matches = [None] * len(desired_items)
+    for j, item in enumerate(desired_items):
+        candidates = by_key.get(question_key(item.get('title')))
+        if candidates:
+            matches[j] = candidates.pop(0)
+    leftover = sorted(index for indices in by_key.values() for index in indices)
+    unmatched_desired = [j for j, match in enumerate(matches) if match is None]
+    for j, index in zip(unmatched_desired, leftover):
+        matches[j] = index
+    matched = set(match for match in matches if match is not None)
+
+    requests_list = []
+
+    # Deletes, highest index first so earlier indices stay valid
+    current = list(range(len(existing_items)))
+    for index in sorted((i for i, item in enumerate(existing_items)
+                         if is_choice_question(item) and i not in matched), reverse=True):
+        requests_list.append({"deleteItem": {"location": {"index": index}}})
+        current.remove(index)
+        counts['deleted'] += 1
+
+    # Target order: desired questions, then unmanaged items in their original order
+    target = [match if match is not None else ('new', j) for j, match in enumerate(matches)]
+    target += [i for i in current if not is_choice_question(existing_items[i])]
+
+    # Items on a longest increasing run of current positions never need to move
+    existing_in_target = [entry for entry in target if not isinstance(entry, tuple)]
+    stable_positions = _longest_increasing_subsequence([current.index(entry) for entry in existing_in_target])
+    stable = set(existing_in_target[pos] for pos in stable_positions)
+
+    for j, entry in enumerate(target):
+        if entry in stable:
+            continue
+        new_index = current.index(target[j - 1]) + 1 if j else 0
+        if isinstance(entry, tuple):
+            requests_list.append({
+                "createItem": {
+                    "item": desired_items[entry[1]],
+                    "location": {"index": new_index}
+                }
+            })
+            current.insert(new_index, entry)
+            counts['created'] += 1
+        else:
+            old_index = current.index(entry)
+            if old_index < new_index:
+                new_index -= 1
+            if old_index != new_index:
+                requests_list.append({
+                    "moveItem": {
+                        "originalLocation": {"index": old_index},
+                        "newLocation": {"index": new_index}
+                    }
+                })
+                counts['moved'] += 1
+            current.remove(entry)
+            current.insert(new_index, entry)
+
+    # Content updates last, addressed by final position
+    for j, match in enumerate(matches):
+        if match is None:
+            continue
+        existing = existing_items[match]
+        desired = desired_items[j]
+        if item_signature(existing) == item_signature(desired):
+            counts['unchanged'] += 1
+            continue
+        item = dict(desired, itemId=existing.get('itemId'))
+        question_id = existing.get('questionItem', {}).get('question', {}).get('questionId')
+        if question_id:
+            question = dict(item['questionItem']['question'], questionId=question_id)
+            item['questionItem'] = dict(item['questionItem'], question=question)
+        requests_list.append({
+            "updateItem": {
+                "item": item,
+                "location": {"index": current.index(match)},
+                "updateMask": UPDATE_MASK
+            }
+        })
+        counts['updated'] += 1
+
+    return requests_list, counts
@@ -1,38 +1,145 @@
 import os
 import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
 import requests
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from dotenv import load_dotenv
 load_dotenv()
-SCOPES = ['https://www.googleapis.com/auth/forms.body']
+SCOPES = ['https://www.googleapis.com/auth/forms.body',
+          'https://www.googleapis.com/auth/forms.responses.readonly']  # read access for utils/response_harvester.py
 TOKEN_PATH = os.getenv('TOKEN_FILE', 'token.json')
 CREDENTIALS_PATH = os.getenv('CREDENTIALS_FILE', 'credentials.json')
 
-SERVICE_ENDPOINT = 'https://forms.googleapis.com'
+# Refresh the access token this long before it expires
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv('TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+
+# Overridable to point the generator at a local mock (see benchmarks/mock_forms_server.py)
+SERVICE_ENDPOINT = os.getenv('FORMS_API_ENDPOINT') or 'https://forms.googleapis.com'
+
+
+class CredentialProvider:
+    """Process-wide OAuth credentials cached in memory and refreshed ahead of expiry.
+
+    The token file is read once; refreshes happen under a lock so concurrent
+    workers never refresh twice, and the refreshed token is written atomically.
+    """
+
+    def __init__(self, token_path=TOKEN_PATH, creds_path=CREDENTIALS_PATH, scopes=SCOPES,
+                 refresh_margin=TOKEN_REFRESH_MARGIN_SECONDS):
+        self.token_path = token_path
+        self.creds_path = creds_path  # Downloaded from Google Cloud Console
+        self.scopes = scopes
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self._creds = None
+        self._loaded = False
+        self._rejected_token = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, creds):
+        if not creds or not creds.valid or creds.token == self._rejected_token:
+            return False
+        if creds.expiry is None:
+            return True
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now > self.refresh_margin
+
+    def get_credentials(self):
+        creds = self._creds
+        if self._is_fresh(creds):
+            return creds
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not self._loaded:
+                if os.path.exists(self.token_path) and self._token_has_scopes():
+                    self._creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+                self._loaded = True
+            if self._is_fresh(self._creds):
+                return self._creds
+
+            if self._creds and self._creds.refresh_token:
+                self._creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(self.creds_path, self.scopes)
+                self._creds = flow.run_local_server(port=50699)
+            self._rejected_token = None
+
+            self._save(self._creds)
+            return self._creds
+
+    def _token_has_scopes(self):
+        """False when the saved token was granted fewer scopes than we need, so consent is asked again."""
+        try:
+            with open(self.token_path, 'r') as token:
+                granted = json.load(token).get('scopes')
+        except (OSError, ValueError):
+            return True
+        return not granted or set(self.scopes) <= set(granted)
+
+    def invalidate(self, token):
+        """Mark a token the API rejected so the next call refreshes it exactly once."""
+        with self._lock:
+            if self._creds is not None and self._creds.token == token:
+                self._rejected_token = token
+
+    def authorization_header(self):
+        """Return a fresh Authorization header for the next request."""
+        return {'Authorization': f'Bearer {self.get_credentials().token}'}
+
+    def _save(self, creds):
+        # Save credentials for next time without ever leaving a half-written file
+        directory = os.path.dirname(os.path.abspath(self.token_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.token.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as token:
+                token.write(creds.to_json())
+            os.replace(tmp_path, self.token_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class StaticCredentialProvider:
+    """Provider for a pre-issued access token (CI, benchmarks, local mocks); never refreshes.
+
+    It has no invalidate(), so the transport returns a 401 instead of replaying it.
+    """
+
+    def __init__(self, token):
+        self._creds = Credentials(token=token)
+
+    def get_credentials(self):
+        return self._creds
+
+    def authorization_header(self):
+        return {'Authorization': f'Bearer {self._creds.token}'}
+
+
+_default_provider = None
+_default_provider_lock = threading.Lock()
+
+
+def get_credential_provider():
+    """Return the shared credential provider for this process.
+
+    A FORMS_ACCESS_TOKEN environment variable skips OAuth and uses that token as is.
+    """
+    global _default_provider
+    with _default_provider_lock:
+        if _default_provider is None:
+            access_token = os.getenv('FORMS_ACCESS_TOKEN')
+            _default_provider = StaticCredentialProvider(access_token) if access_token else CredentialProvider()
+        return _default_provider
+
 
 def get_credentials():
-    creds = None
-    token_path = TOKEN_PATH
-    creds_path = CREDENTIALS_PATH  # Downloaded from Google Cloud Console
-
-    # Load saved credentials
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-
-    # If no valid credentials, start OAuth flow
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(creds_path, SCOPES)
-            creds = flow.run_local_server(port=50699)
-
-        # Save credentials for next time
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
-    return creds
+    return get_credential_provider().get_credentials()
 
 def create_form_with_question(creds):
     headers = {
@@ -0,0 +1,231 @@
+"""
+Shared HTTP transport for JSON APIs: the Google Forms API and the LLM endpoint.
+Keeps one pooled keep-alive session per client so consecutive requests
+reuse TCP/TLS connections instead of paying a fresh handshake each time.
+Every request is rate limited against the given quota buckets, retried
+with jittered exponential backoff on 429/5xx responses, and carries an
+Authorization header fetched fresh from `auth`. When `auth` can also
+invalidate a rejected token (an OAuth credential provider), a 401 makes it
+refresh and the request is replayed once; a static key's 401 is returned.
+
+A non-idempotent request (forms.create, batchUpdate) is only replayed when
+the server cannot have applied it: a 429 or 503, or a failure to connect.
+A 500/502/504 or a dropped connection may come after the change was
+committed, and replaying it would create a duplicate form or items.
+"""
+
+import gzip
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+from utils import json_backend
+from utils.rate_limiter import backoff_delay, parse_retry_after
+
+# Responses worth retrying: quota exhaustion and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# The subset that guarantees the request was not processed, safe to replay for any method
+NOT_PROCESSED_STATUS_CODES = {429, 503}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+def _failed_before_sending(error):
+    """True when the request never reached the server: the connection could not be established."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, 'reason', reason), NewConnectionError)
+
+
+class _ConnectionCounter:
+    """Thread-safe counter of newly established connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def increment(self):
+        with self._lock:
+            self.value += 1
+
+
+def _counting_pool_classes(counter):
+    """Build urllib3 pool classes whose connections report every new handshake."""
+
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self):
+            counter.increment()
+            super().connect()
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            counter.increment()
+            super().connect()
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that counts the connections its pools open."""
+
+    def __init__(self, counter, **kwargs):
+        self._counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self._counter)
+
+
+class HttpTransport:
+    """Pooled, keep-alive HTTP session shared by every call to one API."""
+
+    def __init__(self, base_url, pool_size=10, keep_alive=True, gzip_min_bytes=None, timeout=30,
+                 write_limiter=None, read_limiter=None, max_retries=0, backoff_base=1.0, backoff_max=32.0,
+                 auth=None, metrics=None):
+        self.base_url = base_url.rstrip('/')
+        self.auth = auth
+        self.metrics = metrics
+        self.timeout = timeout
+        self.gzip_min_bytes = gzip_min_bytes
+        self.pool_size = pool_size
+        self.write_limiter = write_limiter
+        self.read_limiter = read_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._connections = _ConnectionCounter()
+        self._stats_lock = threading.Lock()
+        self._requests_sent = 0
+        self._gzipped_requests = 0
+        self._bytes_sent = 0
+        self._retries = 0
+        self._throttle_wait = 0.0
+
+        self.session = requests.Session()
+        adapter = _CountingHTTPAdapter(self._connections, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def request(self, method, path, json_body=None, headers=None, timeout=None, idempotent=None):
+        """Send a request to `base_url + path`, encoding `json_body` (gzipped when large).
+
+        `idempotent` (default: by method) allows replaying after failures the
+        server may already have acted on.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        retryable = RETRYABLE_STATUS_CODES if idempotent else NOT_PROCESSED_STATUS_CODES
+        request_headers = dict(headers or {})
+        data = None
+        gzipped = False
+        if json_body is not None:
+            data = json_backend.dumps_bytes(json_body)
+            request_headers['Content-Type'] = 'application/json'
+            if self.gzip_min_bytes is not None and len(data) >= self.gzip_min_bytes:
+                data = gzip.compress(data)
+                request_headers['Content-Encoding'] = 'gzip'
+                gzipped = True
+
+        limiter = self.read_limiter if method == 'GET' else self.write_limiter
+        attempt = 0
+        reauthenticated = False
+        while True:
+            waited = limiter.acquire() if limiter else 0.0
+            if self.auth is not None:
+                # Fetched per attempt so long runs always carry an unexpired token
+                request_headers.update(self.auth.authorization_header())
+            started = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method,
+                    f'{self.base_url}{path}',
+                    data=data,
+                    headers=request_headers,
+                    timeout=timeout or self.timeout
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # A request that reached the server may already have been applied
+                replay_safe = idempotent or _failed_before_sending(e)
+                self._record(data, gzipped, waited)
+                if self.metrics is not None:
+                    self.metrics.record_request(method, path, None, len(data) if data else 0, 0,
+                                                time.perf_counter() - started, retry=attempt > 0)
+                if attempt >= self.max_retries or not replay_safe:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            else:
+                self._record(data, gzipped, waited)
+                if self.metrics is not None:
+                    self.metrics.record_request(method, path, response.status_code, len(data) if data else 0,
+                                                len(response.content), time.perf_counter() - started,
+                                                retry=attempt > 0)
+                if response.status_code == 401 and hasattr(self.auth, 'invalidate') and not reauthenticated:
+                    # Token revoked or expired early: refresh once and replay immediately
+                    reauthenticated = True
+                    self.auth.invalidate(request_headers['Authorization'].split(' ', 1)[-1])
+                    response.close()
+                    continue
+                if response.status_code not in retryable or attempt >= self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                delay = retry_after if retry_after is not None else \
+                    backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                response.close()
+
+            attempt += 1
+            with self._stats_lock:
+                self._retries += 1
+            time.sleep(delay)
+
+    def _record(self, data, gzipped, waited):
+        with self._stats_lock:
+            self._requests_sent += 1
+            self._bytes_sent += len(data) if data else 0
+            self._throttle_wait += waited
+            if gzipped:
+                self._gzipped_requests += 1
+
+    def post(self, path, json_body=None, **kwargs):
+        return self.request('POST', path, json_body=json_body, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def connection_stats(self):
+        """Return request and connection-reuse counters for this transport."""
+        with self._stats_lock:
+            requests_sent = self._requests_sent
+            gzipped = self._gzipped_requests
+            bytes_sent = self._bytes_sent
+            retries = self._retries
+            throttle_wait = self._throttle_wait
+        opened = self._connections.value
+        reused = max(requests_sent - opened, 0)
+        return {
+            'requests': requests_sent,
+            'connections_opened': opened,
+            'connections_reused': reused,
+            'reuse_ratio': round(reused / requests_sent, 3) if requests_sent else 0.0,
+            'gzipped_requests': gzipped,
+            'bytes_sent': bytes_sent,
+            'retries': retries,
+            'throttle_wait_seconds': round(throttle_wait, 3)
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,236 @@
+"""
+Classic item analysis over harvested quiz responses.
+Computes each question's difficulty (p-value), corrected point-biserial
+discrimination and distractor selection rates, and each vocabulary word's
+mastery, from the store written by response_harvester.py. Items are joined
+back to their source question file and vocabulary word by question text.
+
+The respondent x item score matrix is kept in coordinate form (respondent
+code, item code, score): every respondent answers only the items of their
+own form, so a dense matrix over many forms would be almost all empty. All
+statistics are bincount/groupby reductions over it, with no per-row loops.
+
+Usage: python utils/item_analysis.py [--store material/responses] [--questions material/questions] [--output material/analysis]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import ANALYSIS_DIR, QUESTIONS_DIR, RESPONSES_STORE_DIR
+from utils import json_backend
+from utils.form_sync import question_key
+from utils.response_harvester import ResponseStore
+
+# Items outside these bounds are flagged for review
+LOW_DISCRIMINATION = 0.2
+EASY_P_VALUE = 0.95
+HARD_P_VALUE = 0.25
+
+
+def load_question_bank(directory=QUESTIONS_DIR):
+    """One row per question in the bank: its text key, source file, position and vocabulary word."""
+    rows = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if not name.lower().endswith('.json') or name.startswith('.'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                raw_questions = json_backend.load_file(path)
+            except (json_backend.JSONDecodeError, OSError, UnicodeDecodeError) as e:
+                print(f"Warning: Skipping {path}: {e}")
+                continue
+            for index, data in enumerate(raw_questions if isinstance(raw_questions, list) else []):
+                if isinstance(data, dict) and isinstance(data.get('question'), str):
+                    rows.append({'key': question_key(data['question']), 'source_file': path, 'question_index': index,
+                                 'vocabulary': data.get('vocabulary')})
+    return pd.DataFrame(rows, columns=['key', 'source_file', 'question_index', 'vocabulary'])
+
+
+def item_table(items, bank=None):
+    """Flatten ResponseStore.items() into one row per form question, joined to the question bank."""
+    rows = [{'form_id': form_id, 'question_id': question['question_id'], 'position': position,
+             'title': question['title'], 'options': question['options'], 'correct': question['correct']}
+            for form_id, questions in items.items() for position, question in enumerate(questions)]
+    table = pd.DataFrame(rows, columns=['form_id', 'question_id', 'position', 'title', 'options', 'correct'])
+    if bank is None or bank.empty:
+        return table.assign(source_file=None, question_index=np.nan, vocabulary=None)
+    table['key'] = table['title'].map(question_key)
+    # A question copied into several files is credited to the first one
+    return table.merge(bank.drop_duplicates('key'), on='key', how='left').drop(columns='key')
+
+
+def graded_answers(answers):
+    """Answer rows of graded questions (responses without answers and ungraded items dropped)."""
+    return answers[answers['question_id'].notna() & answers['correct'].notna()]
+
+
+def score_codes(answered):
+    """Coordinate form of the respondent x item matrix: (respondent codes, item codes, scores, item keys).
+
+    `answered` comes from graded_answers(); item keys is a DataFrame of
+    (form_id, question_id) in item code order.
+    """
+    respondents, _ = pd.factorize(answered['response_id'])
+    # Factorizing each column and then their combined integer code is much faster than a MultiIndex
+    form_codes, forms = pd.factorize(answered['form_id'])
+    question_codes, questions = pd.factorize(answered['question_id'])
+    item_codes, pairs = pd.factorize(form_codes.astype(np.int64) * max(len(questions), 1) + question_codes)
+    keys = pd.DataFrame({'form_id': np.asarray(forms, dtype=object)[pairs // max(len(questions), 1)],
+                         'question_id': np.asarray(questions, dtype=object)[pairs % max(len(questions), 1)]})
+    scores = answered['correct'].astype(float).to_numpy()
+    return respondents, item_codes, scores, keys
+
+
+def item_statistics(answers, items=None):
+    """Per question: answers, p-value (share correct) and point-biserial discrimination.
+
+    The point-biserial correlates an item's score with the respondent's score
+    on the other items of the form, so an item is not correlated with itself.
+    """
+    respondents, item_codes, x, keys = score_codes(graded_answers(answers))
+    totals = np.bincount(respondents, weights=x)
+    rest = totals[respondents] - x
+    count = len(keys)
+
+    n = np.bincount(item_codes, minlength=count).astype(float)
+    sum_x = np.bincount(item_codes, weights=x, minlength=count)
+    sum_y = np.bincount(item_codes, weights=rest, minlength=count)
+    sum_xy = np.bincount(item_codes, weights=x * rest, minlength=count)
+    sum_yy = np.bincount(item_codes, weights=rest * rest, minlength=count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_value = sum_x / n
+        # x is 0/1, so sum(x^2) == sum(x)
+        variance = (n * sum_x - sum_x ** 2) * (n * sum_yy - sum_y ** 2)
+        point_biserial = np.where(variance > 0, (n * sum_xy - sum_x * sum_y) / np.sqrt(variance), np.nan)
+
+    stats = keys.assign(answers=n.astype(int), p_value=p_value, point_biserial=point_biserial)
+    stats['flag'] = np.select(
+        [stats['p_value'] >= EASY_P_VALUE, stats['p_value'] <= HARD_P_VALUE,
+         stats['point_biserial'] < LOW_DISCRIMINATION],
+        ['too easy', 'too hard', 'low discrimination'], default='')
+    if items is not None:
+        stats = stats.merge(items.drop(columns=['options', 'correct']), on=['form_id', 'question_id'], how='left')
+    return stats
+
+
+def distractor_rates(answers, items):
+    """Per question option: how often it was chosen and the mean rest score of those who chose it.
+
+    Options nobody chose are listed with a rate of 0; a distractor chosen by
+    stronger respondents than the key points at an ambiguous question.
+    """
+    answered = graded_answers(answers)
+    respondents, item_codes, x, keys = score_codes(answered)
+    rest = np.bincount(respondents, weights=x)[respondents] - x
+    # Shifted by one so a blank answer (code -1) gets its own slot, dropped below
+    option_codes, options = pd.factorize(answered['answer'])
+    base = len(options) + 1
+    pair_codes, pairs = pd.factorize(item_codes.astype(np.int64) * base + option_codes + 1)
+    chosen = np.bincount(pair_codes)
+    pair_items, pair_options = pairs // base, pairs % base - 1
+    counts = pd.DataFrame({
+        'form_id': keys['form_id'].to_numpy()[pair_items],
+        'question_id': keys['question_id'].to_numpy()[pair_items],
+        'option': np.where(pair_options >= 0, np.asarray(options, dtype=object)[pair_options], None),
+        'chosen': chosen,
+        'mean_rest_score': np.bincount(pair_codes, weights=rest) / chosen
+    })
+    counts = counts[counts['option'].notna()]
+
+    options = item_table_options(items)
+    table = options.merge(counts, on=['form_id', 'question_id', 'option'], how='outer')
+    table['chosen'] = table['chosen'].fillna(0).astype(int)
+    table['is_correct'] = table['is_correct'].fillna(False).astype(bool)
+    table['rate'] = table['chosen'] / table.groupby(['form_id', 'question_id'])['chosen'].transform('sum')
+    return table[['form_id', 'question_id', 'option', 'is_correct', 'chosen', 'rate', 'mean_rest_score']]
+
+
+def item_table_options(items):
+    """One row per (question, option) with whether it is a correct answer."""
+    exploded = items[['form_id', 'question_id', 'options', 'correct']].explode('options')
+    exploded = exploded[exploded['options'].notna()].rename(columns={'options': 'option'})
+    exploded['is_correct'] = [option in correct for option, correct in zip(exploded['option'], exploded['correct'])]
+    return exploded.drop(columns='correct')
+
+
+def vocabulary_mastery(answers, items, by_respondent=False):
+    """Share of correct answers per vocabulary word (and per respondent email with `by_respondent`)."""
+    answered = graded_answers(answers)
+    respondents, item_codes, x, keys = score_codes(answered)
+    words = keys.merge(items[['form_id', 'question_id', 'vocabulary']], on=['form_id', 'question_id'], how='left')
+    word_codes, vocabulary = pd.factorize(words['vocabulary'])
+    answer_words = word_codes[item_codes]
+    mask = answer_words >= 0
+    group_codes = answer_words
+    if by_respondent:
+        email_codes, emails = pd.factorize(answered['respondent_email'])
+        mask &= email_codes >= 0
+        group_codes = email_codes.astype(np.int64) * max(len(vocabulary), 1) + answer_words
+    codes, groups = pd.factorize(group_codes[mask])
+    answered_count = np.bincount(codes)
+    mastery = pd.DataFrame({
+        'vocabulary': np.asarray(vocabulary, dtype=object)[groups % max(len(vocabulary), 1)],
+        'answers': answered_count,
+        'correct': np.bincount(codes, weights=x[mask]),
+        # Distinct questions per group, from the unique (group, item) pairs
+        'questions': np.bincount(np.unique(codes.astype(np.int64) * len(keys) + item_codes[mask]) // len(keys),
+                                 minlength=len(groups))
+    })
+    mastery['mastery'] = mastery['correct'] / mastery['answers']
+    group = ['vocabulary']
+    if by_respondent:
+        mastery.insert(0, 'respondent_email', np.asarray(emails, dtype=object)[groups // max(len(vocabulary), 1)])
+        group = ['respondent_email', 'vocabulary']
+    return mastery.sort_values(group[:-1] + ['mastery', 'answers'],
+                               ascending=[True] * (len(group) - 1) + [True, False], ignore_index=True)
+
+
+def analyze_store(store, bank=None):
+    """Run every analysis over a ResponseStore; returns (items, distractors, vocabulary) DataFrames."""
+    answers = store.load()
+    items = item_table(store.items(), bank)
+    return item_statistics(answers, items), distractor_rates(answers, items), vocabulary_mastery(answers, items)
+
+
+def print_analysis_summary(stats, vocabulary, max_lines=10):
+    print(f"\n=== ITEM ANALYSIS ===")
+    print(f"Items: {len(stats)}, answers: {stats['answers'].sum()}, "
+          f"mean p-value: {stats['p_value'].mean():.2f}, mean point-biserial: {stats['point_biserial'].mean():.2f}")
+    flagged = stats[stats['flag'] != ''].sort_values('point_biserial')
+    if len(flagged):
+        print(f"\nFlagged items ({len(flagged)}):")
+        for row in flagged.head(max_lines).itertuples():
+            source = f" [{row.source_file}#{int(row.question_index) + 1}]" if isinstance(row.source_file, str) else ''
+            print(f"  {row.flag}: p={row.p_value:.2f} r={row.point_biserial:.2f} {row.title[:60]}{source}")
+        if len(flagged) > max_lines:
+            print(f"  ... and {len(flagged) - max_lines} more")
+    if len(vocabulary):
+        print(f"\nLeast mastered words:")
+        for row in vocabulary.head(max_lines).itertuples():
+            print(f"  {row.vocabulary}: {row.mastery:.0%} of {row.answers} answers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Item analysis of harvested quiz responses')
+    parser.add_argument('--store', default=RESPONSES_STORE_DIR, help=f'Response store folder (default: {RESPONSES_STORE_DIR})')
+    parser.add_argument('--questions', default=QUESTIONS_DIR, help=f'Question bank folder to join items to (default: {QUESTIONS_DIR})')
+    parser.add_argument('--output', default=ANALYSIS_DIR, help=f'Folder for the CSV reports (default: {ANALYSIS_DIR})')
+    args = parser.parse_args()
+
+    store = ResponseStore(args.store)
+    if not store.part_files():
+        print(f"No harvested responses in '{args.store}'. Run utils/response_harvester.py first.")
+        sys.exit(1)
+    stats, distractors, vocabulary = analyze_store(store, load_question_bank(args.questions))
+    os.makedirs(args.output, exist_ok=True)
+    for name, frame in (('items', stats), ('distractors', distractors), ('vocabulary', vocabulary)):
+        frame.to_csv(os.path.join(args.output, f"{name}.csv"), index=False)
+    print_analysis_summary(stats, vocabulary)
+    print(f"\nReports written to {args.output}/items.csv, distractors.csv and vocabulary.csv")
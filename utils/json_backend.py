@@ -0,0 +1,84 @@
+"""
+Pluggable JSON encoder/decoder used for question loading, chunk writing and
+request bodies. Uses orjson when it is installed (and selected), otherwise
+the standard library; both produce byte-identical output for the data this
+tool handles, so switching backends never rewrites unchanged files.
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from config.config import JSON_BACKEND
+except ImportError:
+    JSON_BACKEND = "auto"
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+
+def _resolve(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}' (expected one of {', '.join(BACKENDS)})")
+    if name == 'orjson' and orjson is None:
+        print("Warning: JSON_BACKEND is 'orjson' but orjson is not installed; using json")
+        return 'json'
+    if name == 'auto':
+        return 'orjson' if orjson is not None else 'json'
+    return name
+
+
+_backend = _resolve(os.getenv('JSON_BACKEND', JSON_BACKEND))
+
+
+def get_backend():
+    """Name of the active backend: 'orjson' or 'json'."""
+    return _backend
+
+
+def set_backend(name):
+    """Switch backend at runtime ('auto', 'orjson' or 'json'); returns the active name."""
+    global _backend
+    _backend = _resolve(name)
+    return _backend
+
+
+def loads(data):
+    """Decode JSON from str or bytes."""
+    if _backend == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(file_path):
+    """Read and decode a UTF-8 JSON file."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if _backend == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj, sort_keys=False):
+    """Compact UTF-8 encoding, used for request bodies and hashing."""
+    if _backend == 'orjson':
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+
+def dumps_pretty(obj, sort_keys=False):
+    """Human-readable text with two-space indentation, used for files on disk."""
+    if _backend == 'orjson':
+        option = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
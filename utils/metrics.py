@@ -0,0 +1,210 @@
+"""
+Run instrumentation: per-phase timings and per-endpoint request counters.
+Each form build gets its own record (tracked per thread, so bulk workers
+don't mix their numbers); records and a final run summary are written as
+JSON lines when a metrics path is given.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import json_backend
+
+
+def endpoint_name(method, path):
+    """Name a Forms API call by its REST method, e.g. 'forms.batchUpdate' or 'forms.responses.list'."""
+    segments = path.split('?')[0].strip('/').split('/')[1:]  # drop the API version
+    if not segments:
+        return f"{method} {path}"
+    collections = '.'.join(segments[::2])
+    last = segments[-1]
+    if ':' in last:
+        return f"{collections}.{last.split(':', 1)[1]}"
+    if len(segments) % 2:
+        return f"{collections}.{'create' if method == 'POST' else 'list'}"
+    return f"{collections}.{'get' if method == 'GET' else method.lower()}"
+
+
+def _new_endpoint_stats():
+    return {'requests': 0, 'retries': 0, 'errors': 0, 'bytes_sent': 0, 'bytes_received': 0, 'seconds': 0.0}
+
+
+def _add_request(endpoints, name, status, bytes_sent, bytes_received, elapsed, retry):
+    stats = endpoints.setdefault(name, _new_endpoint_stats())
+    stats['requests'] += 1
+    stats['retries'] += 1 if retry else 0
+    stats['errors'] += 1 if status is None or status >= 400 else 0
+    stats['bytes_sent'] += bytes_sent
+    stats['bytes_received'] += bytes_received
+    stats['seconds'] += elapsed
+
+
+def _add_phase(phases, name, elapsed):
+    stats = phases.setdefault(name, {'calls': 0, 'seconds': 0.0})
+    stats['calls'] += 1
+    stats['seconds'] += elapsed
+
+
+def _rounded(section):
+    return {name: {key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
+            for name, stats in section.items()}
+
+
+class RunMetrics:
+    """Collects phase timings and request counters for a run.
+
+    Phases and requests are added both to the run totals and to the form
+    record currently open on the calling thread (see `track_form`).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.endpoints = {}
+        self.forms = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = open(path, 'wb') if path else None
+
+    def _current(self):
+        return getattr(self._local, 'record', None)
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block under `name`, e.g. with metrics.phase('load_questions'): ..."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            record = self._current()
+            with self._lock:
+                _add_phase(self.phases, name, elapsed)
+                if record is not None:
+                    _add_phase(record['phases'], name, elapsed)
+
+    def record_request(self, method, path, status, bytes_sent=0, bytes_received=0, elapsed=0.0, retry=False):
+        """Count one HTTP attempt; `status` is None when no response arrived."""
+        name = endpoint_name(method, path)
+        record = self._current()
+        with self._lock:
+            _add_request(self.endpoints, name, status, bytes_sent, bytes_received, elapsed, retry)
+            if record is not None:
+                _add_request(record['endpoints'], name, status, bytes_sent, bytes_received, elapsed, retry)
+
+    def start_form(self, source):
+        self._local.record = {
+            'type': 'form',
+            'source': source,
+            'started': time.perf_counter(),
+            'phases': {},
+            'endpoints': {}
+        }
+
+    def finish_form(self, result):
+        """Close the calling thread's form record and emit it."""
+        record = self._current()
+        if record is None:
+            return None
+        self._local.record = None
+        result = result or {}
+        record = {
+            'type': 'form',
+            'source': record['source'],
+            'status': ('cached' if result.get('cached') else 'ok') if result else 'failed',
+            'form_id': result.get('form_id'),
+            'questions_added': result.get('questions_added'),
+            'total_questions': result.get('total_questions'),
+            'rejected_questions': len(result.get('rejected_questions', [])),
+            'round_trips': result.get('round_trips'),
+            'elapsed_seconds': round(time.perf_counter() - record['started'], 4),
+            'phases': _rounded(record['phases']),
+            'endpoints': _rounded(record['endpoints'])
+        }
+        with self._lock:
+            self.forms.append(record)
+        self._write(record)
+        return record
+
+    def summary(self, **extra):
+        """Run totals across every form and request so far."""
+        with self._lock:
+            statuses = [form['status'] for form in self.forms]
+            summary = {
+                'type': 'summary',
+                'forms': len(statuses),
+                'forms_ok': statuses.count('ok'),
+                'forms_cached': statuses.count('cached'),
+                'forms_failed': statuses.count('failed'),
+                'elapsed_seconds': round(time.perf_counter() - self.started, 4),
+                'phases': _rounded(self.phases),
+                'endpoints': _rounded(self.endpoints)
+            }
+        summary.update(extra)
+        return summary
+
+    def close(self, **extra):
+        """Emit the run summary and close the metrics file; returns the summary."""
+        summary = self.summary(**extra)
+        self._write(summary)
+        if self._file:
+            self._file.close()
+            self._file = None
+        return summary
+
+    def _write(self, record):
+        if self._file is None:
+            return
+        line = json_backend.dumps_bytes(record) + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+
+def track_form(method):
+    """Decorator for generator methods that build one form from `source`.
+
+    Opens a metrics record for the calling thread before the call and emits
+    it with the method's result afterwards, whichever way the method exits.
+    """
+    source_param = list(inspect.signature(method).parameters)[1]
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.metrics._current() is not None:
+            # Nested form builds are part of the outer record
+            return method(self, *args, **kwargs)
+        self.metrics.start_form(args[0] if args else kwargs.get(source_param))
+        result = None
+        try:
+            result = method(self, *args, **kwargs)
+            return result
+        finally:
+            self.metrics.finish_form(result)
+    return wrapper
+
+
+def timed(phase_name):
+    """Decorator timing a generator method as phase `phase_name` in `self.metrics`."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.phase(phase_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def print_phase_timings(summary):
+    """Print the per-phase and per-endpoint breakdown of a run summary."""
+    print(f"\n=== TIMING BREAKDOWN ({summary['elapsed_seconds']:.2f}s total) ===")
+    for name, stats in sorted(summary['phases'].items(), key=lambda entry: -entry[1]['seconds']):
+        print(f"  {name:<24} {stats['seconds']:>8.3f}s  ({stats['calls']} calls)")
+    for name, stats in sorted(summary['endpoints'].items()):
+        print(f"  {name:<24} {stats['requests']:>4} requests, {stats['retries']} retries, {stats['errors']} errors, "
+              f"{stats['bytes_sent']} bytes sent, {stats['bytes_received']} received")
+
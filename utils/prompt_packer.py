@@ -0,0 +1,159 @@
+"""
+Token-budget packing of vocabulary entries into LLM prompts.
+data_handler writes fixed 20-entry chunks per date, so prompts built from
+them range from tiny to larger than a model's context window depending on
+how long the Context/Collocation fields are. This module estimates the token
+cost of every entry (prompt text plus the MCQ it asks for) and bin-packs the
+entries into as few prompts as fit under a token budget, optionally mixing
+dates, and records a manifest mapping each batch back to its dates and words.
+
+Usage: python utils/prompt_packer.py --budget 8000 [--across-dates] [--date 05/07/2025] [--output material/batches]
+"""
+
+import argparse
+import bisect
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (
+    JSON_PATH_DIR, PROMPT_PACK_ACROSS_DATES, PROMPT_REPLY_TOKENS_PER_ENTRY, PROMPT_TEMPLATE_PATH,
+    PROMPT_TOKEN_BUDGET
+)
+from utils import json_backend
+from utils.data_handler import CHUNK_SIZE, write_file_atomically
+
+# Conservative: English averages ~4 bytes per token, accented and CJK text fewer
+BYTES_PER_TOKEN = 3
+ENTRY_INDENT = '  '  # build_prompt pretty-prints the list, indenting each entry
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_BUDGET = 8000  # CLI default when PROMPT_TOKEN_BUDGET is None
+
+
+def estimate_tokens(text):
+    return -(-len(text.encode('utf-8')) // BYTES_PER_TOKEN)
+
+
+def entry_tokens(entry, reply_tokens=PROMPT_REPLY_TOKENS_PER_ENTRY):
+    """Tokens one entry adds to a call: its pretty-printed JSON plus the reply it asks for."""
+    text = json_backend.dumps_pretty(entry).replace('\n', '\n' + ENTRY_INDENT)
+    return estimate_tokens(ENTRY_INDENT + text + ',\n') + reply_tokens
+
+
+def pack_by_tokens(costs, budget, groups=None):
+    """Best-fit decreasing bin packing of entry costs under `budget` tokens per batch.
+
+    With `groups`, only entries of the same group share a batch. An entry
+    costlier than the budget gets a batch of its own. Returns lists of entry
+    positions, each in input order, with batches ordered by their first entry.
+    """
+    groups = groups if groups is not None else [None] * len(costs)
+    batches = []
+    open_bins = {}  # group -> sorted [(remaining, batch number)]
+    for position in sorted(range(len(costs)), key=lambda position: (-costs[position], position)):
+        cost, bins = costs[position], open_bins.setdefault(groups[position], [])
+        slot = bisect.bisect_left(bins, (cost, -1))
+        if slot < len(bins):
+            remaining, number = bins.pop(slot)
+        else:
+            remaining, number = budget, len(batches)
+            batches.append([])
+        batches[number].append(position)
+        if remaining - cost > 0:
+            bisect.insort(bins, (remaining - cost, number))
+    for batch in batches:
+        batch.sort()
+    return sorted(batches, key=lambda batch: batch[0])
+
+
+def plan_prompt_batches(entries, template_tokens, budget=PROMPT_TOKEN_BUDGET, across_dates=PROMPT_PACK_ACROSS_DATES,
+                        reply_tokens=PROMPT_REPLY_TOKENS_PER_ENTRY):
+    """Pack vocabulary entries into batches whose estimated call cost fits `budget`.
+
+    Returns one dict per batch with the entry positions, estimated tokens,
+    and the dates and words it covers; entries keep their date unless
+    `across_dates` lets a batch mix them.
+    """
+    costs = [entry_tokens(entry, reply_tokens) for entry in entries]
+    groups = None if across_dates else [entry.get('Time') for entry in entries]
+    batches = []
+    for positions in pack_by_tokens(costs, max(budget - template_tokens, 1), groups):
+        batch_entries = [entries[position] for position in positions]
+        batches.append({
+            'positions': positions,
+            'tokens': template_tokens + sum(costs[position] for position in positions),
+            'dates': sorted(set(entry.get('Time') or '' for entry in batch_entries)),
+            'words': [entry.get('Vocabulary') for entry in batch_entries]
+        })
+    return batches
+
+
+def manifest_rows(batches):
+    """Batch descriptions for a manifest file, without the in-memory positions."""
+    return [{'batch': number, 'tokens': batch['tokens'], 'entries': len(batch['words']),
+             'dates': batch['dates'], 'words': batch['words']}
+            for number, batch in enumerate(batches, 1)]
+
+
+def write_manifest(path, batches, budget):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    write_file_atomically(path, json_backend.dumps_pretty({
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'token_budget': budget,
+        'batches': manifest_rows(batches)
+    }))
+
+
+def load_vocabulary_entries(input_dir=JSON_PATH_DIR, date=None):
+    """Every entry of the data_handler chunk files, for one date (dd/mm/yyyy) or all."""
+    # Imported here: question_generator imports this module for its packed mode
+    from utils.question_generator import find_vocabulary_chunks
+    entries = []
+    for input_path, _output_path in find_vocabulary_chunks(input_dir, input_dir, date):
+        entries.extend(json_backend.load_file(input_path))
+    return entries
+
+
+def write_prompt_batches(entries, batches, output_dir, budget):
+    """Write batch-N.json vocabulary lists, ready to paste into the prompt, and their manifest."""
+    os.makedirs(output_dir, exist_ok=True)
+    for number, batch in enumerate(batches, 1):
+        text = json_backend.dumps_pretty([entries[position] for position in batch['positions']])
+        write_file_atomically(os.path.join(output_dir, f"batch-{number}.json"), text)
+    number = len(batches) + 1
+    while os.path.exists(os.path.join(output_dir, f"batch-{number}.json")):
+        os.remove(os.path.join(output_dir, f"batch-{number}.json"))
+        number += 1
+    write_manifest(os.path.join(output_dir, MANIFEST_NAME), batches, budget)
+
+
+if __name__ == "__main__":
+    from utils.question_generator import load_prompt_template
+
+    parser = argparse.ArgumentParser(description='Pack vocabulary chunks into prompt batches under a token budget')
+    parser.add_argument('--budget', '-b', type=int, default=PROMPT_TOKEN_BUDGET or DEFAULT_BUDGET,
+                        help='Estimated tokens per model call, prompt and reply (default: %(default)s)')
+    parser.add_argument('--across-dates', action='store_true', default=PROMPT_PACK_ACROSS_DATES,
+                        help='Let one batch mix vocabulary from different dates')
+    parser.add_argument('--date', help='Only pack this date (dd/mm/yyyy)')
+    parser.add_argument('--input', default=JSON_PATH_DIR, help=f'Vocabulary chunk folder (default: {JSON_PATH_DIR})')
+    parser.add_argument('--output', default='material/batches', help='Batch folder (default: %(default)s)')
+    args = parser.parse_args()
+
+    entries = load_vocabulary_entries(args.input, args.date)
+    if not entries:
+        print(f"No vocabulary chunks found in '{args.input}'.")
+        sys.exit(1)
+    template_tokens = estimate_tokens(load_prompt_template(PROMPT_TEMPLATE_PATH))
+    batches = plan_prompt_batches(entries, template_tokens, args.budget, args.across_dates)
+    write_prompt_batches(entries, batches, args.output, args.budget)
+
+    per_date = Counter(entry.get('Time') for entry in entries)
+    chunks = sum(-(-count // CHUNK_SIZE) for count in per_date.values())
+    over = sum(1 for batch in batches if batch['tokens'] > args.budget)
+    print(f"Packed {len(entries)} entries into {len(batches)} batches (vs {chunks} fixed chunks) "
+          f"under ~{args.budget} tokens each; manifest: {os.path.join(args.output, MANIFEST_NAME)}")
+    if over:
+        print(f"Warning: {over} entries alone exceed the budget and were given their own batch.")
@@ -0,0 +1,150 @@
+"""
+Compact question model shared by every form-building path.
+Questions are parsed and validated once at load time; each one builds its
+Forms item payload once and reuses it for batches, retries and sync.
+"""
+
+OPTION_KEYS = ('option-1', 'option-2', 'option-3', 'option-4')
+REQUIRED_FIELDS = ('question', 'options', 'correct_option', 'explanation')
+
+
+class QuestionError(ValueError):
+    """Raised when a question entry cannot be turned into a form item."""
+
+
+def question_errors(question_data):
+    """Return (field, message) pairs for one question entry; empty when valid.
+
+    These are the only format rules: preflight validation reports them all,
+    and Question.from_dict refuses an entry that breaks any of them.
+    """
+    if not isinstance(question_data, dict):
+        return [(None, "Question entry must be an object")]
+    errors = []
+
+    # Check required fields
+    for field in REQUIRED_FIELDS:
+        if field not in question_data:
+            errors.append((field, f"Missing required field: {field}"))
+
+    # Check options format
+    if 'options' in question_data:
+        options = question_data['options']
+        if not isinstance(options, dict):
+            errors.append(('options', "Options must be an object"))
+        else:
+            for opt in OPTION_KEYS:
+                if opt not in options:
+                    errors.append((f"options.{opt}", f"Missing option: {opt}"))
+                elif not isinstance(options[opt], str) or not options[opt].strip():
+                    errors.append((f"options.{opt}", f"Empty or invalid option: {opt}"))
+
+    # Check correct_option
+    if 'correct_option' in question_data:
+        correct_opt = question_data['correct_option']
+        if correct_opt not in OPTION_KEYS:
+            errors.append(('correct_option', f"Invalid correct_option: {correct_opt}"))
+
+    # Check question text
+    if 'question' in question_data:
+        if not isinstance(question_data['question'], str) or not question_data['question'].strip():
+            errors.append(('question', "Question text is empty or invalid"))
+
+    # Check explanation
+    if 'explanation' in question_data:
+        if not isinstance(question_data['explanation'], str) or not question_data['explanation'].strip():
+            errors.append(('explanation', "Explanation is empty or invalid"))
+
+    return errors
+
+
+class Question:
+    __slots__ = ('text', 'options', 'correct_option', 'explanation', 'source_file', 'index', '_item')
+
+    def __init__(self, text, options, correct_option, explanation=None, source_file=None, index=0):
+        self.text = text
+        self.options = options            # tuple of (key, value) in display order
+        self.correct_option = correct_option
+        self.explanation = explanation
+        self.source_file = source_file
+        self.index = index
+        self._item = None
+
+    @classmethod
+    def from_dict(cls, data, source_file=None, index=0):
+        """Parse and validate one question entry from a question JSON file (see question_errors)."""
+        errors = question_errors(data)
+        if errors:
+            raise QuestionError(errors[0][1])
+        options = tuple((key, data['options'][key]) for key in OPTION_KEYS)
+        return cls(data['question'], options, data['correct_option'], data['explanation'], source_file, index)
+
+    @property
+    def source(self):
+        return (self.source_file, self.index)
+
+    def to_dict(self):
+        """Return the question in its JSON file shape."""
+        data = {
+            'question': self.text,
+            'options': dict(self.options),
+            'correct_option': self.correct_option
+        }
+        if self.explanation is not None:
+            data['explanation'] = self.explanation
+        return data
+
+    def build_item(self, points):
+        """Build (once) the Forms item body, without location, for this question.
+
+        The returned dict is shared between callers and must not be mutated.
+        """
+        if self._item is not None and self._item[0] == points:
+            return self._item[1]
+        options = [{"value": value} for _key, value in self.options]
+        correct_value = dict(self.options)[self.correct_option]
+        explanation = self.explanation
+        item = {
+            "title": self.text,
+            "description": "",
+            "questionItem": {
+                "question": {
+                    "required": True,
+                    "grading": {
+                        "pointValue": points,
+                        "correctAnswers": {
+                            "answers": [{"value": correct_value}]
+                        },
+                        "whenRight": {
+                            "text": "Correct! " + (explanation if explanation is not None else 'Well done!')
+                        },
+                        "whenWrong": {
+                            "text": explanation if explanation is not None else 'Please review the explanation.'
+                        }
+                    },
+                    "choiceQuestion": {
+                        "type": "RADIO",
+                        "options": options
+                    }
+                }
+            }
+        }
+        self._item = (points, item)
+        return item
+
+
+def parse_questions(raw_questions, source_file=None):
+    """Parse a loaded JSON list into Question objects.
+
+    Returns (questions, errors) where errors is a list of (index, message).
+    """
+    if not isinstance(raw_questions, list):
+        return [], [(None, "Root element must be a list of questions")]
+    questions = []
+    errors = []
+    for index, data in enumerate(raw_questions):
+        try:
+            questions.append(Question.from_dict(data, source_file, index))
+        except QuestionError as e:
+            errors.append((index, str(e)))
+    return questions, errors
@@ -0,0 +1,380 @@
+"""
+LLM question generation stage.
+Reads the vocabulary chunks written by data_handler (material/json/<date>/N.json),
+fills them into the docs/questionGeneratedPrompt.md template, asks an
+OpenAI-compatible chat completions endpoint for the MCQs and writes them to
+material/questions/<date>/N.json. Replies are validated before they are used
+and cached per vocabulary entry and prompt version, so regenerating an
+unchanged day makes no model calls.
+
+With a token budget, the uncached entries of every chunk are first packed
+into as few calls as fit (see prompt_packer.py) instead of one call per chunk.
+
+Usage: python utils/question_generator.py [--date 05/07/2025] [--concurrency 4] [--force] [--token-budget 8000]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (
+    GENERATION_CACHE_PATH, JSON_PATH_DIR, LLM_ENDPOINT, LLM_MAX_ATTEMPTS, LLM_MAX_WORKERS, LLM_MODEL,
+    LLM_TIMEOUT, MAX_RETRIES, PROMPT_PACK_ACROSS_DATES, PROMPT_TEMPLATE_PATH, PROMPT_TOKEN_BUDGET, QUESTIONS_DIR,
+    RETRY_BACKOFF_BASE
+)
+from utils import json_backend
+from utils.data_handler import date_folder_name, serialize_chunk, write_file_atomically
+from utils.http_transport import HttpTransport
+from utils.prompt_packer import estimate_tokens, plan_prompt_batches, write_manifest
+from utils.question import question_errors
+
+# The template text up to and including this line is sent; the vocabulary list follows it
+VOCABULARY_MARKER = "Begin generating MCQs from the provided vocabulary list:"
+
+CACHE_VERSION = 1
+PACKED_MANIFEST_FILE = '.prompt_batches.json'  # written to the output folder by packed runs
+
+
+class GenerationError(ValueError):
+    """Raised when a model reply is not the requested list of valid MCQs."""
+
+
+def load_prompt_template(path=PROMPT_TEMPLATE_PATH):
+    """Return the prompt template without its sample vocabulary list."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if VOCABULARY_MARKER not in text:
+        raise GenerationError(f"Prompt template {path} has no '{VOCABULARY_MARKER}' line")
+    return text.split(VOCABULARY_MARKER, 1)[0] + VOCABULARY_MARKER
+
+
+def prompt_version(template):
+    """Short hash of the template; editing the prompt invalidates every cached reply."""
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:16]
+
+
+def build_prompt(template, entries):
+    return f"{template}\n\n{json_backend.dumps_pretty(entries)}"
+
+
+def entry_cache_key(entry, version):
+    return hashlib.sha256(version.encode('utf-8') + json_backend.dumps_bytes(entry, sort_keys=True)).hexdigest()
+
+
+def parse_mcq_reply(text, expected_count):
+    """Parse a model reply into `expected_count` valid questions, or raise GenerationError."""
+    text = text.strip()
+    if text.startswith('```'):
+        # Tolerate a fenced ```json block around the list
+        text = text.split('\n', 1)[-1].rsplit('```', 1)[0]
+    try:
+        questions = json_backend.loads(text)
+    except json_backend.JSONDecodeError as e:
+        raise GenerationError(f"Reply is not valid JSON: {e}")
+    if not isinstance(questions, list):
+        raise GenerationError("Reply is not a JSON list")
+    if len(questions) != expected_count:
+        raise GenerationError(f"Expected {expected_count} questions, got {len(questions)}")
+    for index, question in enumerate(questions):
+        errors = question_errors(question)
+        if errors:
+            raise GenerationError(f"Question #{index + 1}: {errors[0][1]}")
+    return questions
+
+
+class ApiKeyAuth:
+    """Bearer API key for the LLM endpoint; a rejected key is final, so there is no invalidate()."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    def authorization_header(self):
+        return {'Authorization': f'Bearer {self.api_key}'}
+
+
+class HttpLLMBackend:
+    """OpenAI-compatible chat completions client on a pooled, retrying transport.
+
+    Any object with a `complete(prompt) -> str` method can stand in for it.
+    """
+
+    def __init__(self, endpoint=LLM_ENDPOINT, model=LLM_MODEL, api_key=None, pool_size=LLM_MAX_WORKERS,
+                 timeout=LLM_TIMEOUT, max_retries=MAX_RETRIES, backoff_base=RETRY_BACKOFF_BASE):
+        self.model = model
+        self.transport = HttpTransport(endpoint, pool_size=pool_size, timeout=timeout, max_retries=max_retries,
+                                        backoff_base=backoff_base,
+                                        auth=ApiKeyAuth(api_key) if api_key else None)
+
+    def complete(self, prompt):
+        response = self.transport.post('/v1/chat/completions', {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'temperature': 0.7
+        }, idempotent=True)  # a replayed completion changes nothing server-side
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content']
+
+    def close(self):
+        self.transport.close()
+
+
+class GenerationCache:
+    """Generated questions keyed by entry_cache_key, saved atomically as JSON."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = json_backend.loads(f.read())
+        except (FileNotFoundError, json_backend.JSONDecodeError, OSError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return {}
+        return data.get('questions', {})
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, question):
+        with self._lock:
+            self._entries[key] = question
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.generation_cache.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(json_backend.dumps_bytes({'version': CACHE_VERSION, 'questions': self._entries}))
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._dirty = False
+
+
+class QuestionGenerator:
+    """Generates one MCQ per vocabulary entry, calling the model only for uncached entries.
+
+    With `force`, cached replies are ignored (and replaced) rather than reused.
+    """
+
+    def __init__(self, backend, template, cache=None, max_workers=LLM_MAX_WORKERS, max_attempts=LLM_MAX_ATTEMPTS,
+                 force=False):
+        self.backend = backend
+        self.template = template
+        self.version = prompt_version(template)
+        self.cache = cache
+        self.force = force
+        self.max_workers = max(1, max_workers or 1)
+        self.max_attempts = max(1, max_attempts or 1)
+        self._stats_lock = threading.Lock()
+        self.model_calls = 0
+        self._generated = {}  # this run's questions by cache key, reused even with `force`
+
+    def _known(self, key):
+        with self._stats_lock:
+            question = self._generated.get(key)
+        if question is None and self.cache and not self.force:
+            question = self.cache.get(key)
+        return question
+
+    def generate(self, entries):
+        """Return (questions, model_calls) with one question per entry, in entry order.
+
+        Each question also records the `vocabulary` it was generated for. Raises
+        GenerationError when the model keeps replying with invalid MCQs, and
+        requests.exceptions.RequestException when the endpoint is unavailable;
+        either carries the calls made so far as its `model_calls` attribute.
+        """
+        keys = [entry_cache_key(entry, self.version) for entry in entries]
+        questions = [self._known(key) for key in keys]
+        missing = [position for position, question in enumerate(questions) if question is None]
+        if not missing:
+            return questions, 0
+
+        prompt = build_prompt(self.template, [entries[position] for position in missing])
+        calls = 0
+        for attempt in range(1, self.max_attempts + 1):
+            calls += 1
+            with self._stats_lock:
+                self.model_calls += 1
+            try:
+                generated = parse_mcq_reply(self.backend.complete(prompt), len(missing))
+                break
+            except GenerationError as e:
+                if attempt == self.max_attempts:
+                    error = GenerationError(f"{e} (after {attempt} attempts)")
+                    error.model_calls = calls
+                    raise error
+            except requests.exceptions.RequestException as e:
+                e.model_calls = calls
+                raise
+        for position, question in zip(missing, generated):
+            question = dict(question, vocabulary=entries[position].get('Vocabulary'))
+            questions[position] = question
+            with self._stats_lock:
+                self._generated[keys[position]] = question
+            if self.cache:
+                self.cache.put(keys[position], question)
+        return questions, calls
+
+    def generate_file(self, input_path, output_path):
+        """Generate the questions for one vocabulary chunk file; returns a result row."""
+        started = time.perf_counter()
+        row = {'input': input_path, 'output': output_path, 'questions': 0, 'model_calls': 0, 'error': None}
+        try:
+            entries = json_backend.load_file(input_path)
+            questions, row['model_calls'] = self.generate(entries)
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            write_file_atomically(output_path, serialize_chunk(questions))
+            row['questions'] = len(questions)
+        except (GenerationError, requests.exceptions.RequestException, KeyError, IndexError) as e:
+            row['model_calls'], row['error'] = getattr(e, 'model_calls', 0), str(e)
+        except (json_backend.JSONDecodeError, OSError) as e:
+            row['error'] = f"Cannot read {input_path}: {e}"
+        row['elapsed'] = time.perf_counter() - started
+        return row
+
+    def generate_files(self, jobs):
+        """Run (input_path, output_path) jobs with bounded concurrency; rows come back in job order."""
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(jobs), 1))) as executor:
+                return list(executor.map(lambda job: self.generate_file(*job), jobs))
+        finally:
+            if self.cache:
+                self.cache.save()
+
+    def _generate_batch(self, batch, entries):
+        try:
+            _questions, batch['model_calls'] = self.generate([entries[position] for position in batch['positions']])
+        except (GenerationError, requests.exceptions.RequestException, KeyError, IndexError) as e:
+            batch['model_calls'], batch['error'] = getattr(e, 'model_calls', 0), str(e)
+        return batch
+
+    def generate_files_packed(self, jobs, budget=PROMPT_TOKEN_BUDGET, across_dates=PROMPT_PACK_ACROSS_DATES,
+                              manifest_path=None):
+        """Like generate_files, but first packs every job's uncached entries into token-budget calls.
+
+        Returns (rows, batches); rows report the model calls per batch, not per file.
+        """
+        pending, pending_keys, job_keys = [], set(), []
+        for input_path, _output_path in jobs:
+            try:
+                entries = json_backend.load_file(input_path)
+            except (json_backend.JSONDecodeError, OSError):
+                entries = []  # generate_file reports it
+            keys = [entry_cache_key(entry, self.version) for entry in entries]
+            job_keys.append(set(keys))
+            for entry, key in zip(entries, keys):
+                if key not in pending_keys and self._known(key) is None:
+                    pending_keys.add(key)
+                    pending.append(entry)
+
+        batches = plan_prompt_batches(pending, estimate_tokens(self.template), budget, across_dates)
+        if manifest_path and batches:
+            write_manifest(manifest_path, batches, budget)
+        failed = {}
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(batches), 1))) as executor:
+                for batch in executor.map(lambda batch: self._generate_batch(batch, pending), batches):
+                    if batch.get('error'):
+                        failed.update((entry_cache_key(pending[position], self.version), batch['error'])
+                                      for position in batch['positions'])
+        finally:
+            if self.cache:
+                self.cache.save()
+
+        # Every remaining entry is known now, so writing the files makes no calls
+        rows = []
+        for (input_path, output_path), keys in zip(jobs, job_keys):
+            errors = [failed[key] for key in keys if key in failed]
+            if errors:
+                rows.append({'input': input_path, 'output': output_path, 'questions': 0, 'model_calls': 0,
+                             'error': errors[0], 'elapsed': 0.0})
+            else:
+                rows.append(self.generate_file(input_path, output_path))
+        return rows, batches
+
+
+def find_vocabulary_chunks(input_dir=JSON_PATH_DIR, output_dir=QUESTIONS_DIR, date=None):
+    """Return (input_path, output_path) pairs for every chunk, or only those of `date` (dd/mm/yyyy)."""
+    jobs = []
+    if not os.path.isdir(input_dir):
+        return jobs
+    folders = [date_folder_name(date)] if date else sorted(os.listdir(input_dir))
+    for folder in folders:
+        folder_path = os.path.join(input_dir, folder)
+        if folder.startswith('.') or not os.path.isdir(folder_path):
+            continue
+        names = [name for name in os.listdir(folder_path) if name.endswith('.json') and not name.startswith('.')]
+        for name in sorted(names, key=lambda name: (len(name), name)):
+            jobs.append((os.path.join(folder_path, name), os.path.join(output_dir, folder, name)))
+    return jobs
+
+
+def print_generation_summary(rows, batches=None):
+    print(f"\n=== QUESTION GENERATION SUMMARY ===")
+    for number, batch in enumerate(batches or [], 1):
+        status = f"{len(batch['words'])} entries, ~{batch['tokens']} tokens" if not batch.get('error') else \
+            f"FAILED: {batch['error']}"
+        print(f"  batch {number} ({', '.join(batch['dates'])}): {status}")
+    for row in rows:
+        status = f"{row['questions']} questions, {row['model_calls']} model calls" if not row['error'] else \
+            f"FAILED: {row['error']}"
+        print(f"  {row['input']} -> {row['output']}: {status} ({row['elapsed']:.1f}s)")
+    generated = sum(1 for row in rows if not row['error'])
+    calls = sum(row['model_calls'] for row in rows) + sum(batch.get('model_calls', 0) for batch in batches or [])
+    print(f"Files generated: {generated}/{len(rows)}, model calls: {calls}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate MCQ question files from vocabulary chunks with an LLM')
+    parser.add_argument('--date', help='Only generate this date (dd/mm/yyyy, as in the CSV Time column)')
+    parser.add_argument('--input', default=JSON_PATH_DIR, help=f'Vocabulary chunk folder (default: {JSON_PATH_DIR})')
+    parser.add_argument('--output', default=QUESTIONS_DIR, help=f'Question file folder (default: {QUESTIONS_DIR})')
+    parser.add_argument('--concurrency', '-c', type=int, default=LLM_MAX_WORKERS, help=f'Model calls in flight (default: {LLM_MAX_WORKERS})')
+    parser.add_argument('--force', '-f', action='store_true', help='Ignore cached replies and call the model for every entry')
+    parser.add_argument('--token-budget', '-b', type=int, default=PROMPT_TOKEN_BUDGET,
+                        help='Pack entries into calls of about this many tokens instead of one call per chunk file')
+    parser.add_argument('--across-dates', action='store_true', default=PROMPT_PACK_ACROSS_DATES,
+                        help='With --token-budget, let one call mix vocabulary from different dates')
+    args = parser.parse_args()
+
+    jobs = find_vocabulary_chunks(args.input, args.output, args.date)
+    if not jobs:
+        print(f"No vocabulary chunks found in '{args.input}'.")
+        sys.exit(1)
+    backend = HttpLLMBackend(os.getenv('LLM_API_ENDPOINT') or LLM_ENDPOINT, os.getenv('LLM_MODEL') or LLM_MODEL,
+                             os.getenv('LLM_API_KEY'), pool_size=args.concurrency)
+    cache = GenerationCache(GENERATION_CACHE_PATH) if GENERATION_CACHE_PATH else None
+    generator = QuestionGenerator(backend, load_prompt_template(), cache, args.concurrency, force=args.force)
+    print(f"Generating questions for {len(jobs)} vocabulary files with up to {args.concurrency} concurrent calls...")
+    batches = None
+    if args.token_budget:
+        rows, batches = generator.generate_files_packed(jobs, args.token_budget, args.across_dates,
+                                                        os.path.join(args.output, PACKED_MANIFEST_FILE))
+    else:
+        rows = generator.generate_files(jobs)
+    backend.close()
+    print_generation_summary(rows, batches)
+    sys.exit(0 if all(not row['error'] for row in rows) else 1)
@@ -0,0 +1,369 @@
+"""
+Near-duplicate detection across the question bank.
+Each question is reduced to its normalized text plus correct answer; exact
+repeats are found by hashing that text and near-repeats by MinHash signatures
+of its character shingles, bucketed with locality-sensitive hashing so a
+lookup only compares a handful of candidates. Signatures are persisted per
+file (keyed by mtime and size), so only new or edited files are hashed again.
+
+Usage: python utils/question_index.py <directory> [--threshold 0.8]
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+import unicodedata
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import json_backend
+from utils.question import parse_questions
+
+INDEX_VERSION = 1
+NUM_PERM = 64
+BANDS = 16              # 16 bands of 4 rows: pairs above ~0.5 similarity become candidates
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+# Multiply-shift hash family: h(x) = ((a * x + b) mod 2^64) >> 32, with odd a
+_random = np.random.RandomState(20250705)
+_PERM_A = _random.randint(0, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64) << np.uint64(1) | np.uint64(1)
+_PERM_B = _random.randint(0, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64) << np.uint64(1)
+# Odd multipliers folding each band's rows into one 64-bit bucket key
+_BAND_MIX = (_random.randint(1, 1 << 31, size=(BANDS, NUM_PERM // BANDS)).astype(np.uint64) << np.uint64(32)) | np.uint64(1)
+
+# Questions hashed per numpy call; bounds the (NUM_PERM x shingles) work matrix
+_SIGNATURE_BATCH = 1000
+
+
+def normalize_question(question):
+    """Comparable text for a question: its wording plus the correct answer, case and punctuation folded."""
+    answer = dict(question.options).get(question.correct_option, '')
+    text = unicodedata.normalize('NFKC', f"{question.text} {answer}").lower()
+    return " ".join(re.findall(r"\w+", text))
+
+
+def exact_key(normalized_text):
+    return hashlib.sha1(normalized_text.encode('utf-8')).hexdigest()
+
+
+def _shingle_hashes(normalized_texts):
+    """Hash every SHINGLE_SIZE-byte window of each text in one pass.
+
+    Returns (hashes, offsets) where text i's shingles start at offsets[i]. A
+    window is packed exactly into an integer, so distinct shingles never share
+    a hash before the permutations.
+    """
+    encoded = [text.encode('utf-8').ljust(SHINGLE_SIZE) for text in normalized_texts]
+    lengths = np.array([len(data) for data in encoded], dtype=np.int64)
+    counts = lengths - SHINGLE_SIZE + 1
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    windows = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+    hashes = np.zeros(len(windows), dtype=np.uint64)
+    for k in range(SHINGLE_SIZE):
+        hashes |= buffer[windows + k].astype(np.uint64) << np.uint64(8 * k)
+    return hashes, offsets
+
+
+def minhash_signatures(normalized_texts):
+    """Return a (len(texts), NUM_PERM) uint32 array of MinHash signatures."""
+    signatures = np.empty((len(normalized_texts), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(normalized_texts), _SIGNATURE_BATCH):
+        hashes, offsets = _shingle_hashes(normalized_texts[start:start + _SIGNATURE_BATCH])
+        permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+        signatures[start:start + len(offsets)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.count_nonzero(signature_a == signature_b)) / NUM_PERM
+
+
+def band_keys(signatures):
+    """Return a (len(signatures), BANDS) array of LSH bucket keys; equal band rows give equal keys."""
+    bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, NUM_PERM // BANDS)
+    keys = (bands * _BAND_MIX).sum(axis=2, dtype=np.uint64)
+    # Keep keys of different bands apart
+    return keys ^ np.arange(BANDS, dtype=np.uint64)
+
+
+class LshIndex:
+    """In-memory exact-hash and MinHash LSH lookup over (key, signature, source) entries.
+
+    Signatures live in one matrix so every candidate from the LSH buckets is
+    verified with a single vectorized comparison.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._exact = {}
+        self._buckets = {}
+        self._sources = []
+        self._signatures = np.empty((1024, NUM_PERM), dtype=np.uint32)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def add(self, key, signature, source, buckets):
+        """Add an entry; `buckets` is its row of band_keys()."""
+        position = len(self._sources)
+        if position == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[position] = signature
+        self._sources.append(source)
+        self._exact.setdefault(key, []).append(position)
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, []).append(position)
+
+    def query(self, key, signature, buckets, exclude_files=None):
+        """Return (source, similarity) of the best match at or above the threshold, else None.
+
+        Entries whose source file is in `exclude_files` (absolute paths) are ignored.
+        """
+        usable = lambda position: not exclude_files or self._sources[position][0] not in exclude_files
+        for position in self._exact.get(key, ()):
+            if usable(position):
+                return self._sources[position], 1.0
+        candidates = []
+        for bucket in buckets:
+            candidates.extend(self._buckets.get(bucket, ()))
+        if not candidates:
+            return None
+        positions = np.array(candidates)
+        scores = np.count_nonzero(self._signatures[positions] == signature, axis=1) / NUM_PERM
+        matches = np.flatnonzero(scores >= self.threshold)
+        for order in matches[np.argsort(-scores[matches], kind='stable')]:
+            if usable(positions[order]):
+                return self._sources[positions[order]], float(scores[order])
+        return None
+
+
+def _file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class QuestionIndex:
+    """Persistent per-file store of question hashes and MinHash signatures."""
+
+    def __init__(self, path=None, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._files = self._load()
+        self._dirty = False
+        self._bank = None
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'rb') as f:
+                data = json_backend.loads(f.read())
+        except (FileNotFoundError, json_backend.JSONDecodeError, OSError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION or data.get('num_perm') != NUM_PERM:
+            return {}
+        return data.get('files', {})
+
+    def signatures(self, questions):
+        """Return [(exact_key, signature)] for `questions`, reusing stored signatures of unchanged files."""
+        results = [None] * len(questions)
+        by_file = {}
+        for position, question in enumerate(questions):
+            by_file.setdefault(question.source_file, []).append(position)
+
+        pending = []
+        for source_file, positions in by_file.items():
+            stored = self._stored(source_file)
+            for position in positions:
+                hit = stored.get(questions[position].index) if stored else None
+                if hit:
+                    results[position] = hit
+                else:
+                    pending.append(position)
+
+        if pending:
+            texts = [normalize_question(questions[position]) for position in pending]
+            signatures = minhash_signatures(texts)
+            for position, text, signature in zip(pending, texts, signatures):
+                results[position] = (exact_key(text), signature)
+            new_rows = {}
+            for position in pending:
+                new_rows.setdefault(questions[position].source_file, []).append(
+                    (questions[position].index, *results[position]))
+            for source_file, rows in new_rows.items():
+                self._store(source_file, rows)
+        return results
+
+    def _stored(self, source_file):
+        if not source_file:
+            return None
+        with self._lock:
+            entry = self._files.get(os.path.abspath(source_file))
+        if not entry or entry['signature'] != _file_signature(source_file):
+            return None
+        signatures = np.frombuffer(base64.b64decode(entry['minhash']), dtype='<u4').reshape(-1, NUM_PERM)
+        return {index: (key, signature) for index, key, signature in zip(entry['indices'], entry['keys'], signatures)}
+
+    def _store(self, source_file, rows):
+        signature = _file_signature(source_file) if source_file else None
+        if signature is None:
+            return
+        # Keep what is already stored for this version of the file, e.g. when it is split across shards
+        merged = dict(self._stored(source_file) or {})
+        merged.update((index, (key, minhash)) for index, key, minhash in rows)
+        stored = sorted((index, key, minhash) for index, (key, minhash) in merged.items())
+        minhash = np.array([row[2] for row in stored], dtype='<u4').reshape(-1, NUM_PERM)
+        with self._lock:
+            self._files[os.path.abspath(source_file)] = {
+                'signature': signature,
+                'indices': [row[0] for row in stored],
+                'keys': [row[1] for row in stored],
+                'minhash': base64.b64encode(minhash.tobytes()).decode('ascii')
+            }
+            self._dirty = True
+            if self._bank is not None:
+                new_signatures = np.array([row[2] for row in rows], dtype=np.uint32).reshape(-1, NUM_PERM)
+                for (index, key, row_signature), buckets in zip(rows, band_keys(new_signatures).tolist()):
+                    self._bank.add(key, row_signature, (os.path.abspath(source_file), index), buckets)
+
+    def bank(self):
+        """An LshIndex over every indexed file that is unchanged on disk, built once per run.
+
+        Sources in the bank use absolute paths. Files indexed later in the run are added as they come.
+        """
+        with self._lock:
+            if self._bank is None:
+                self._bank = LshIndex(self.threshold)
+                for file_path, entry in sorted(self._files.items()):
+                    if entry['signature'] != _file_signature(file_path):
+                        continue
+                    signatures = np.frombuffer(base64.b64decode(entry['minhash']), dtype='<u4').reshape(-1, NUM_PERM)
+                    for index, key, signature, buckets in zip(entry['indices'], entry['keys'], signatures,
+                                                              band_keys(signatures).tolist()):
+                        self._bank.add(key, signature, (file_path, index), buckets)
+            return self._bank
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            # Forget files that were deleted since they were indexed
+            self._files = {path: entry for path, entry in self._files.items() if os.path.exists(path)}
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.question_index.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(json_backend.dumps_bytes({'version': INDEX_VERSION, 'num_perm': NUM_PERM,
+                                                      'files': self._files}))
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._dirty = False
+
+
+class DuplicateFilter:
+    """Finds questions that repeat one already seen by this filter or elsewhere in the bank.
+
+    One filter spans one form (or every shard of a split form), so a question
+    is compared with all the questions accepted before it.
+    """
+
+    def __init__(self, index, check_bank=True):
+        self.index = index
+        self.seen = LshIndex(index.threshold)
+        self.check_bank = check_bank
+        self.form_files = set()
+
+    def filter(self, questions):
+        """Return (unique_questions, duplicates).
+
+        Each duplicate is a dict with the question's `source`, the `duplicate_of`
+        (source_file, index), the estimated `similarity`, and `in_form`, which is
+        False when the match is in another bank file rather than this form.
+        Only in-form duplicates are left out of unique_questions.
+        """
+        unique, duplicates = [], []
+        self.form_files.update(os.path.abspath(question.source_file) for question in questions if question.source_file)
+        bank = self.index.bank() if self.check_bank else None
+        signatures = self.index.signatures(questions)
+        all_buckets = band_keys(np.array([signature for _key, signature in signatures],
+                                         dtype=np.uint32).reshape(-1, NUM_PERM)).tolist()
+        for question, (key, signature), buckets in zip(questions, signatures, all_buckets):
+            match = self.seen.query(key, signature, buckets)
+            if match:
+                duplicates.append({'source': question.source, 'duplicate_of': match[0],
+                                   'similarity': match[1], 'in_form': True})
+                continue
+            if bank is not None:
+                match = bank.query(key, signature, buckets, exclude_files=self.form_files)
+                if match:
+                    duplicates.append({'source': question.source, 'duplicate_of': match[0],
+                                       'similarity': match[1], 'in_form': False})
+            self.seen.add(key, signature, question.source, buckets)
+            unique.append(question)
+        return unique, duplicates
+
+
+def print_duplicates(duplicates, dropped, max_lines=20):
+    """Print a duplicate report; returns the number of in-form duplicates."""
+    in_form = [duplicate for duplicate in duplicates if duplicate['in_form']]
+    in_bank = [duplicate for duplicate in duplicates if not duplicate['in_form']]
+    if in_form:
+        action = "dropped" if dropped else "kept (use --dedup drop to remove them)"
+        print(f"Duplicates: {len(in_form)} questions repeat an earlier question in this form; {action}")
+    if in_bank:
+        print(f"Duplicates: {len(in_bank)} questions also appear in other files of the question bank")
+    for duplicate in (in_form + in_bank)[:max_lines]:
+        (file_path, index), (other_path, other_index) = duplicate['source'], duplicate['duplicate_of']
+        print(f"  {file_path} #{index + 1} ~ {other_path} #{other_index + 1} ({duplicate['similarity']:.0%})")
+    if len(duplicates) > max_lines:
+        print(f"  ... and {len(duplicates) - max_lines} more")
+    return len(in_form)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report duplicate questions across a folder of question files')
+    parser.add_argument('directory', help='Folder searched recursively for question JSON files')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Minimum similarity (default: 0.8)')
+    parser.add_argument('--index', default='.cache/question_index.json', help='Persistent index file')
+    args = parser.parse_args()
+
+    questions = []
+    for root, dirs, files in os.walk(args.directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.lower().endswith('.json'):
+                path = os.path.join(root, name)
+                try:
+                    questions.extend(parse_questions(json_backend.load_file(path), path)[0])
+                except (json_backend.JSONDecodeError, OSError, UnicodeDecodeError) as e:
+                    print(f"Warning: Skipping {path}: {e}")
+
+    index = QuestionIndex(args.index, args.threshold)
+    _unique, duplicates = DuplicateFilter(index, check_bank=False).filter(questions)
+    index.save()
+    print(f"Checked {len(questions)} questions")
+    print_duplicates(duplicates, dropped=False)
+
+
+if __name__ == "__main__":
+    main()
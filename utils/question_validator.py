@@ -0,0 +1,199 @@
+"""
+Pre-flight validation of question JSON files.
+Checks every input file against the documented question format before any
+API call, in a process pool, and caches each file's result by mtime and size
+so re-runs over unchanged files cost nothing.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import json_backend
+from utils.question import question_errors  # the single set of format rules, shared with Question.from_dict
+
+# Bump when the rules change so cached results are re-checked
+VALIDATOR_VERSION = 1
+
+# Below this many uncached files a process pool costs more than it saves
+MIN_FILES_FOR_POOL = 16
+
+
+def validate_question_format(question_data, index):
+    """Validate a single question's format; returns a list of error messages."""
+    return [message for _field, message in question_errors(question_data)]
+
+
+def validate_file(file_path):
+    """Validate one question file.
+
+    Returns {'path', 'questions', 'errors'} where errors are (index, field, message)
+    tuples; index is None for problems with the file as a whole.
+    """
+    report = {'path': file_path, 'questions': 0, 'errors': []}
+    try:
+        data = json_backend.load_file(file_path)
+    except FileNotFoundError:
+        report['errors'].append((None, None, "File not found"))
+        return report
+    except (json_backend.JSONDecodeError, UnicodeDecodeError) as e:
+        report['errors'].append((None, None, f"JSON decode error: {e}"))
+        return report
+    except OSError as e:
+        report['errors'].append((None, None, f"Error reading file: {e}"))
+        return report
+
+    if not isinstance(data, list):
+        report['errors'].append((None, None, "Root element must be a list of questions"))
+        return report
+    if not data:
+        report['errors'].append((None, None, "No questions found in file"))
+        return report
+
+    report['questions'] = len(data)
+    for index, question_data in enumerate(data):
+        report['errors'].extend((index, field, message) for field, message in question_errors(question_data))
+    return report
+
+
+def _file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ValidationCache:
+    """Per-file validation results keyed by absolute path, valid while mtime and size match."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != VALIDATOR_VERSION:
+            return {}
+        return data.get('files', {})
+
+    def get(self, file_path):
+        signature = _file_signature(file_path)
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(file_path))
+        if signature is None or not entry or entry['signature'] != signature:
+            return None
+        return {'path': file_path, 'questions': entry['questions'],
+                'errors': [tuple(error) for error in entry['errors']]}
+
+    def put(self, report, signature):
+        if signature is None:
+            return
+        with self._lock:
+            self._entries[os.path.abspath(report['path'])] = {
+                'signature': signature,
+                'questions': report['questions'],
+                'errors': [list(error) for error in report['errors']]
+            }
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.validation_cache.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({'version': VALIDATOR_VERSION, 'files': self._entries}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._dirty = False
+
+
+def validate_files(file_paths, max_workers=None, cache=None):
+    """Validate many files, in a process pool when enough of them are not cached.
+
+    Returns (reports, cached_count) with reports in input order.
+    """
+    reports = [None] * len(file_paths)
+    pending = []
+    for position, file_path in enumerate(file_paths):
+        cached = cache.get(file_path) if cache else None
+        if cached:
+            reports[position] = cached
+        else:
+            pending.append(position)
+
+    signatures = {position: _file_signature(file_paths[position]) for position in pending}
+    paths = [file_paths[position] for position in pending]
+    workers = max_workers or os.cpu_count() or 1
+    if len(paths) >= MIN_FILES_FOR_POOL and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(validate_file, paths, chunksize=max(1, len(paths) // 64)))
+    else:
+        results = [validate_file(path) for path in paths]
+
+    for position, report in zip(pending, results):
+        reports[position] = report
+        if cache:
+            cache.put(report, signatures[position])
+    if cache:
+        cache.save()
+    return reports, len(file_paths) - len(pending)
+
+
+def print_validation_report(reports, max_errors=50):
+    """Print every error as file, question number and field; returns the error count."""
+    errors = [(report['path'], index, field, message)
+              for report in reports for index, field, message in report['errors']]
+    if not errors:
+        return 0
+    bad_files = len(set(path for path, _index, _field, _message in errors))
+    print(f"\n=== VALIDATION FAILED: {len(errors)} errors in {bad_files} of {len(reports)} files ===")
+    for path, index, field, message in errors[:max_errors]:
+        location = f"question #{index + 1}" if index is not None else "file"
+        print(f"  {path} [{location}{', ' + field if field else ''}]: {message}")
+    if len(errors) > max_errors:
+        print(f"  ... and {len(errors) - max_errors} more")
+    return len(errors)
+
+
+def validate_json_file(file_path):
+    """Validate a JSON file containing questions, printing a per-question report."""
+    print(f"🔍 Validating: {file_path}")
+    report = validate_file(file_path)
+    file_errors = [message for index, _field, message in report['errors'] if index is None]
+    if file_errors:
+        print(f"❌ {file_errors[0]}")
+        return False
+
+    print(f"📊 Found {report['questions']} questions")
+    by_index = {}
+    for index, _field, message in report['errors']:
+        by_index.setdefault(index, []).append(message)
+    for i in range(report['questions']):
+        if i in by_index:
+            print(f"❌ Question {i + 1} errors:")
+            for error in by_index[i]:
+                print(f"   - {error}")
+        else:
+            print(f"✅ Question {i + 1}: Valid")
+
+    if by_index:
+        print(f"❌ File validation failed!")
+        return False
+    print(f"✅ File validation passed!")
+    return True
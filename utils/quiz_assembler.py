@@ -0,0 +1,310 @@
+"""
+Adaptive quiz assembly.
+Keeps, per learner, a review schedule for every vocabulary word in the
+question bank: words answered correctly come back after a doubling interval,
+missed words come back the next day, and a word's recent error rate pulls its
+review forward. Words sit in a heap keyed by that effective due time, updated
+incrementally as harvested results arrive, so once the heap is built picking
+the next quiz's N words costs O(N log M). Building it is O(M) per run; the
+word of every question is cached per file by mtime and size, so only new or
+edited question files are parsed again.
+
+Questions without a `vocabulary` field are scheduled under their own text.
+"""
+
+import heapq
+import itertools
+import os
+import re
+import tempfile
+import time
+
+from config.config import (
+    ADAPTIVE_BANK_CACHE_PATH, ADAPTIVE_STATE_DIR, ERROR_URGENCY_DAYS, REVIEW_MAX_INTERVAL_DAYS,
+    REVIEW_MIN_INTERVAL_DAYS
+)
+from utils import json_backend
+from utils.form_sync import question_key
+from utils.question import parse_questions
+from utils.response_harvester import parse_timestamp
+
+STATE_VERSION = 1
+BANK_CACHE_VERSION = 1
+DAY = 86400
+ERROR_DECAY = 0.3  # weight of the latest answer in a word's moving error rate
+
+
+class WordPriorityIndex:
+    """Min-heap of words by priority with lazy invalidation.
+
+    update() pushes a fresh entry and marks the word's previous one stale;
+    stale entries are skipped when popped and the heap is rebuilt once they
+    outnumber the live ones.
+    """
+
+    def __init__(self, priorities=None):
+        self._counter = itertools.count()
+        self._entries = {}
+        self._heap = []
+        for word, priority in (priorities or {}).items():
+            entry = [priority, next(self._counter), word, True]
+            self._entries[word] = entry
+            self._heap.append(entry)
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, word):
+        return word in self._entries
+
+    def update(self, word, priority):
+        old = self._entries.get(word)
+        if old is not None:
+            old[3] = False
+        entry = [priority, next(self._counter), word, True]
+        self._entries[word] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [entry for entry in self._heap if entry[3]]
+            heapq.heapify(self._heap)
+
+    def smallest(self, count):
+        """The `count` words with the lowest priority, lowest first; the index is left unchanged."""
+        chosen = []
+        while self._heap and len(chosen) < count:
+            entry = heapq.heappop(self._heap)
+            if entry[3]:
+                chosen.append(entry)
+        for entry in chosen:
+            heapq.heappush(self._heap, entry)
+        return [entry[2] for entry in chosen]
+
+
+def question_word(data):
+    """The scheduling key of a question entry: its vocabulary word, else its normalized text."""
+    return data.get('vocabulary') or question_key(data.get('question'))
+
+
+def review_priority(stats, error_urgency=ERROR_URGENCY_DAYS * DAY):
+    """Effective due time: the scheduled review, moved earlier by the word's error rate."""
+    return stats['due'] - stats['error'] * error_urgency
+
+
+class LearnerState:
+    """One learner's per-word schedule, saved atomically as JSON under `directory`."""
+
+    def __init__(self, learner, directory=ADAPTIVE_STATE_DIR):
+        self.learner = learner
+        self.path = os.path.join(directory, re.sub(r'[^\w.@-]', '_', learner) + '.json')
+        data = self._load()
+        self.words = data.get('words', {})
+        # (form_id, response_id) of every harvested response already recorded
+        self.applied_responses = {tuple(pair) for pair in data.get('applied_responses', [])}
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = json_backend.loads(f.read())
+        except (FileNotFoundError, json_backend.JSONDecodeError, OSError):
+            return {}
+        return data if isinstance(data, dict) and data.get('version') == STATE_VERSION else {}
+
+    def save(self):
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.learner.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json_backend.dumps_bytes({'version': STATE_VERSION, 'learner': self.learner,
+                                                  'applied_responses': sorted(self.applied_responses),
+                                                  'words': self.words}))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class QuizAssembler:
+    """Picks a learner's next questions from a bank of question files.
+
+    `bank` maps each word to the (source_file, index) of its questions, as
+    returned by load_bank(); the words of each quiz rotate through them.
+    """
+
+    def __init__(self, bank, state, now=None):
+        self.bank = bank
+        self.state = state
+        now = time.time() if now is None else now
+        for word in bank:
+            # A new word is due as soon as it enters the bank
+            state.words.setdefault(word, {'due': now, 'interval': 0, 'error': 0.0, 'answers': 0, 'asked': 0})
+        self.index = WordPriorityIndex({word: review_priority(state.words[word]) for word in bank})
+
+    def record(self, word, correct, answered_at):
+        """Apply one graded answer: reschedule the word and update its heap entry."""
+        stats = self.state.words.get(word)
+        if stats is None:
+            return
+        stats['answers'] += 1
+        stats['error'] = (1 - ERROR_DECAY) * stats['error'] + ERROR_DECAY * (0.0 if correct else 1.0)
+        if correct:
+            stats['interval'] = min(max(stats['interval'] * 2, REVIEW_MIN_INTERVAL_DAYS * DAY),
+                                    REVIEW_MAX_INTERVAL_DAYS * DAY)
+        else:
+            stats['interval'] = REVIEW_MIN_INTERVAL_DAYS * DAY
+        stats['due'] = answered_at + stats['interval']
+        if word in self.index:
+            self.index.update(word, review_priority(stats))
+
+    def apply_results(self, answers, words_by_item):
+        """Record harvested answers from responses not applied before; returns how many were applied.
+
+        `answers` is a ResponseStore.load() frame already narrowed to this
+        learner; `words_by_item` maps (form_id, question_id) to a bank word.
+        Responses are tracked by id rather than submission time, so answers
+        sharing a second or harvested late are still applied exactly once.
+        """
+        answers = answers[answers['question_id'].notna() & answers['correct'].notna()]
+        responses = list(zip(answers['form_id'], answers['response_id']))
+        answers = answers[[response not in self.state.applied_responses for response in responses]]
+        if answers.empty:
+            return 0
+        answers = answers.assign(answered_at=answers['last_submitted_time'].map(
+            lambda value: parse_timestamp(value).timestamp()))
+        answers = answers.sort_values('answered_at', kind='stable')
+        applied = 0
+        for form_id, question_id, correct, answered_at in zip(answers['form_id'], answers['question_id'],
+                                                               answers['correct'], answers['answered_at']):
+            word = words_by_item.get((form_id, question_id))
+            if word is not None:
+                self.record(word, bool(correct), answered_at)
+                applied += 1
+        self.state.applied_responses.update(zip(answers['form_id'], answers['response_id']))
+        return applied
+
+    def next_words(self, count):
+        return self.index.smallest(count)
+
+    def next_quiz(self, count):
+        """Return (questions, source files) for the `count` most urgent words, one question each."""
+        picks = {}
+        for word in self.next_words(count):
+            sources = self.bank[word]
+            picks[word] = sources[self.state.words[word]['asked'] % len(sources)]
+        by_file = {}
+        for word, (source_file, index) in picks.items():
+            by_file.setdefault(source_file, set()).add(index)
+        loaded = {}
+        for source_file, indexes in by_file.items():
+            questions, _errors = parse_questions(json_backend.load_file(source_file), source_file)
+            loaded.update(((source_file, question.index), question) for question in questions
+                          if question.index in indexes)
+        questions = []
+        for word, source in picks.items():
+            # Only a question that made it onto the quiz counts as asked
+            if source in loaded:
+                questions.append(loaded[source])
+                self.state.words[word]['asked'] += 1
+        return questions, list(by_file)
+
+
+def _file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class BankCache:
+    """Per-file (index, word, question key) rows keyed by absolute path, valid while mtime and size match."""
+
+    def __init__(self, path=ADAPTIVE_BANK_CACHE_PATH):
+        self.path = path
+        self._files = self._load()
+        self._dirty = False
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'rb') as f:
+                data = json_backend.loads(f.read())
+        except (FileNotFoundError, json_backend.JSONDecodeError, OSError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != BANK_CACHE_VERSION:
+            return {}
+        return data.get('files', {})
+
+    def get(self, file_path, signature):
+        entry = self._files.get(os.path.abspath(file_path))
+        if signature is None or not entry or entry['signature'] != signature:
+            return None
+        return entry['rows']
+
+    def put(self, file_path, signature, rows):
+        if signature is None:
+            return
+        self._files[os.path.abspath(file_path)] = {'signature': signature, 'rows': rows}
+        self._dirty = True
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.bank_cache.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json_backend.dumps_bytes({'version': BANK_CACHE_VERSION, 'files': self._files}))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._dirty = False
+
+
+def bank_rows(path):
+    """Parse one question file into [index, word, question key] rows, or None if unreadable."""
+    try:
+        raw_questions = json_backend.load_file(path)
+    except (json_backend.JSONDecodeError, OSError, UnicodeDecodeError) as e:
+        print(f"Warning: Skipping {path}: {e}")
+        return None
+    return [[index, question_word(data), question_key(data['question'])]
+            for index, data in enumerate(raw_questions if isinstance(raw_questions, list) else [])
+            if isinstance(data, dict) and isinstance(data.get('question'), str)]
+
+
+def load_bank(json_file_paths, cache=None):
+    """Read the words of the question files, parsing only files `cache` has no current rows for.
+
+    Returns (bank, words_by_text): each word's (source_file, index) list, and
+    the word of each normalized question text, for matching form items.
+    """
+    bank, words_by_text = {}, {}
+    for path in json_file_paths:
+        signature = _file_signature(path)
+        rows = cache.get(path, signature) if cache else None
+        if rows is None:
+            rows = bank_rows(path)
+            if rows is None:
+                continue
+            if cache:
+                cache.put(path, signature, rows)
+        for index, word, key in rows:
+            bank.setdefault(word, []).append((path, index))
+            words_by_text.setdefault(key, word)
+    if cache:
+        cache.save()
+    return bank, words_by_text
+
+
+def words_by_form_item(items, words_by_text):
+    """Map each harvested (form_id, question_id) to its bank word, matching on question text."""
+    return {(form_id, question['question_id']): words_by_text[question_key(question['title'])]
+            for form_id, questions in items.items() for question in questions
+            if question_key(question['title']) in words_by_text}
@@ -0,0 +1,76 @@
+"""
+Token-bucket rate limiting and retry backoff helpers for Forms API calls.
+A bucket is shared per quota name so every generator and worker thread in
+the process draws from the same per-minute budget.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(1, capacity or 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available, then take it. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+            waited += wait
+
+
+_shared_buckets = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_bucket(name, rate_per_minute, capacity=None):
+    """Return the process-wide bucket for a quota, creating it on first use."""
+    with _shared_lock:
+        bucket = _shared_buckets.get(name)
+        if bucket is None:
+            bucket = TokenBucket(rate_per_minute, capacity)
+            _shared_buckets[name] = bucket
+        return bucket
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, base=1.0, maximum=32.0):
+    """Full-jitter exponential backoff for the given zero-based retry attempt."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
@@ -0,0 +1,133 @@
+"""
+Compiled request logs: every Forms API call needed to build a set of forms,
+planned offline as JSON lines, plus the acknowledgement log replay uses to
+resume. A record looks like
+
+    {"record": 2, "form": "quiz_1", "op": "batchUpdate", "method": "POST",
+     "path": "/v1/forms/{formId}:batchUpdate", "body": {...}, "sources": [["quiz_1.json", 0], ...]}
+
+`{formId}` is filled in at replay time from the form's acknowledged create
+record. Batch `sources` list one (source_file, index) per createItem, in order.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from utils import json_backend
+from utils.batch_packer import create_item_bytes, pack_batches, request_bytes
+from utils.request_planner import plan_form_requests
+
+FORM_ID_PLACEHOLDER = '{formId}'
+
+
+def compile_form_records(form_key, title, description, questions, points, chunk_size, max_bytes=None,
+                         collect_email=False):
+    """Plan the create + batchUpdate records for one form (numbered by write_records).
+
+    Mirrors the live flow: the form is created with its title only, then the
+    description and quiz settings ride along with the first question batch,
+    and batches are packed under the same item and byte budgets.
+    """
+    records = [{
+        'form': form_key,
+        'op': 'create',
+        'method': 'POST',
+        'path': '/v1/forms',
+        'body': {'info': {'title': title}},
+        'questions': len(questions),
+        'sources': sorted(set(question.source_file for question in questions if question.source_file))
+    }]
+    prefix = plan_form_requests(description, quiz=True, collect_email=collect_email)
+    sizes = [create_item_bytes(question.build_item(points)) if max_bytes else 0 for question in questions]
+    batches = pack_batches(sizes, max(1, chunk_size or 1), max_bytes,
+                           sum(request_bytes(request) for request in prefix)) or [(0, 0)]
+    for start, end in batches:
+        chunk = questions[start:end]
+        requests_list = list(prefix)
+        for offset, question in enumerate(chunk):
+            requests_list.append({
+                'createItem': {
+                    'item': question.build_item(points),
+                    'location': {'index': start + offset}
+                }
+            })
+        prefix = []
+        if requests_list:
+            records.append({
+                'form': form_key,
+                'op': 'batchUpdate',
+                'method': 'POST',
+                'path': f'/v1/forms/{FORM_ID_PLACEHOLDER}:batchUpdate',
+                'body': {'requests': requests_list},
+                'sources': [list(question.source) for question in chunk]
+            })
+    return records
+
+
+def write_records(path, records):
+    """Number `records` in order and write them as JSON lines; returns the count."""
+    with open(path, 'wb') as f:
+        for number, record in enumerate(records, 1):
+            f.write(json_backend.dumps_bytes(dict(record=number, **record)) + b'\n')
+    return len(records)
+
+
+def read_records_by_form(path):
+    """Read a compiled log and group its records by form, keeping file order."""
+    forms = OrderedDict()
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                record = json_backend.loads(line)
+                forms.setdefault(record['form'], []).append(record)
+    return forms
+
+
+def ack_log_path(path):
+    return f"{path}.acks"
+
+
+def load_acks(path):
+    """Merge the acknowledgement log into {record_number: ack}.
+
+    A record can be acknowledged more than once when a partly sent batch is
+    resumed; the added counts are summed and the latest status wins.
+    """
+    acks = {}
+    if not os.path.exists(path):
+        return acks
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                ack = json_backend.loads(line)
+            except json_backend.JSONDecodeError:
+                continue  # A line cut short by an interrupted run
+            previous = acks.get(ack['record'])
+            if previous:
+                merged = dict(previous)
+                merged.update(ack)
+                merged['added'] = previous.get('added', 0) + ack.get('added', 0)
+                merged['rejected'] = previous.get('rejected', []) + ack.get('rejected', [])
+                ack = merged
+            acks[ack['record']] = ack
+    return acks
+
+
+class AckLog:
+    """Append-only, thread-safe acknowledgement log, flushed after every entry."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+
+    def append(self, ack):
+        line = json_backend.dumps_bytes(ack) + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,55 @@
+"""
+Request planner for Google Forms batchUpdate calls.
+Merges the form description, quiz settings and every createItem request into
+a single post-create batch so a form costs two round trips: create + batch.
+"""
+
+
+def build_description_request(description):
+    """Build the updateFormInfo request that sets the form description."""
+    return {
+        "updateFormInfo": {
+            "info": {
+                "description": description
+            },
+            "updateMask": "description"
+        }
+    }
+
+
+def build_quiz_settings_request(collect_email=False):
+    """Build the updateSettings request that turns the form into a quiz.
+
+    With `collect_email`, respondents' verified emails are recorded too, so
+    harvested answers can be attributed to a learner.
+    """
+    settings = {
+        "quizSettings": {
+            "isQuiz": True
+        }
+    }
+    update_mask = "quizSettings.isQuiz"
+    if collect_email:
+        settings["emailCollectionType"] = "VERIFIED"
+        update_mask += ",emailCollectionType"
+    return {
+        "updateSettings": {
+            "settings": settings,
+            "updateMask": update_mask
+        }
+    }
+
+
+def plan_form_requests(description="", quiz=True, item_requests=(), collect_email=False):
+    """Return the ordered request list for one post-create batchUpdate.
+
+    batchUpdate applies requests in order, so the quiz settings are placed
+    before any createItem carrying grading, and form info goes first.
+    """
+    requests_list = []
+    if description:
+        requests_list.append(build_description_request(description))
+    if quiz:
+        requests_list.append(build_quiz_settings_request(collect_email))
+    requests_list.extend(item_requests)
+    return requests_list
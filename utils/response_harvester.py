@@ -0,0 +1,392 @@
+"""
+Quiz response harvester.
+Pages through forms.responses.list for many forms concurrently and appends
+one row per answered question to a local columnar store (Parquet when pyarrow
+or fastparquet is installed, CSV otherwise), along with each form's question
+titles, options and correct answers for offline analysis. Each form's latest
+lastSubmittedTime is kept as a watermark, so a re-harvest only asks the API
+for submissions made since the previous run. Every page adds a part file;
+once a harvest leaves RESPONSES_COMPACT_PARTS of them, they are merged into
+one so load() does not slow down run after run.
+
+Usage: python utils/response_harvester.py [FORM_ID ...] [--index forms_index.json] [--from-cache] [--full]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from urllib.parse import quote, urlencode
+
+import pandas as pd
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (
+    FORM_CACHE_PATH, HARVEST_MAX_WORKERS, HTTP_KEEP_ALIVE, MAX_RETRIES, READ_QUOTA_PER_MINUTE, RATE_LIMIT_BURST,
+    REQUEST_TIMEOUT, RESPONSES_COMPACT_PARTS, RESPONSES_PAGE_SIZE, RESPONSES_STORE_DIR, RESPONSES_STORE_FORMAT,
+    RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX
+)
+from utils import json_backend
+from utils.gg_form_api import SERVICE_ENDPOINT, get_credential_provider
+from utils.http_transport import HttpTransport
+from utils.rate_limiter import get_shared_bucket
+
+COLUMNS = ['form_id', 'response_id', 'respondent_email', 'create_time', 'last_submitted_time', 'total_score',
+           'question_id', 'answer', 'score', 'correct']
+WATERMARK_FILE = '.watermarks.json'
+ITEMS_FILE = 'items.json'  # form id -> its questions, refreshed whenever new responses arrive
+FORMATS = ('auto', 'parquet', 'csv')
+
+
+def _parquet_available():
+    for module in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            pass
+    return False
+
+
+def resolve_format(name=RESPONSES_STORE_FORMAT):
+    if name not in FORMATS:
+        raise ValueError(f"Unknown store format '{name}' (expected one of {', '.join(FORMATS)})")
+    if name == 'parquet' and not _parquet_available():
+        print("Warning: RESPONSES_STORE_FORMAT is 'parquet' but neither pyarrow nor fastparquet is installed; using csv")
+        return 'csv'
+    if name == 'auto':
+        return 'parquet' if _parquet_available() else 'csv'
+    return name
+
+
+def response_rows(form_id, response):
+    """Flatten one API response into a row per answered question (one empty row if it has none)."""
+    base = {
+        'form_id': form_id,
+        'response_id': response.get('responseId'),
+        'respondent_email': response.get('respondentEmail'),
+        'create_time': response.get('createTime'),
+        'last_submitted_time': response.get('lastSubmittedTime'),
+        'total_score': response.get('totalScore')
+    }
+    rows = []
+    for question_id, answer in (response.get('answers') or {}).items():
+        values = [value.get('value', '') for value in answer.get('textAnswers', {}).get('answers', [])]
+        grade = answer.get('grade', {})
+        rows.append(dict(base, question_id=question_id, answer='\n'.join(values),
+                         score=grade.get('score', 0 if grade else None),
+                         correct=bool(grade.get('correct')) if grade else None))
+    return rows or [dict(base, question_id=None, answer=None, score=None, correct=None)]
+
+
+def form_questions(form):
+    """Question id, title, options and correct answers of every graded choice item of a form."""
+    questions = []
+    for item in form.get('items', []):
+        question = item.get('questionItem', {}).get('question', {})
+        if 'choiceQuestion' not in question:
+            continue
+        questions.append({
+            'question_id': question.get('questionId'),
+            'title': item.get('title', ''),
+            'options': [option.get('value') for option in question['choiceQuestion'].get('options', [])],
+            'correct': [answer.get('value') for answer in
+                        question.get('grading', {}).get('correctAnswers', {}).get('answers', [])]
+        })
+    return questions
+
+
+class ResponseStore:
+    """Append-only folder of part files plus the per-form watermarks.
+
+    Part files are written before the watermarks they cover, so an interrupted
+    run at worst fetches some responses again; load() keeps the latest copy.
+    compact() merges the part files once there are `compact_parts` of them.
+    """
+
+    def __init__(self, path=RESPONSES_STORE_DIR, file_format=RESPONSES_STORE_FORMAT,
+                 compact_parts=RESPONSES_COMPACT_PARTS):
+        self.path = path
+        self.format = resolve_format(file_format)
+        self.compact_parts = compact_parts
+        self._lock = threading.Lock()
+        self._parts = 0
+        self._watermarks = self._load_json(WATERMARK_FILE)
+        self._items = self._load_json(ITEMS_FILE)
+
+    def _load_json(self, name):
+        try:
+            with open(os.path.join(self.path, name), 'rb') as f:
+                data = json_backend.loads(f.read())
+        except (FileNotFoundError, json_backend.JSONDecodeError, OSError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def watermark(self, form_id):
+        with self._lock:
+            return self._watermarks.get(form_id)
+
+    def has_items(self, form_id):
+        with self._lock:
+            return form_id in self._items
+
+    def items(self):
+        """Form id -> list of question dicts (question_id, title, options, correct)."""
+        with self._lock:
+            return dict(self._items)
+
+    def append(self, rows, watermarks, items=None):
+        """Write `rows` as a new part file, then record form questions and advance the form watermarks.
+
+        Only the JSON files that actually change are rewritten.
+        """
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            if rows:
+                self._write_part(pd.DataFrame(rows, columns=COLUMNS))
+            if items:
+                self._items.update(items)
+                self._save_json(ITEMS_FILE, self._items)
+            if watermarks:
+                self._watermarks.update(watermarks)
+                self._save_json(WATERMARK_FILE, self._watermarks)
+
+    def _write_part(self, frame):
+        """Atomically write `frame` as a part file named after the current time, so later parts sort last."""
+        self._parts += 1
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        part_path = os.path.join(self.path, f"part-{stamp}-{self._parts}.{self.format}")
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.part.', suffix='.tmp')
+        os.close(fd)
+        try:
+            if self.format == 'parquet':
+                frame.to_parquet(tmp_path, index=False)
+            else:
+                frame.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, part_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return part_path
+
+    def compact(self, min_parts=None):
+        """Merge the part files into one holding what load() returns; returns how many were merged.
+
+        Nothing happens below `min_parts` (default: the store's compact_parts).
+        The merged file is written before the old ones are removed, so an
+        interrupted compaction only leaves rows load() already deduplicates.
+        """
+        with self._lock:
+            parts = self.part_files()
+            if len(parts) < max(2, min_parts or self.compact_parts or 0):
+                return 0
+            self._write_part(self._read(parts))
+            for path in parts:
+                os.remove(path)
+            return len(parts)
+
+    def _save_json(self, name, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.json.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(json_backend.dumps_pretty(data, sort_keys=True))
+            os.replace(tmp_path, os.path.join(self.path, name))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def part_files(self):
+        return sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')) +
+                      glob.glob(os.path.join(self.path, 'part-*.csv')))
+
+    def load(self, form_ids=None):
+        """Every stored answer row as a DataFrame, keeping only the latest submission of each response."""
+        return self._read(self.part_files(), form_ids)
+
+    def _read(self, parts, form_ids=None):
+        frames = [pd.read_parquet(path) if path.endswith('.parquet') else
+                  pd.read_csv(path, dtype={'respondent_email': 'object', 'question_id': 'object', 'answer': 'object'})
+                  for path in parts]
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        frame = pd.concat(frames, ignore_index=True)
+        if form_ids is not None:
+            frame = frame[frame['form_id'].isin(list(form_ids))]
+        # An edited response comes back with a later lastSubmittedTime; drop its older rows
+        edited = frame.groupby('response_id')['last_submitted_time'].transform('nunique') > 1
+        if edited.any():
+            submitted = frame.loc[edited, 'last_submitted_time'].map(parse_timestamp)
+            latest = submitted.groupby(frame.loc[edited, 'response_id']).transform('max')
+            frame = frame.drop(submitted.index[submitted != latest])
+        return frame.drop_duplicates(['response_id', 'question_id'], keep='last').reset_index(drop=True)
+
+
+def new_transport(pool_size=HARVEST_MAX_WORKERS, endpoint=None, credential_provider=None, rate_limit=True):
+    """Forms API transport for reads, sharing the process-wide read quota bucket unless `rate_limit` is off."""
+    return HttpTransport(
+        endpoint or SERVICE_ENDPOINT,
+        pool_size=pool_size,
+        keep_alive=HTTP_KEEP_ALIVE,
+        timeout=REQUEST_TIMEOUT,
+        read_limiter=get_shared_bucket('forms-read', READ_QUOTA_PER_MINUTE, RATE_LIMIT_BURST) if rate_limit else None,
+        max_retries=MAX_RETRIES,
+        backoff_base=RETRY_BACKOFF_BASE,
+        backoff_max=RETRY_BACKOFF_MAX,
+        auth=credential_provider or get_credential_provider()
+    )
+
+
+class ResponseHarvester:
+    """Fetches new responses for many forms concurrently into a ResponseStore."""
+
+    def __init__(self, transport, store, page_size=RESPONSES_PAGE_SIZE, max_workers=HARVEST_MAX_WORKERS):
+        self.transport = transport
+        self.store = store
+        self.page_size = page_size
+        self.max_workers = max(1, max_workers or 1)
+
+    def iter_pages(self, form_id, since=None):
+        """Yield the responses of each forms.responses.list page, optionally only those after `since`."""
+        params = {'pageSize': self.page_size}
+        if since:
+            params['filter'] = f'timestamp > {since}'
+        while True:
+            response = self.transport.get(f'/v1/forms/{form_id}/responses?{urlencode(params, quote_via=quote)}')
+            response.raise_for_status()
+            page = response.json()
+            yield page.get('responses', [])
+            if not page.get('nextPageToken'):
+                return
+            params['pageToken'] = page['nextPageToken']
+
+    def fetch_form(self, form_id, full=False):
+        """Stream the form's new responses into the store, one part file per page.
+
+        The form's watermark (and its questions) are recorded only after the
+        last page is written, so a failure part way through refetches the
+        form next time; load() drops the repeated rows. Returns a summary row.
+        """
+        started = time.perf_counter()
+        since = None if full else self.store.watermark(form_id)
+        row = {'form_id': form_id, 'since': since, 'responses': 0, 'pages': 0, 'watermark': since, 'error': None}
+        watermark = since
+        try:
+            for responses in self.iter_pages(form_id, since):
+                row['pages'] += 1
+                row['responses'] += len(responses)
+                rows = []
+                for response in responses:
+                    rows.extend(response_rows(form_id, response))
+                    submitted = response.get('lastSubmittedTime')
+                    if submitted and (watermark is None or parse_timestamp(submitted) > parse_timestamp(watermark)):
+                        watermark = submitted
+                self.store.append(rows, {})
+            items = None
+            if row['responses'] or not self.store.has_items(form_id):
+                # The form may have been edited since its questions were stored
+                response = self.transport.get(f'/v1/forms/{form_id}')
+                response.raise_for_status()
+                items = {form_id: form_questions(response.json())}
+            if items or watermark != since:
+                self.store.append([], {form_id: watermark} if watermark else {}, items)
+            row['watermark'] = watermark
+        except requests.exceptions.RequestException as e:
+            row['error'] = str(e)
+            if getattr(e, 'response', None) is not None:
+                row['error'] = f"{e} ({e.response.text.strip()[:200]})"
+        row['elapsed'] = time.perf_counter() - started
+        return row
+
+    def harvest(self, form_ids, full=False):
+        """Harvest every form with bounded concurrency; returns one summary row per form, in input order.
+
+        Afterwards the store's part files are compacted if there are enough of them.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(form_ids), 1))) as executor:
+            futures = [executor.submit(self.fetch_form, form_id, full) for form_id in dict.fromkeys(form_ids)]
+            for future in as_completed(futures):
+                row = future.result()
+                results[row['form_id']] = row
+        merged = self.store.compact()
+        if merged:
+            print(f"Compacted {merged} part files in '{self.store.path}' into one")
+        return [results[form_id] for form_id in dict.fromkeys(form_ids)]
+
+
+def parse_timestamp(value):
+    """Parse an RFC 3339 timestamp; the API may send up to nine fractional digits."""
+    seconds, _, fraction = value.replace('Z', '+00:00').partition('.')
+    if fraction:
+        digits = len(fraction) - len(fraction.lstrip('0123456789'))
+        seconds += '.' + fraction[:min(digits, 6)] + fraction[digits:]
+    return datetime.fromisoformat(seconds)
+
+
+def form_ids_from_index(index_path):
+    """Form ids listed in a main.py --index file."""
+    return [form['form_id'] for form in json_backend.load_file(index_path).get('forms', []) if form.get('form_id')]
+
+
+def form_ids_from_cache(cache_path=FORM_CACHE_PATH):
+    """Form ids of every form the idempotency cache remembers creating."""
+    try:
+        entries = json_backend.load_file(cache_path)
+    except (FileNotFoundError, json_backend.JSONDecodeError, OSError):
+        return []
+    return [entry['result']['form_id'] for entry in entries.values() if entry.get('result', {}).get('form_id')]
+
+
+def print_harvest_summary(rows, elapsed):
+    print(f"\n=== RESPONSE HARVEST SUMMARY ===")
+    for row in rows:
+        if row['error']:
+            print(f"  {row['form_id']}: FAILED: {row['error']}")
+        elif row['responses']:
+            print(f"  {row['form_id']}: {row['responses']} new responses in {row['pages']} pages ({row['elapsed']:.1f}s)")
+    new = sum(row['responses'] for row in rows)
+    unchanged = sum(1 for row in rows if not row['error'] and not row['responses'])
+    failed = sum(1 for row in rows if row['error'])
+    print(f"Forms: {len(rows)} ({unchanged} without new responses, {failed} failed), "
+          f"new responses: {new}, time: {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Download quiz responses into a local Parquet/CSV store')
+    parser.add_argument('form_ids', nargs='*', help='Form ids to harvest')
+    parser.add_argument('--index', action='append', metavar='FILE', help='Also harvest every form in a main.py --index file (repeatable)')
+    parser.add_argument('--from-cache', action='store_true', help='Also harvest every form in the form cache')
+    parser.add_argument('--store', default=RESPONSES_STORE_DIR, help=f'Store folder (default: {RESPONSES_STORE_DIR})')
+    parser.add_argument('--format', choices=FORMATS, default=RESPONSES_STORE_FORMAT, help=f'Part file format (default: {RESPONSES_STORE_FORMAT})')
+    parser.add_argument('--full', action='store_true', help='Ignore the watermarks and fetch every response again')
+    parser.add_argument('--concurrency', '-c', type=int, default=HARVEST_MAX_WORKERS, help=f'Forms fetched concurrently (default: {HARVEST_MAX_WORKERS})')
+    args = parser.parse_args()
+
+    form_ids = list(args.form_ids)
+    for index_path in args.index or []:
+        form_ids.extend(form_ids_from_index(index_path))
+    if args.from_cache and FORM_CACHE_PATH:
+        form_ids.extend(form_ids_from_cache())
+    form_ids = list(dict.fromkeys(form_ids))
+    if not form_ids:
+        print("No forms to harvest: pass form ids, --index or --from-cache.")
+        sys.exit(1)
+
+    store = ResponseStore(args.store, args.format)
+    transport = new_transport(args.concurrency)
+    harvester = ResponseHarvester(transport, store, max_workers=args.concurrency)
+    print(f"Harvesting responses of {len(form_ids)} forms into {args.store} ({store.format}) "
+          f"with up to {args.concurrency} concurrent forms...")
+    started = time.perf_counter()
+    rows = harvester.harvest(form_ids, args.full)
+    transport.close()
+    print_harvest_summary(rows, time.perf_counter() - started)
+    sys.exit(0 if all(not row['error'] for row in rows) else 1)